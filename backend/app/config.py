@@ -26,6 +26,20 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "CHANGE_ME_SECRET")
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
+# Authenticated-user cache (per process). TTL bounds staleness across workers;
+# role / active / password changes invalidate the entry immediately.
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "5000"))
+
+# Password hashing (PBKDF2-SHA256) runs in a separate process pool.
+# PASSWORD_HASH_WORKERS=0 hashes inline in the request thread.
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+
+# How often each worker reloads the token-version (revocation) table.
+TOKEN_VERSION_REFRESH_SECONDS = int(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "5"))
+
 # ---------------------------------------------------------------------------
 # Business rules
 # ---------------------------------------------------------------------------
@@ -54,6 +68,67 @@ SLOT_MINUTES = 15
 # ---------------------------------------------------------------------------
 MENU_ROTATION_START_DATE = date(2026, 1, 1)  # pick any anchor date you want
 
+# Each worker keeps the rotation in memory and checks its version at most
+# this often (admin edits are seen at once by the worker that made them).
+MENU_CACHE_REFRESH_SECONDS = int(os.getenv("MENU_CACHE_REFRESH_SECONDS", "5"))
+
+# GET /menu/public-week: Cache-Control for browsers / CDN / nginx, and the
+# number of serialized weeks each worker keeps in memory.
+MENU_HTTP_MAX_AGE_SECONDS = int(os.getenv("MENU_HTTP_MAX_AGE_SECONDS", "60"))
+MENU_HTTP_STALE_WHILE_REVALIDATE_SECONDS = int(
+    os.getenv("MENU_HTTP_STALE_WHILE_REVALIDATE_SECONDS", "300")
+)
+MENU_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("MENU_RESPONSE_CACHE_MAX_ENTRIES", "64"))
+
+# GET /menu/range: longest range served in one call (12 service weeks)
+MENU_RANGE_MAX_DAYS = int(os.getenv("MENU_RANGE_MAX_DAYS", "84"))
+
+# ---------------------------------------------------------------------------
+# CSV exports (streamed)
+# Rows fetched from the DB cursor per batch, and characters of encoded CSV
+# buffered before a chunk is sent to the client.
+# ---------------------------------------------------------------------------
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", str(64 * 1024)))
+# zlib level for ?compress=gzip / Accept-Encoding: gzip exports
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+# Rendered booking exports kept on local disk (shared by the workers of one
+# host), keyed by range + data versions; least recently used files are
+# removed beyond EXPORT_CACHE_MAX_BYTES.
+EXPORT_CACHE_DIR = Path(os.getenv("EXPORT_CACHE_DIR", str(backend_dir / "export_cache")))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Background export jobs (POST /admin/exports): rendered into
+# EXPORT_JOB_DIR by EXPORT_JOB_WORKERS threads per API process, at most
+# EXPORT_JOB_MAX_ACTIVE queued/running across all workers, kept for
+# EXPORT_JOB_RETENTION_HOURS. A running job without progress for
+# EXPORT_JOB_STALE_SECONDS, or a job still queued
+# EXPORT_JOB_QUEUED_TIMEOUT_SECONDS after it was created (its worker died),
+# is marked failed.
+EXPORT_JOB_DIR = Path(os.getenv("EXPORT_JOB_DIR", str(backend_dir / "export_jobs")))
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "1"))
+EXPORT_JOB_MAX_ACTIVE = int(os.getenv("EXPORT_JOB_MAX_ACTIVE", "4"))
+EXPORT_JOB_MAX_DAYS = int(os.getenv("EXPORT_JOB_MAX_DAYS", "400"))
+EXPORT_JOB_RETENTION_HOURS = int(os.getenv("EXPORT_JOB_RETENTION_HOURS", "72"))
+EXPORT_JOB_STALE_SECONDS = int(os.getenv("EXPORT_JOB_STALE_SECONDS", "1800"))
+EXPORT_JOB_QUEUED_TIMEOUT_SECONDS = int(os.getenv("EXPORT_JOB_QUEUED_TIMEOUT_SECONDS", "7200"))
+
+# Longest range GET /admin/export/bookings/range streams in one response
+# (read one service day at a time, so the cost per partition is flat)
+EXPORT_RANGE_MAX_DAYS = int(os.getenv("EXPORT_RANGE_MAX_DAYS", "400"))
+
+# ---------------------------------------------------------------------------
+# Live kitchen board (GET /kitchen/stream, Server-Sent Events)
+# Seconds between heartbeats (each also checks the day's booking version for
+# changes made by other workers), events kept per process for Last-Event-ID
+# resume, and events queued per slow client before it is sent a fresh
+# snapshot instead.
+# ---------------------------------------------------------------------------
+KITCHEN_STREAM_HEARTBEAT_SECONDS = float(os.getenv("KITCHEN_STREAM_HEARTBEAT_SECONDS", "15"))
+KITCHEN_STREAM_BUFFER = int(os.getenv("KITCHEN_STREAM_BUFFER", "1000"))
+KITCHEN_STREAM_QUEUE = int(os.getenv("KITCHEN_STREAM_QUEUE", "256"))
+
 # ---------------------------------------------------------------------------
 # Launch promo: 50% discount on first service week
 # ---------------------------------------------------------------------------
@@ -4,7 +4,7 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..core.security import get_current_user, require_role
+from ..core.security import Principal, get_current_user, require_role
 from ..models.user import User
 
 
@@ -28,7 +28,7 @@ def get_current_client(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_admin(current_admin: User = Depends(require_role("admin"))) -> User:
+def get_admin(current_admin: Principal = Depends(require_role("admin"))) -> Principal:
     """
     Ensure the current user is an admin.
     require_role('admin') handles all checks.
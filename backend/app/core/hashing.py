@@ -0,0 +1,142 @@
+# backend/app/core/hashing.py
+
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from ..config import (
+    PASSWORD_HASH_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+)
+
+
+# Use PBKDF2-SHA256 instead of bcrypt to avoid the broken bcrypt/passlib combo.
+# min_rounds == default_rounds: hashes below the configured cost are reported
+# as deprecated and upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+
+# ---------------------------------------------------------------------
+# Worker functions (run inside the pool processes; must stay top-level)
+# ---------------------------------------------------------------------
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+# ---------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------
+
+class PasswordHasher:
+    """
+    Runs PBKDF2 work in a dedicated process pool so login/register bursts
+    don't burn CPU (and the GIL) inside the API process.
+
+    At most `max_pending` hash jobs may be queued or running; beyond that the
+    caller gets an immediate 503 instead of waiting. Keep `max_pending` well
+    below the AnyIO threadpool size (40) so waiting request threads can't
+    starve booking traffic.
+
+    workers=0 hashes inline (dev / single-process debugging).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies_ms: "deque[float]" = deque(maxlen=1024)
+        self.completed = 0
+        self.rejected = 0
+        self.max_pending_seen = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _run(self, fn, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self._pending)
+
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self._latencies_ms.append(elapsed_ms)
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return self._run(_verify_and_update, password, hashed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._latencies_ms)
+            pending = self._pending
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2)
+
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queue_depth": pending,
+            "max_queue_depth_seen": self.max_pending_seen,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_max": round(samples[-1], 2) if samples else None,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+)
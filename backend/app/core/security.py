@@ -1,24 +1,30 @@
 # backend/app/core/security.py
 
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
 
-from ..config import JWT_SECRET_KEY, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..config import (
+    JWT_SECRET_KEY,
+    JWT_ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_ENTRIES,
+    TOKEN_VERSION_REFRESH_SECONDS,
+)
 from ..database import get_db
-from ..models.user import User
-
+from ..models.user import User, UserTokenVersion
+from .cache import TTLCache
+from .hashing import password_hasher
 
-# Use PBKDF2-SHA256 instead of bcrypt to avoid the broken bcrypt/passlib combo
-pwd_context = CryptContext(
-    schemes=["pbkdf2_sha256"],
-    deprecated="auto",
-)
 
 # Token endpoint MUST match your auth router URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -29,13 +35,90 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 # ---------------------------------------------------------------------
 
 def get_password_hash(password: str) -> str:
-    """Hash password using bcrypt."""
-    return pwd_context.hash(password)
+    """Hash password (PBKDF2-SHA256) in the hashing process pool."""
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = verify_and_update_password(plain_password, hashed_password)
+    return valid
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify password and, if the stored hash is deprecated (e.g. fewer rounds
+    than PASSWORD_HASH_ROUNDS), return a replacement hash to store.
+    """
+    return password_hasher.verify_and_update(plain_password, hashed_password)
+
+
+# ---------------------------------------------------------------------
+# Token versions (revocation list)
+# ---------------------------------------------------------------------
+
+class TokenVersionTable:
+    """
+    In-memory copy of user_token_versions, reloaded from the DB at most every
+    TOKEN_VERSION_REFRESH_SECONDS (one small SELECT for the whole table).
+
+    The worker that bumps a version marks the table stale so the change is
+    seen on its very next request; other workers pick it up on their next
+    refresh.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def mark_stale(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def _refresh_if_stale(self, db: Session) -> None:
+        now = time.monotonic()
+        loaded_at = self._loaded_at
+        if loaded_at is not None and now - loaded_at < self.refresh_seconds:
+            return
+        rows = db.query(UserTokenVersion.user_id, UserTokenVersion.version).all()
+        with self._lock:
+            self._versions = {user_id: version for user_id, version in rows}
+            self._loaded_at = now
+            self.refreshes += 1
+
+    def current(self, db: Session, user_id: int) -> int:
+        self._refresh_if_stale(db)
+        return self._versions.get(user_id, 0)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "revoked_users": len(self._versions),
+            "refreshes": self.refreshes,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+token_versions = TokenVersionTable(refresh_seconds=TOKEN_VERSION_REFRESH_SECONDS)
+
+
+def bump_token_version(db: Session, user_id: int) -> int:
+    """
+    Invalidate every token issued to user_id so far.
+    Runs inside the caller's transaction; call invalidate_principal()
+    after the commit.
+    """
+    row = db.query(UserTokenVersion).filter(UserTokenVersion.user_id == user_id).first()
+    if row is None:
+        row = UserTokenVersion(user_id=user_id, version=1)
+        db.add(row)
+    else:
+        row.version += 1
+    return row.version
 
 
 # ---------------------------------------------------------------------
@@ -54,34 +137,108 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
-# ---------------------------------------------------------------------
-# Fetch Current User
-# ---------------------------------------------------------------------
+def create_user_access_token(db: Session, user: User) -> str:
+    """
+    Create an access token carrying the claims require_role() authorizes from:
+    - sub: user id (string)
+    - role: user role at issue time
+    - tv: user's current token version
+    """
+    row = db.query(UserTokenVersion).filter(UserTokenVersion.user_id == user.id).first()
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "role": user.role,
+            "tv": row.version if row else 0,
+        }
+    )
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Decode JWT token and return current user."""
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str) -> dict:
+    """Verify the JWT signature/expiry and return its claims."""
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if not payload.get("sub"):
+        raise _credentials_exception()
+    return payload
+
+
+def _check_token_version(db: Session, user_id: int, payload: dict) -> None:
+    """Reject tokens issued before the user's last revocation (missing tv == 0)."""
+    if int(payload.get("tv", 0)) != token_versions.current(db, user_id):
+        raise _credentials_exception()
 
-    # SQLAlchemy 2.0: .get() is deprecated
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+# ---------------------------------------------------------------------
+# Principal cache
+# ---------------------------------------------------------------------
+
+# user_id -> dict of User column values (never a live ORM instance)
+principal_cache = TTLCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+_USER_COLUMNS = [c.key for c in User.__table__.columns]
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Drop a cached principal and force a token-version reload.
+    Call after committing anything that changes role, is_active or the password.
+    """
+    principal_cache.invalidate(int(user_id))
+    token_versions.mark_stale()
+
+
+def _load_principal(db: Session, user_id: int) -> Optional[User]:
+    """
+    Return a session-bound User for user_id, hitting the DB only on a cache miss.
+
+    The cache stores plain column values. On a hit we rebuild a detached
+    instance and merge it with load=False, so the row is attached to this
+    request's session without a SELECT (relationships still lazy-load).
+    """
+    values = principal_cache.get(user_id)
+    if values is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        principal_cache.set(user_id, {k: getattr(user, k) for k in _USER_COLUMNS})
+        return user
+
+    snapshot = User(**values)
+    make_transient_to_detached(snapshot)
+    return db.merge(snapshot, load=False)
+
+
+# ---------------------------------------------------------------------
+# Fetch Current User
+# ---------------------------------------------------------------------
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """Decode JWT token and return current user."""
+    payload = _decode_token(token)
+    user_id = int(payload["sub"])
+    _check_token_version(db, user_id, payload)
+
+    user = _load_principal(db, user_id)
 
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
 
@@ -92,15 +249,58 @@ def get_current_user(
 # Role Requirements
 # ---------------------------------------------------------------------
 
-def require_role(role: str):
-    """Return a dependency that ensures a user has a required role."""
+@dataclass(frozen=True)
+class Principal:
+    """
+    Authorized caller as described by verified token claims.
+    Returned by require_role(); load the User row only if the route needs it.
+    """
+    id: int
+    role: str
+    token_version: int
 
-    def wrapper(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role != role:
+
+def require_role(role: str, load_user: bool = False):
+    """
+    Return a dependency that ensures a user has a required role.
+
+    Authorization uses the verified role/tv claims plus the in-memory
+    token-version table, so no users row is read. Demoting or deactivating
+    a user bumps their token version, which rejects the old token.
+
+    - load_user=False: returns a Principal
+    - load_user=True: returns the User (for pages that render profile fields)
+
+    Tokens issued before role claims existed fall back to the User row.
+    """
+
+    def wrapper(
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_db),
+    ):
+        payload = _decode_token(token)
+        user_id = int(payload["sub"])
+        _check_token_version(db, user_id, payload)
+
+        token_role = payload.get("role")
+        if token_role is None or load_user:
+            user = _load_principal(db, user_id)
+            if not user:
+                raise _credentials_exception()
+            if not user.is_active:
+                raise HTTPException(status_code=400, detail="Inactive user")
+            token_role = user.role
+        else:
+            user = None
+
+        if token_role != role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
             )
-        return current_user
+
+        if load_user:
+            return user
+        return Principal(id=user_id, role=token_role, token_version=int(payload.get("tv", 0)))
 
     return wrapper
@@ -8,7 +8,8 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from .database import Base, engine
+from .database import SessionLocal, engine
+from .migrations import run_migrations
 from .routers import (
     auth,
     booking,
@@ -23,10 +24,13 @@ from .routers import (
 )
 
 from .core.security import require_role, get_current_user
+from .core.hashing import password_hasher
 from .models.user import User
+from .services.dish_taxonomy import sync_taxonomy
+from .services.export_jobs import export_job_runner
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Create / upgrade the schema (versioned, see app/migrations.py)
+run_migrations(engine)
 
 app = FastAPI(title="MealPrep API")
 
@@ -75,6 +79,26 @@ app.include_router(exports.router)  # single unified exports router
 app.include_router(onboarding.router)
 
 
+@app.on_event("startup")
+def load_dish_taxonomy():
+    """Compile the admin-edited dish taxonomy before the first request."""
+    db = SessionLocal()
+    try:
+        sync_taxonomy(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_export_jobs():
+    export_job_runner.shutdown()
+
+
 # ---------------------------------------------------------------------------
 # HTML pages
 # ---------------------------------------------------------------------------
@@ -101,7 +125,7 @@ def register_page(request: Request):
 @app.get("/dashboard/client", response_class=HTMLResponse)
 def client_dashboard(
     request: Request,
-    user: User = Depends(require_role("client")),
+    user: User = Depends(require_role("client", load_user=True)),
 ):
     """Client dashboard view."""
     return templates.TemplateResponse(
@@ -113,7 +137,7 @@ def client_dashboard(
 @app.get("/dashboard/admin", response_class=HTMLResponse)
 def admin_dashboard(
     request: Request,
-    admin_user: User = Depends(require_role("admin")),
+    admin_user: User = Depends(require_role("admin", load_user=True)),
 ):
     """Admin dashboard view."""
     return templates.TemplateResponse(
@@ -125,7 +149,7 @@ def admin_dashboard(
 @app.get("/dashboard/kitchen", response_class=HTMLResponse)
 def kitchen_dashboard(
     request: Request,
-    kitchen_user: User = Depends(require_role("kitchen")),
+    kitchen_user: User = Depends(require_role("kitchen", load_user=True)),
 ):
     """Kitchen dashboard view."""
     return templates.TemplateResponse(
@@ -0,0 +1,342 @@
+# backend/app/migrations.py
+
+"""
+Versioned schema migrations.
+
+Replaces the old `Base.metadata.create_all()` call in main.py so that existing
+mealprep.db files are upgraded in place (create_all never touches tables that
+already exist: no new columns, no new indexes).
+
+- Applied versions are recorded in `schema_migrations`.
+- Each migration runs in its own transaction. The version row is inserted
+  *first*, which takes the write lock, so when several uvicorn workers start
+  at once only one applies a migration; the others see the row and skip it.
+- 0001 creates any missing tables from the current models, so a fresh DB gets
+  the latest table shapes. Later migrations must therefore be idempotent
+  (add_column_if_missing, create index checkfirst).
+
+Run manually with:
+    python -m app.migrations          # apply pending
+    python -m app.migrations status   # list applied / pending
+"""
+
+import sys
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
+
+from .database import Base
+from . import models  # noqa: F401  (registers every model on Base.metadata)
+
+
+_meta = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers for migrations
+# ---------------------------------------------------------------------------
+
+def column_names(conn: Connection, table_name: str) -> List[str]:
+    return [c["name"] for c in inspect(conn).get_columns(table_name)]
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column_name: str) -> bool:
+    """
+    ALTER TABLE ... ADD COLUMN using the model's column definition.
+    Existing rows get the column's scalar default, if it has one.
+    """
+    if column_name in column_names(conn, table_name):
+        return False
+
+    column = Base.metadata.tables[table_name].c[column_name]
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+
+    default = column.default
+    if default is not None and default.is_scalar:
+        conn.execute(
+            text(f"UPDATE {table_name} SET {column_name} = :value WHERE {column_name} IS NULL"),
+            {"value": default.arg},
+        )
+    return True
+
+
+def create_model_indexes(conn: Connection, table_name: str) -> None:
+    """Create every index declared on the model's table that is missing."""
+    for index in Base.metadata.tables[table_name].indexes:
+        index.create(conn, checkfirst=True)
+
+
+# ---------------------------------------------------------------------------
+# Migrations
+# ---------------------------------------------------------------------------
+
+def _0001_initial_schema(conn: Connection) -> None:
+    """Create any table that doesn't exist yet (fresh databases)."""
+    Base.metadata.create_all(bind=conn)
+
+
+def _0002_legacy_drift(conn: Connection) -> None:
+    """
+    Bring early mealprep.db files in line with the models:
+    - regions.available_lunch / available_dinner were added after the table
+    - menu_days still has the old per-date layout (date NOT NULL UNIQUE),
+      which makes every insert from POST /admin/menu fail
+    """
+    add_column_if_missing(conn, "regions", "available_lunch")
+    add_column_if_missing(conn, "regions", "available_dinner")
+
+    if "date" not in column_names(conn, "menu_days"):
+        return
+
+    # SQLite can't drop a UNIQUE column: rebuild the table from the model.
+    conn.execute(text("DROP INDEX IF EXISTS ix_menu_days_id"))
+    conn.execute(text("ALTER TABLE menu_days RENAME TO menu_days_legacy"))
+    Base.metadata.tables["menu_days"].create(conn)
+    conn.execute(
+        text(
+            "INSERT INTO menu_days (id, day_number, dish_a, dish_b, calories_a, calories_b) "
+            "SELECT id, day_number, dish_a, dish_b, calories_a, calories_b "
+            "FROM menu_days_legacy "
+            "WHERE id IN ("
+            "  SELECT MIN(id) FROM menu_days_legacy "
+            "  WHERE day_number IS NOT NULL GROUP BY day_number"
+            ")"
+        )
+    )
+    conn.execute(text("DROP TABLE menu_days_legacy"))
+
+
+def _0003_booking_hot_path_indexes(conn: Connection) -> None:
+    """
+    - bookings (delivery_date, time_block), partial: kitchen day, exports,
+      admin weekly summary
+    - bookings (user_id, delivery_date): client booking list, weekly totals
+    - addresses (user_id), onboarding_first_week_selections (draft_id)
+    """
+    create_model_indexes(conn, "bookings")
+    create_model_indexes(conn, "addresses")
+    create_model_indexes(conn, "onboarding_first_week_selections")
+
+
+def _0004_week_locks(conn: Connection) -> None:
+    """
+    Bookings can now be "locked" after cutoff and still be delivered, so the
+    partial index moves from status = 'active' to status != 'cancelled'.
+    Adds service_week_locks.
+    """
+    conn.execute(text("DROP INDEX IF EXISTS ix_bookings_active_date_time"))
+    create_model_indexes(conn, "bookings")
+    Base.metadata.tables["service_week_locks"].create(conn, checkfirst=True)
+
+
+def _0005_week_snapshots(conn: Connection) -> None:
+    """
+    Denormalized snapshot of locked weeks. Weeks locked before this migration
+    have snapshot_at NULL and are snapshotted by the next lock job run.
+    """
+    add_column_if_missing(conn, "service_week_locks", "snapshot_at")
+    Base.metadata.tables["week_snapshot_bookings"].create(conn, checkfirst=True)
+    Base.metadata.tables["week_snapshot_slots"].create(conn, checkfirst=True)
+    create_model_indexes(conn, "week_snapshot_bookings")
+    create_model_indexes(conn, "week_snapshot_slots")
+
+
+def _0006_data_versions(conn: Connection) -> None:
+    """Version counters for per-worker in-memory caches (menu rotation, ...)."""
+    Base.metadata.tables["data_versions"].create(conn, checkfirst=True)
+
+
+def _0007_menu_dish_types(conn: Connection) -> None:
+    """Stored dish types on menu_days, backfilled from the dish names."""
+    from .services.dish_type import _FISH_KEYWORDS, DishMatcher
+
+    # The fish/meat classifier of the time; richer taxonomies (0008) only
+    # apply through the reclassification job, which reports flipped picks.
+    infer_dish_type = DishMatcher([("fish", _FISH_KEYWORDS)]).classify
+
+    add_column_if_missing(conn, "menu_days", "dish_a_type")
+    add_column_if_missing(conn, "menu_days", "dish_b_type")
+    add_column_if_missing(conn, "menu_days", "dish_types_manual")
+
+    rows = conn.execute(text("SELECT id, dish_a, dish_b FROM menu_days")).all()
+    if rows:
+        conn.execute(
+            text("UPDATE menu_days SET dish_a_type = :a, dish_b_type = :b WHERE id = :id"),
+            [
+                {"id": r.id, "a": infer_dish_type(r.dish_a), "b": infer_dish_type(r.dish_b)}
+                for r in rows
+            ],
+        )
+
+
+def _0008_dish_taxonomy(conn: Connection) -> None:
+    """
+    dish_categories, seeded with the built-in taxonomy (fish, poultry, meat,
+    vegetarian, vegan; default meat). Stored MenuDay types only change when
+    a day is saved or the reclassification job runs.
+    """
+    from .services.dish_type import DEFAULT_DISH_TYPE, DEFAULT_TAXONOMY
+
+    table = Base.metadata.tables["dish_categories"]
+    table.create(conn, checkfirst=True)
+    if conn.execute(select(table.c.name).limit(1)).first() is None:
+        conn.execute(
+            table.insert(),
+            [
+                {
+                    "name": name,
+                    "priority": priority,
+                    "keywords": keywords,
+                    "is_default": name == DEFAULT_DISH_TYPE,
+                    "updated_at": datetime.utcnow(),
+                }
+                for name, priority, keywords in DEFAULT_TAXONOMY
+            ],
+        )
+
+
+def _0009_export_jobs(conn: Connection) -> None:
+    """Background export jobs (POST /admin/exports)."""
+    Base.metadata.tables["export_jobs"].create(conn, checkfirst=True)
+
+
+def _0010_export_job_compression(conn: Connection) -> None:
+    """export_jobs.compression (gzip output)."""
+    add_column_if_missing(conn, "export_jobs", "compression")
+
+
+def _0011_user_created_at(conn: Connection) -> None:
+    """
+    users.created_at, backfilled from the earliest trace of each account:
+    its onboarding draft or its first booking. Accounts with neither get
+    the migration time.
+    """
+    add_column_if_missing(conn, "users", "created_at")
+
+    users = Base.metadata.tables["users"]
+    drafts = Base.metadata.tables["onboarding_drafts"]
+    bookings = Base.metadata.tables["bookings"]
+
+    seen: Dict[int, datetime] = {}
+    for user_id, created_at in conn.execute(
+        select(users.c.id, drafts.c.created_at).join(drafts, drafts.c.id == users.c.onboarding_draft_id)
+    ):
+        seen[user_id] = created_at
+    for user_id, created_at in conn.execute(
+        select(bookings.c.user_id, func.min(bookings.c.created_at)).group_by(bookings.c.user_id)
+    ):
+        if created_at is not None:
+            seen[user_id] = min(seen.get(user_id, created_at), created_at)
+
+    now = datetime.utcnow()
+    missing = conn.execute(select(users.c.id).where(users.c.created_at.is_(None))).scalars().all()
+    if missing:
+        conn.execute(
+            users.update().where(users.c.id == bindparam("b_id")).values(created_at=bindparam("b_at")),
+            [{"b_id": user_id, "b_at": seen.get(user_id, now)} for user_id in missing],
+        )
+
+
+def _0012_booking_cancelled_index(conn: Connection) -> None:
+    """bookings (delivery_date, time_block) where cancelled: exports with status=cancelled."""
+    create_model_indexes(conn, "bookings")
+
+
+def _0013_recipe_lines(conn: Connection) -> None:
+    """Recipes of the rotation dishes (ingredient bill of materials)."""
+    Base.metadata.tables["recipe_lines"].create(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "initial_schema", _0001_initial_schema),
+    (2, "legacy_drift", _0002_legacy_drift),
+    (3, "booking_hot_path_indexes", _0003_booking_hot_path_indexes),
+    (4, "week_locks", _0004_week_locks),
+    (5, "week_snapshots", _0005_week_snapshots),
+    (6, "data_versions", _0006_data_versions),
+    (7, "menu_dish_types", _0007_menu_dish_types),
+    (8, "dish_taxonomy", _0008_dish_taxonomy),
+    (9, "export_jobs", _0009_export_jobs),
+    (10, "export_job_compression", _0010_export_job_compression),
+    (11, "user_created_at", _0011_user_created_at),
+    (12, "booking_cancelled_index", _0012_booking_cancelled_index),
+    (13, "recipe_lines", _0013_recipe_lines),
+]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def applied_versions(engine: Engine) -> List[int]:
+    _meta.create_all(bind=engine)
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(select(schema_migrations.c.version))]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order. Returns the versions applied now."""
+    done = set(applied_versions(engine))
+    applied_now: List[int] = []
+
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            try:
+                conn.execute(
+                    schema_migrations.insert().values(
+                        version=version, name=name, applied_at=datetime.utcnow()
+                    )
+                )
+            except IntegrityError:
+                # Another worker applied it between our read and the insert.
+                continue
+            migrate(conn)
+        applied_now.append(version)
+
+    return applied_now
+
+
+def main(argv: List[str]) -> int:
+    from .database import engine
+
+    if argv and argv[0] == "status":
+        done = set(applied_versions(engine))
+        for version, name, _ in MIGRATIONS:
+            state = "applied" if version in done else "pending"
+            print(f"{version:04d} {name:<32} {state}")
+        return 0
+
+    applied = run_migrations(engine)
+    print(f"applied {len(applied)} migration(s): {applied}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
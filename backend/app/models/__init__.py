@@ -1,20 +1,37 @@
 # backend/app/models/__init__.py
 
-from .user import User
+from .user import User, UserTokenVersion
 from .region import Region
 from .address import Address
-from .menu import MenuDay
-from .booking import Booking
+from .menu import MenuDay, DishCategory, RecipeLine
+from .data_version import DataVersion
+from .export_job import ExportJob
+from .booking import (
+    Booking,
+    WeeklyMealCounter,
+    ServiceWeekLock,
+    WeekSnapshotBooking,
+    WeekSnapshotSlot,
+)
 
 # Slice 1
 from .onboarding import OnboardingDraft, OnboardingBehaviorCell
 
 __all__ = [
     "User",
+    "UserTokenVersion",
     "Region",
     "Address",
     "MenuDay",
+    "DishCategory",
+    "RecipeLine",
+    "DataVersion",
+    "ExportJob",
     "Booking",
+    "WeeklyMealCounter",
+    "ServiceWeekLock",
+    "WeekSnapshotBooking",
+    "WeekSnapshotSlot",
     "OnboardingDraft",
     "OnboardingBehaviorCell",
 ]
@@ -12,7 +12,7 @@ class Address(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     # FK to users table
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Human label: "Home", "Work", "Gym", etc.
     label = Column(String(50), nullable=False)
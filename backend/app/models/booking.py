@@ -4,10 +4,13 @@ from datetime import datetime
 from sqlalchemy import (
     Column,
     Integer,
+    PrimaryKeyConstraint,
     String,
     Date,
     DateTime,
     ForeignKey,
+    Index,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -17,6 +20,28 @@ from ..database import Base
 class Booking(Base):
     __tablename__ = "bookings"
 
+    __table_args__ = (
+        # Kitchen / export / admin: delivery_date (= or range) + status != "cancelled",
+        # ordered by time_block. Partial, so cancelled rows don't bloat it.
+        Index(
+            "ix_bookings_live_date_time",
+            "delivery_date",
+            "time_block",
+            sqlite_where=text("status != 'cancelled'"),
+            postgresql_where=text("status != 'cancelled'"),
+        ),
+        # Exports of cancelled bookings (status=cancelled), per delivery date
+        Index(
+            "ix_bookings_cancelled_date",
+            "delivery_date",
+            "time_block",
+            sqlite_where=text("status = 'cancelled'"),
+            postgresql_where=text("status = 'cancelled'"),
+        ),
+        # Client views, weekly totals: user_id + date range
+        Index("ix_bookings_user_date", "user_id", "delivery_date"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     # Foreign keys
@@ -32,6 +57,8 @@ class Booking(Base):
     dish_choice = Column(String(10), nullable=True)
 
     # Booking status: active / cancelled / locked (after Monday midnight)
+    # "locked" is set in bulk by services/week_locks once the week's cutoff
+    # passes. Readers that mean "will be cooked" filter status != "cancelled".
     status = Column(String(20), nullable=False, default="active")
 
     # Timestamps
@@ -46,3 +73,91 @@ class Booking(Base):
     # Relationships
     user = relationship("User", back_populates="bookings")
     address = relationship("Address")
+
+
+class WeeklyMealCounter(Base):
+    """
+    Running total of non-cancelled meals per client per service week.
+
+    Maintained in the same transaction as booking writes so the
+    MAX_MEALS_PER_WEEK check is a single conditional UPDATE instead of a
+    scan of the week's bookings. Rebuild with:
+        python -m app.services.meal_counters rebuild
+    """
+    __tablename__ = "weekly_meal_counters"
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "week_start", name="pk_weekly_meal_counters"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    week_start = Column(Date, nullable=False)                 # Wednesday
+    active_meals = Column(Integer, nullable=False, default=0)
+
+
+class ServiceWeekLock(Base):
+    """
+    Marker written when a service week passes its cutoff and its bookings are
+    flipped to "locked". A week with a marker is immutable, so readers may
+    cache or snapshot it indefinitely.
+    """
+    __tablename__ = "service_week_locks"
+
+    week_start = Column(Date, primary_key=True)               # Wednesday
+    locked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    bookings_locked = Column(Integer, nullable=False, default=0)
+    # Set once the week's rows are in week_snapshot_bookings / _slots
+    snapshot_at = Column(DateTime, nullable=True)
+
+
+class WeekSnapshotBooking(Base):
+    """
+    One denormalized row per booking of a locked week: client contact,
+    address and dish names as they were at lock time. Written once by
+    services/week_snapshots; post-cutoff readers use it without joins.
+    No foreign keys on purpose: the snapshot outlives later edits/deletes.
+    """
+    __tablename__ = "week_snapshot_bookings"
+
+    __table_args__ = (
+        Index("ix_week_snapshot_bookings_date_time", "delivery_date", "time_block"),
+    )
+
+    booking_id = Column(Integer, primary_key=True)
+    week_start = Column(Date, nullable=False, index=True)
+    delivery_date = Column(Date, nullable=False)
+    time_block = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+
+    user_id = Column(Integer, nullable=False)
+    client_name = Column(String, nullable=True)
+    client_phone = Column(String, nullable=True)
+
+    address_id = Column(Integer, nullable=False)
+    address_label = Column(String(50), nullable=True)
+    address_line1 = Column(String(255), nullable=True)
+    address_line2 = Column(String(255), nullable=True)
+    address_city = Column(String(100), nullable=True)
+    address_postal_code = Column(String(20), nullable=True)
+    address_text = Column(String, nullable=False, default="")   # export format
+
+    meals = Column(Integer, nullable=False)
+    dish_choice = Column(String(10), nullable=True)
+    dish_name = Column(String, nullable=False, default="")      # frozen rotation names
+
+
+class WeekSnapshotSlot(Base):
+    """Per day / time block totals of a locked week (written with the snapshot)."""
+    __tablename__ = "week_snapshot_slots"
+
+    __table_args__ = (
+        PrimaryKeyConstraint("delivery_date", "time_block", name="pk_week_snapshot_slots"),
+    )
+
+    week_start = Column(Date, nullable=False, index=True)
+    delivery_date = Column(Date, nullable=False)
+    time_block = Column(String(20), nullable=False)
+    bookings = Column(Integer, nullable=False, default=0)
+    meals = Column(Integer, nullable=False, default=0)
+    portions_a = Column(Integer, nullable=False, default=0)
+    portions_b = Column(Integer, nullable=False, default=0)
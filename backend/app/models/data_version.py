@@ -0,0 +1,21 @@
+# backend/app/models/data_version.py
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from ..database import Base
+
+
+class DataVersion(Base):
+    """
+    Named version counters for data that workers cache in memory
+    (e.g. "menu_rotation"). Writers bump the counter in the same transaction
+    as the change; each uvicorn worker compares it with the version it has
+    loaded. A missing row means version 0.
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,45 @@
+# backend/app/models/export_job.py
+
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, Date, DateTime, Index, Integer, String
+
+from ..database import Base
+
+
+class ExportJob(Base):
+    """
+    Background export of a booking date range (services/export_jobs).
+    Lives in the DB so any worker can report a job's progress and serve its
+    file; the file itself is in EXPORT_JOB_DIR under the job id.
+    status: queued -> running -> done | failed
+    """
+    __tablename__ = "export_jobs"
+
+    __table_args__ = (
+        # Concurrency limit and stale-job sweep: jobs by status
+        Index("ix_export_jobs_status_updated", "status", "updated_at"),
+    )
+
+    id = Column(String(36), primary_key=True)                 # uuid4
+    status = Column(String(20), nullable=False, default="queued")
+    requested_by = Column(Integer, nullable=True)             # admin user id
+
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    filters = Column(JSON, nullable=False, default=dict)      # user_id, time_block
+    format = Column(String(10), nullable=False, default="csv")
+    compression = Column(String(10), nullable=True)           # None | "gzip"
+
+    # Progress
+    days_total = Column(Integer, nullable=False, default=0)
+    days_done = Column(Integer, nullable=False, default=0)
+    rows_written = Column(Integer, nullable=False, default=0)
+    size_bytes = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Heartbeat: bumped with every progress update
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
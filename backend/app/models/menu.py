@@ -1,6 +1,18 @@
 # backend/app/models/menu.py
 
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from ..database import Base
 
 
@@ -19,3 +31,50 @@ class MenuDay(Base):
     # Optional nutrition fields
     calories_a = Column(Integer, nullable=True)
     calories_b = Column(Integer, nullable=True)
+
+    # Dish types (a dish_categories name, e.g. "meat"), stored at write time so readers never
+    # reclassify. Writers set them: inferred from the name (services/dish_type)
+    # unless an admin set them by hand (dish_types_manual).
+    dish_a_type = Column(String(10), nullable=False, server_default="meat")
+    dish_b_type = Column(String(10), nullable=False, server_default="meat")
+    dish_types_manual = Column(Boolean, nullable=False, default=False, server_default="0")
+
+
+class RecipeLine(Base):
+    """
+    One ingredient of a rotation dish (menu day + "A" / "B"): the net
+    quantity per portion, in unit, and the share lost in preparation
+    (peeling, trimming, cooking), so the quantity to buy per portion is
+    quantity / (1 - yield_loss). Replaced a dish at a time via
+    PUT /admin/menu/{day_number}/recipes/{dish}; edits bump the "recipes"
+    data version (services/procurement).
+    """
+    __tablename__ = "recipe_lines"
+
+    __table_args__ = (
+        UniqueConstraint("menu_day_id", "dish", "ingredient", "unit", name="uq_recipe_lines_dish_ingredient"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    menu_day_id = Column(Integer, ForeignKey("menu_days.id", ondelete="CASCADE"), nullable=False, index=True)
+    dish = Column(String(1), nullable=False)                      # "A" | "B"
+    ingredient = Column(String(100), nullable=False)
+    quantity = Column(Float, nullable=False)                      # net, per portion
+    unit = Column(String(20), nullable=False)                     # g, ml, pcs, ...
+    yield_loss = Column(Float, nullable=False, default=0.0, server_default="0")  # 0 <= x < 1
+
+
+class DishCategory(Base):
+    """
+    Admin-editable dish taxonomy: category -> keywords, with a priority.
+    The highest-priority category whose keyword occurs in a dish name is the
+    dish type; the is_default category is used when nothing matches.
+    Edits bump the "dish_taxonomy" data version (services/dish_taxonomy).
+    """
+    __tablename__ = "dish_categories"
+
+    name = Column(String(10), primary_key=True)               # fits BehaviorCell.pref
+    priority = Column(Integer, nullable=False, default=0)     # higher wins
+    keywords = Column(JSON, nullable=False, default=list)     # list of strings
+    is_default = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
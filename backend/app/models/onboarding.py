@@ -85,7 +85,7 @@ class OnboardingFirstWeekSelection(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    draft_id = Column(String, ForeignKey("onboarding_drafts.id", ondelete="CASCADE"), nullable=False)
+    draft_id = Column(String, ForeignKey("onboarding_drafts.id", ondelete="CASCADE"), nullable=False, index=True)
     weekday_index = Column(Integer, nullable=False)  # 0..6 (Wed..Tue)
 
     delivery_date = Column(Date, nullable=False)
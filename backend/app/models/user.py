@@ -1,6 +1,8 @@
 # backend/app/models/user.py
 
-from sqlalchemy import Column, Integer, String, Boolean
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -35,6 +37,10 @@ class User(Base):
     # Account activation (used by security.py)
     is_active = Column(Boolean, default=True)
 
+    # Nullable only because SQLite can't add a NOT NULL column; migration
+    # 0011 backfilled existing accounts
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+
     # Relationships
     addresses = relationship(
         "Address",
@@ -47,3 +53,18 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan",
     )
+
+
+class UserTokenVersion(Base):
+    """
+    Per-user access-token version (revocation list).
+
+    Tokens carry the version they were issued with ("tv" claim). Bumping the
+    row invalidates every token issued before. Users without a row are at 0,
+    so the table only holds users whose tokens were ever revoked.
+    """
+    __tablename__ = "user_token_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -7,6 +7,8 @@ from ..core.deps import get_db_session, get_current_client
 from ..models.address import Address
 from ..models.user import User
 from ..schemas.address import AddressCreate, AddressUpdate, AddressOut
+from ..services.data_versions import bump_version
+from ..services.export_data import CLIENTS_VERSION_NAME
 
 router = APIRouter(prefix="/addresses", tags=["addresses"])
 
@@ -94,6 +96,7 @@ def update_address(
     for field, value in update_data.items():
         setattr(addr, field, value)
 
+    bump_version(db, CLIENTS_VERSION_NAME)  # address text in booking exports
     db.commit()
     db.refresh(addr)
     return addr
@@ -119,5 +122,6 @@ def delete_address(
     # TODO: prevent deleting if upcoming bookings use this address
 
     db.delete(addr)
+    bump_version(db, CLIENTS_VERSION_NAME)
     db.commit()
     return
@@ -1,29 +1,62 @@
 # backend/app/routers/admin.py
 
 from datetime import date, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..core.deps import get_db_session
-from ..core.security import require_role
+from ..core.security import (
+    Principal,
+    require_role,
+    bump_token_version,
+    invalidate_principal,
+    principal_cache,
+    token_versions,
+)
+from ..core.hashing import password_hasher
 from ..models.user import User
 from ..models.booking import Booking as BookingModel
-from ..models.menu import MenuDay
-from ..schemas.menu import MenuDayCreate, MenuDayOut
+from ..models.menu import DishCategory, MenuDay, RecipeLine
+from ..schemas.menu import (
+    DishCategoryIn,
+    DishCategoryOut,
+    DishType,
+    MenuDayCreate,
+    MenuDayOut,
+    RecipeLineIn,
+    RecipeLineOut,
+)
+from ..services.dish_taxonomy import (
+    bump_taxonomy_version,
+    known_dish_types,
+    reclassify_menu,
+    sync_taxonomy,
+)
+from ..services.dish_type import current_matcher, infer_dish_type
+from ..services.export_cache import export_cache
+from ..services.export_jobs import export_job_runner
+from ..services.kitchen_board import kitchen_hub
+from ..services.menu_rotation import bump_menu_version, menu_rotation
+from ..services.procurement import DISHES, bump_recipes_version
+from ..services.service_week import get_week_start
+from .menu import public_week_cache
+from ..services.subscriber_weeks import generate_subscriber_week, next_service_week
+from ..services.week_locks import is_week_locked, lock_due_weeks
+from ..services.week_snapshots import slot_totals, snapshot_rows, snapshot_slots
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
-def _get_week_start(d: date) -> date:
-    """
-    Wednesday-based week:
-    Service week runs from Wednesday (day 0) to Tuesday (day 6).
-    """
-    weekday = d.weekday()  # Monday = 0
-    offset = (weekday - 2) % 7  # Wednesday = 2
-    return d - timedelta(days=offset)
+def _check_dish_types(db: Session, *dish_types: Optional[str]) -> None:
+    known = known_dish_types(db)
+    for t in dish_types:
+        if t is not None and t not in known:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown dish type {t!r} (known: {', '.join(sorted(known))})",
+            )
 
 
 # ---------------------------------------------------------------------------
@@ -34,7 +67,7 @@ def _get_week_start(d: date) -> date:
 @router.get("/users", response_model=List[Dict])
 def list_users(
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     users = db.query(User).order_by(User.id).all()
     return [
@@ -55,7 +88,7 @@ def update_user_role(
     user_id: int,
     role: str,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     if role not in ("client", "admin", "kitchen"):
         raise HTTPException(status_code=400, detail="Invalid role")
@@ -65,7 +98,38 @@ def update_user_role(
         raise HTTPException(status_code=404, detail="User not found")
 
     user.role = role
+    bump_token_version(db, user.id)
+    db.commit()
+    invalidate_principal(user.id)
+    db.refresh(user)
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": user.role,
+        "is_active": user.is_active,
+    }
+
+
+@router.patch("/users/{user_id}/active", response_model=Dict)
+def update_user_active(
+    user_id: int,
+    is_active: bool,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Activate or deactivate a user account.
+    Existing tokens are revoked, so deactivation takes effect immediately.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.is_active = is_active
+    bump_token_version(db, user.id)
     db.commit()
+    invalidate_principal(user.id)
     db.refresh(user)
     return {
         "id": user.id,
@@ -84,7 +148,7 @@ def update_user_role(
 def create_or_update_menu_day(
     payload: MenuDayCreate,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     """
     Create or update a menu day in the 14-day rotation.
@@ -93,7 +157,15 @@ def create_or_update_menu_day(
     - day_number: int (1–14)
     - dish_a, dish_b
     - calories_a, calories_b (optional)
+    - dish_a_type, dish_b_type (optional dish taxonomy category; inferred
+      from the names when omitted)
+
+    Bumps the rotation version so every worker reloads its menu cache.
     """
+    _check_dish_types(db, payload.dish_a_type, payload.dish_b_type)  # also syncs the taxonomy
+    dish_a_type = payload.dish_a_type or infer_dish_type(payload.dish_a)
+    dish_b_type = payload.dish_b_type or infer_dish_type(payload.dish_b)
+    dish_types_manual = payload.dish_a_type is not None or payload.dish_b_type is not None
 
     existing = db.query(MenuDay).filter(MenuDay.day_number == payload.day_number).first()
 
@@ -102,7 +174,12 @@ def create_or_update_menu_day(
         existing.dish_b = payload.dish_b
         existing.calories_a = payload.calories_a
         existing.calories_b = payload.calories_b
+        existing.dish_a_type = dish_a_type
+        existing.dish_b_type = dish_b_type
+        existing.dish_types_manual = dish_types_manual
+        bump_menu_version(db)
         db.commit()
+        menu_rotation.mark_stale()
         db.refresh(existing)
         return existing
 
@@ -112,9 +189,46 @@ def create_or_update_menu_day(
         dish_b=payload.dish_b,
         calories_a=payload.calories_a,
         calories_b=payload.calories_b,
+        dish_a_type=dish_a_type,
+        dish_b_type=dish_b_type,
+        dish_types_manual=dish_types_manual,
     )
     db.add(m)
+    bump_menu_version(db)
+    db.commit()
+    menu_rotation.mark_stale()
+    db.refresh(m)
+    return m
+
+
+@router.patch("/menu/{day_number}/dish-types", response_model=MenuDayOut)
+def override_menu_dish_types(
+    day_number: int,
+    dish_a_type: Optional[DishType] = None,
+    dish_b_type: Optional[DishType] = None,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Correct a misclassified dish without resubmitting the day.
+    The override sticks until the day is saved again via POST /admin/menu.
+    """
+    if dish_a_type is None and dish_b_type is None:
+        raise HTTPException(status_code=400, detail="Give dish_a_type and/or dish_b_type")
+    _check_dish_types(db, dish_a_type, dish_b_type)
+
+    m = db.query(MenuDay).filter(MenuDay.day_number == day_number).first()
+    if not m:
+        raise HTTPException(status_code=404, detail="Menu not found for that day_number")
+
+    if dish_a_type is not None:
+        m.dish_a_type = dish_a_type
+    if dish_b_type is not None:
+        m.dish_b_type = dish_b_type
+    m.dish_types_manual = True
+    bump_menu_version(db)
     db.commit()
+    menu_rotation.mark_stale()
     db.refresh(m)
     return m
 
@@ -123,7 +237,7 @@ def create_or_update_menu_day(
 def get_menu_for_day(
     day_number: int,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     """
     Get the MenuDay entry for a given rotation day (1–14).
@@ -137,7 +251,7 @@ def get_menu_for_day(
 @router.get("/menu", response_model=List[MenuDayOut])
 def list_menu(
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     """
     List all menu days in the rotation (ideally 14).
@@ -146,6 +260,90 @@ def list_menu(
     return items
 
 
+# ---------------------------------------------------------------------------
+# RECIPES (INGREDIENTS PER PORTION)
+# ---------------------------------------------------------------------------
+
+def _menu_day_or_404(db: Session, day_number: int) -> MenuDay:
+    m = db.query(MenuDay).filter(MenuDay.day_number == day_number).first()
+    if not m:
+        raise HTTPException(status_code=404, detail="Menu not found for that day_number")
+    return m
+
+
+@router.get("/menu/{day_number}/recipes", response_model=Dict[str, List[RecipeLineOut]])
+def get_menu_day_recipes(
+    day_number: int,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Recipe lines of both dishes of a rotation day: {"A": [...], "B": [...]}.
+    """
+    m = _menu_day_or_404(db, day_number)
+    recipes: Dict[str, List[RecipeLine]] = {dish: [] for dish in DISHES}
+    for line in (
+        db.query(RecipeLine)
+        .filter(RecipeLine.menu_day_id == m.id)
+        .order_by(RecipeLine.dish, RecipeLine.ingredient, RecipeLine.unit)
+    ):
+        recipes[line.dish].append(line)
+    return recipes
+
+
+@router.put("/menu/{day_number}/recipes/{dish}", response_model=List[RecipeLineOut])
+def replace_dish_recipe(
+    day_number: int,
+    dish: str,
+    payload: List[RecipeLineIn],
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Replace the recipe of dish "A" or "B" of a rotation day (an empty list
+    removes it). Quantities are per portion; yield_loss is the share lost
+    in preparation. Ingredient names are trimmed; one line per ingredient
+    and unit. Cached ingredient exports of locked weeks are superseded.
+    """
+    if dish not in DISHES:
+        raise HTTPException(status_code=400, detail="dish must be 'A' or 'B'")
+    m = _menu_day_or_404(db, day_number)
+
+    lines = []
+    seen = set()
+    for item in payload:
+        ingredient = " ".join(item.ingredient.split())
+        unit = item.unit.strip()
+        if not ingredient or not unit:
+            raise HTTPException(status_code=400, detail="ingredient and unit must not be blank")
+        if (ingredient.casefold(), unit) in seen:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{ingredient!r} ({unit}) is listed twice",
+            )
+        seen.add((ingredient.casefold(), unit))
+        lines.append(
+            RecipeLine(
+                menu_day_id=m.id,
+                dish=dish,
+                ingredient=ingredient,
+                quantity=item.quantity,
+                unit=unit,
+                yield_loss=item.yield_loss,
+            )
+        )
+
+    db.query(RecipeLine).filter(
+        RecipeLine.menu_day_id == m.id, RecipeLine.dish == dish
+    ).delete(synchronize_session=False)
+    db.add_all(lines)
+    bump_recipes_version(db)
+    db.commit()
+    for line in lines:
+        db.refresh(line)
+    return sorted(lines, key=lambda line: (line.ingredient, line.unit))
+
+
 # ---------------------------------------------------------------------------
 # BOOKINGS + WEEKLY SUMMARY
 # ---------------------------------------------------------------------------
@@ -154,7 +352,7 @@ def list_menu(
 @router.get("/bookings", response_model=List[Dict])
 def list_all_bookings(
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     bookings = (
         db.query(BookingModel)
@@ -180,51 +378,258 @@ def list_all_bookings(
 def weekly_summary(
     week_for: date = Query(..., description="Any date inside the service week"),
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     """
     Summarize all active bookings in the Wednesday–Tuesday service week
-    that contains the given date.
+    that contains the given date, with per day / time block totals.
+    Locked weeks are read from the week snapshot.
     """
-    week_start = _get_week_start(week_for)
+    week_start = get_week_start(week_for)
     week_end = week_start + timedelta(days=6)
 
-    bookings = (
-        db.query(BookingModel)
-        .filter(
-            BookingModel.delivery_date >= week_start,
-            BookingModel.delivery_date <= week_end,
-            BookingModel.status == "active",
-        )
-        .all()
-    )
-    if not bookings:
-        raise HTTPException(status_code=404, detail="No bookings for this week")
-
-    by_user: Dict[int, Dict] = {}
-    total_meals = 0
-
-    for b in bookings:
-        client = by_user.setdefault(
-            b.user_id,
-            {"user_id": b.user_id, "total_meals": 0, "bookings": []},
+    frozen = snapshot_rows(db, week_start, week_end)
+    if frozen is not None:
+        bookings = [
+            {
+                "id": r.booking_id,
+                "user_id": r.user_id,
+                "date": r.delivery_date,
+                "time_block": r.time_block,
+                "meals": r.meals,
+                "dish_choice": r.dish_choice,
+                "status": r.status,
+            }
+            for r in frozen
+        ]
+        slots = [
+            {
+                "date": r.delivery_date,
+                "time_block": r.time_block,
+                "bookings": r.bookings,
+                "meals": r.meals,
+                "portions_a": r.portions_a,
+                "portions_b": r.portions_b,
+            }
+            for r in snapshot_slots(db, week_start, week_end)
+        ]
+    else:
+        live = (
+            db.query(BookingModel)
+            .filter(
+                BookingModel.delivery_date >= week_start,
+                BookingModel.delivery_date <= week_end,
+                BookingModel.status != "cancelled",
+            )
+            .all()
         )
-        client["total_meals"] += b.meals
-        total_meals += b.meals
-        client["bookings"].append(
+        bookings = [
             {
                 "id": b.id,
+                "user_id": b.user_id,
                 "date": b.delivery_date,
                 "time_block": b.time_block,
                 "meals": b.meals,
                 "dish_choice": b.dish_choice,
                 "status": b.status,
             }
+            for b in live
+        ]
+        slots = [
+            {"date": d, "time_block": t, **totals}
+            for (d, t), totals in slot_totals(live).items()
+        ]
+
+    if not bookings:
+        raise HTTPException(status_code=404, detail="No bookings for this week")
+
+    by_user: Dict[int, Dict] = {}
+    total_meals = 0
+
+    for b in bookings:
+        user_id = b.pop("user_id")
+        client = by_user.setdefault(
+            user_id,
+            {"user_id": user_id, "total_meals": 0, "bookings": []},
         )
+        client["total_meals"] += b["meals"]
+        total_meals += b["meals"]
+        client["bookings"].append(b)
 
     return {
         "week_start": week_start,
         "week_end": week_end,
+        "locked": frozen is not None or is_week_locked(db, week_start),
         "total_meals_all_clients": total_meals,
         "clients": list(by_user.values()),
+        "slots": slots,
+    }
+
+
+# ---------------------------------------------------------------------------
+# DISH TAXONOMY
+# ---------------------------------------------------------------------------
+
+@router.get("/dish-taxonomy", response_model=List[DishCategoryOut])
+def list_dish_taxonomy(
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    The dish type categories, highest priority first.
+    """
+    return (
+        db.query(DishCategory)
+        .order_by(DishCategory.priority.desc(), DishCategory.name.asc())
+        .all()
+    )
+
+
+@router.put("/dish-taxonomy/{name}", response_model=DishCategoryOut)
+def upsert_dish_category(
+    name: str,
+    payload: DishCategoryIn,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Create or replace one category. Takes effect in every worker for new
+    classifications; stored menu types change only when a day is saved
+    again or POST /admin/jobs/reclassify-dishes runs.
+    """
+    if not (name.isascii() and name.isalnum() and name.islower()) or len(name) > 10 or name == "blank":
+        raise HTTPException(
+            status_code=400,
+            detail="Category name must be 1-10 lowercase letters/digits and not 'blank'",
+        )
+
+    if payload.is_default:
+        db.query(DishCategory).filter(DishCategory.name != name).update(
+            {DishCategory.is_default: False}, synchronize_session=False
+        )
+    else:
+        current = db.get(DishCategory, name)
+        if current is not None and current.is_default:
+            raise HTTPException(
+                status_code=400,
+                detail="Make another category the default first",
+            )
+
+    category = db.get(DishCategory, name)
+    if category is None:
+        category = DishCategory(name=name)
+        db.add(category)
+    category.priority = payload.priority
+    category.keywords = sorted({k.strip() for k in payload.keywords if k.strip()})
+    category.is_default = payload.is_default
+    bump_taxonomy_version(db)
+    db.commit()
+    sync_taxonomy(db)
+    db.refresh(category)
+    return category
+
+
+@router.delete("/dish-taxonomy/{name}", response_model=Dict)
+def delete_dish_category(
+    name: str,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Remove a category (not the default one). Menu days still typed with it
+    are listed; run the reclassification job to retype them.
+    """
+    category = db.get(DishCategory, name)
+    if category is None:
+        raise HTTPException(status_code=404, detail="Dish category not found")
+    if category.is_default:
+        raise HTTPException(status_code=400, detail="Cannot delete the default category")
+
+    db.delete(category)
+    bump_taxonomy_version(db)
+    db.commit()
+    sync_taxonomy(db)
+
+    still_used = [
+        m.day_number
+        for m in db.query(MenuDay.day_number)
+        .filter((MenuDay.dish_a_type == name) | (MenuDay.dish_b_type == name))
+        .order_by(MenuDay.day_number)
+    ]
+    return {"deleted": name, "menu_days_still_using": still_used}
+
+
+# ---------------------------------------------------------------------------
+# JOBS
+# ---------------------------------------------------------------------------
+
+
+@router.post("/jobs/subscriber-week", response_model=Dict)
+def run_subscriber_week_job(
+    week_start: Optional[date] = Query(
+        None,
+        description="Wednesday that starts the service week (before its cutoff); defaults to the first open week.",
+    ),
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Materialize the service week's bookings for every subscriber (idempotent).
+    Weeks past their cutoff are refused (422).
+    Same job as `python -m app.services.subscriber_weeks`.
+    """
+    try:
+        return generate_subscriber_week(db, week_start or next_service_week())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/jobs/lock-weeks", response_model=Dict)
+def run_lock_weeks_job(
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Lock the bookings of every week past its cutoff (idempotent).
+    Same job as `python -m app.services.week_locks`.
+    """
+    return lock_due_weeks(db)
+
+
+@router.post("/jobs/reclassify-dishes", response_model=Dict)
+def run_reclassify_dishes_job(
+    dry_run: bool = Query(True, description="Only report what would change"),
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Re-type every menu day (manual overrides excepted) with the current
+    taxonomy and list the subscriber auto-picks that flip.
+    Same job as `python -m app.services.dish_taxonomy`.
+    """
+    return reclassify_menu(db, dry_run=dry_run)
+
+
+# ---------------------------------------------------------------------------
+# METRICS
+# ---------------------------------------------------------------------------
+
+
+@router.get("/metrics", response_model=Dict)
+def runtime_metrics(
+    admin: Principal = Depends(require_role("admin")),
+):
+    """
+    Per-process runtime counters (each uvicorn worker reports its own).
+    """
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_versions": token_versions.stats(),
+        "password_hashing": password_hasher.stats(),
+        "menu_rotation": menu_rotation.stats(),
+        "menu_public_week_cache": public_week_cache.stats(),
+        "dish_matcher": current_matcher().stats(),
+        "export_cache": export_cache.stats(),
+        "export_jobs": export_job_runner.stats(),
+        "kitchen_stream": kitchen_hub.stats(),
     }
@@ -10,13 +10,14 @@ from ..models.onboarding import OnboardingDraft
 from ..core.deps import get_db_session
 from ..core.security import (
     get_password_hash,
-    verify_password,
-    create_access_token,
+    verify_and_update_password,
+    create_user_access_token,
+    bump_token_version,
+    invalidate_principal,
 )
 from ..models.user import User
 from ..schemas.user import UserCreate, UserOut
 from pydantic import BaseModel, EmailStr, constr
-from passlib.hash import pbkdf2_sha256
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -33,10 +34,15 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
     if not user.is_active:
         return None
+    if new_hash:
+        # Transparent rehash: stored hash used deprecated settings
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 class ResetPasswordSimple(BaseModel):
@@ -111,9 +117,7 @@ def reset_password_simple(payload: ResetPasswordSimple,
     - We check that user exists and (if phone given) phone matches.
     - Then we overwrite hashed_password.
     """
-    user = db.query(models.User).filter(
-        models.User.email == payload.email
-    ).first()
+    user = db.query(User).filter(User.email == payload.email).first()
 
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
@@ -123,10 +127,10 @@ def reset_password_simple(payload: ResetPasswordSimple,
         raise HTTPException(status_code=400, detail="Phone number does not match")
 
     # Same hashing scheme as the rest of the app
-    user.hashed_password = pbkdf2_sha256.using(rounds=29000).hash(
-        payload.new_password
-    )
+    user.hashed_password = get_password_hash(payload.new_password)
+    bump_token_version(db, user.id)
     db.commit()
+    invalidate_principal(user.id)
 
     return {"ok": True}
 
@@ -150,6 +154,6 @@ def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # sub should be a string for JWT
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # sub (string), role and token version; require_role authorizes from these
+    access_token = create_user_access_token(db, user)
     return {"access_token": access_token, "token_type": "bearer"}
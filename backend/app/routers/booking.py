@@ -1,105 +1,55 @@
 # backend/app/routers/booking.py
 from pydantic import BaseModel
-from datetime import date, time, datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
 from ..models.onboarding import OnboardingDraft, OnboardingFirstWeekSelection, OnboardingBehaviorCell
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from ..config import (
-    LUNCH_START_HOUR,
-    LUNCH_START_MINUTE,
-    LUNCH_END_HOUR,
-    LUNCH_END_MINUTE,
-    DINNER_START_HOUR,
-    DINNER_START_MINUTE,
-    DINNER_END_HOUR,
-    DINNER_END_MINUTE,
-    SLOT_MINUTES,
-    MAX_MEALS_PER_WEEK,
-)
+from ..config import MAX_MEALS_PER_WEEK
 from ..core.deps import get_db_session, get_current_client
 from ..models.booking import Booking as BookingModel
 from ..models.address import Address
 from ..models.user import User
-from ..schemas.booking import BookingCreate, BookingOut
+from ..schemas.booking import BookingCreate, BookingOut, BookingBatchCreate, BookingBatchOut
 from ..services.pricing import compute_week_pricing
-from ..services.dish_type import infer_dish_type
-from ..models.menu import MenuDay
-from ..config import MENU_ROTATION_START_DATE
+from ..services import meal_counters
+from ..services.data_versions import bump_booking_versions
+from ..services.dish_type import infer_dish_type, pick_single_dish_by_type
+from ..services.kitchen_board import publish_booking_changes
+from ..services.menu_rotation import menu_rotation
+from ..services.service_week import ALL_SLOTS, get_cutoff_for_week, get_week_start
 
 router = APIRouter(prefix="/booking", tags=["Booking"])
 
 
 # ---------------------------------------------------------------------------
-# Time slot generation
+# Weekly limit
 # ---------------------------------------------------------------------------
 
-def _generate_slots() -> List[str]:
-    slots: List[str] = []
-
-    def _range(start: time, end: time):
-        current = datetime.combine(date.today(), start)
-        finish = datetime.combine(date.today(), end)
-        delta = timedelta(minutes=SLOT_MINUTES)
-        while current < finish:
-            slot_start = current
-            slot_end = current + delta
-            slots.append(
-                f"{slot_start.strftime('%H:%M')}-{slot_end.strftime('%H:%M')}"
-            )
-            current += delta
-
-    lunch_start = time(LUNCH_START_HOUR, LUNCH_START_MINUTE)
-    lunch_end = time(LUNCH_END_HOUR, LUNCH_END_MINUTE)
-    dinner_start = time(DINNER_START_HOUR, DINNER_START_MINUTE)
-    dinner_end = time(DINNER_END_HOUR, DINNER_END_MINUTE)
-
-    _range(lunch_start, lunch_end)
-    _range(dinner_start, dinner_end)
-    return slots
-
-
-ALL_SLOTS = _generate_slots()
-
-
-# ---------------------------------------------------------------------------
-# Week + cutoff helpers
-# ---------------------------------------------------------------------------
-
-def get_week_start(d: date) -> date:
-    """
-    Wednesday-based service week.
-    Returns the Wednesday that starts the week containing the given date.
-    """
-    weekday = d.weekday()  # Monday=0
-    offset = (weekday - 2) % 7  # Wednesday=2
-    return d - timedelta(days=offset)
-
-
-def get_cutoff_for_week(week_start: date) -> datetime:
-    """
-    For a service week starting Wednesday, cutoff for CLIENT changes is
-    Monday 23:59 *before* that service week.
-    Example: week_start = Wed 8 -> cutoff = Mon 6 23:59.
-    """
-    cutoff_date = week_start - timedelta(days=2)  # Monday
-    return datetime(cutoff_date.year, cutoff_date.month, cutoff_date.day, 23, 59)
+def _raise_weekly_limit(db: Session, user_id: int, week_start: date) -> None:
+    """400 for a rejected MAX_MEALS_PER_WEEK check, with the current total."""
+    current_meals = meal_counters.current_meals(db, user_id, week_start)
+    db.rollback()
+    raise HTTPException(
+        status_code=400,
+        detail=(
+            f"Weekly limit exceeded: you already have {current_meals} meals; "
+            f"max is {MAX_MEALS_PER_WEEK}."
+        ),
+    )
 
 # ---------------------------------------------------------------------------
 # Helper function for automation for subscriber to the booking
 # ---------------------------------------------------------------------------
 
-def _rotation_day_number(day: date) -> int:
-    delta_days = (day - MENU_ROTATION_START_DATE).days
-    return (delta_days % 14) + 1
-
-def _menu_for_date(db: Session, day: date) -> dict:
-    day_no = _rotation_day_number(day)
-    m = db.query(MenuDay).filter(MenuDay.day_number == day_no).first()
+def _dish_types_for_date(db: Session, day: date) -> tuple:
+    """(dish_a_type, dish_b_type) of the rotation day, from the menu cache."""
+    m = menu_rotation.for_date(db, day)
     if not m:
-        return {"dish_a": None, "dish_b": None}
-    return {"dish_a": m.dish_a, "dish_b": m.dish_b}
+        return infer_dish_type(None), infer_dish_type(None)
+    return m.dish_a_type, m.dish_b_type
 
 
 # ---------------------------------------------------------------------------
@@ -152,7 +102,6 @@ def create_booking(
 
     # Determine service week for this booking
     week_start = get_week_start(payload.delivery_date)
-    week_end = week_start + timedelta(days=6)
 
     # Cutoff for clients (no admin bypass here; this router is for clients)
     cutoff = get_cutoff_for_week(week_start)
@@ -165,27 +114,11 @@ def create_booking(
             ),
         )
 
-    # Enforce weekly max meals
-    existing = (
-        db.query(BookingModel)
-        .filter(
-            BookingModel.user_id == current_user.id,
-            BookingModel.delivery_date >= week_start,
-            BookingModel.delivery_date <= week_end,
-            BookingModel.status == "active",
-        )
-        .all()
-    )
-    current_meals = sum(b.meals for b in existing)
-
-    if current_meals + payload.meals > MAX_MEALS_PER_WEEK:
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                f"Weekly limit exceeded: you already have {current_meals} meals; "
-                f"max is {MAX_MEALS_PER_WEEK}."
-            ),
-        )
+    # Enforce weekly max meals (conditional update on the week counter). The
+    # request's first write: a booking over the cap writes nothing else, and
+    # the database write lock is only taken once the reads above are done.
+    if not meal_counters.add_meals(db, current_user.id, week_start, payload.meals):
+        _raise_weekly_limit(db, current_user.id, week_start)
 
     booking = BookingModel(
         user_id=current_user.id,
@@ -197,11 +130,126 @@ def create_booking(
         status="active",
     )
     db.add(booking)
+    versions = bump_booking_versions(db, [payload.delivery_date])
     db.commit()
     db.refresh(booking)
+    publish_booking_changes(db, "created", {booking.id: booking.delivery_date}, versions)
     return booking
 
 
+@router.post("/batch", response_model=BookingBatchOut)
+def create_bookings_batch(
+    payload: BookingBatchCreate,
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_client),
+):
+    """
+    Create up to 14 bookings (one or more service weeks) in one call.
+
+    Same rules as POST /booking/, checked for the whole batch at once:
+    - one query for address ownership
+    - cutoff per service week (no query)
+    - one weekly meal counter read per service week for MAX_MEALS_PER_WEEK,
+      applied cumulatively in request order
+    Valid items are inserted together with a single commit; invalid items
+    are reported per index and not inserted.
+    """
+    items = payload.bookings
+    errors: Dict[int, str] = {}
+
+    address_ids = {b.address_id for b in items}
+    owned = {
+        row.id
+        for row in db.query(Address.id)
+        .filter(Address.id.in_(address_ids), Address.user_id == current_user.id)
+        .all()
+    }
+
+    now = datetime.utcnow()
+    weeks: Dict[date, List[int]] = {}
+    for i, b in enumerate(items):
+        if b.time_block not in ALL_SLOTS:
+            errors[i] = "Invalid time block"
+        elif b.meals not in (1, 2):
+            errors[i] = "Each booking must be 1 or 2 meals"
+        elif b.address_id not in owned:
+            errors[i] = "Invalid address"
+        elif b.dish_choice and b.dish_choice not in ("A", "B", "A+B"):
+            errors[i] = "Invalid dish choice"
+        else:
+            week_start = get_week_start(b.delivery_date)
+            if now > get_cutoff_for_week(week_start):
+                errors[i] = "Cutoff passed for this service week."
+            else:
+                weeks.setdefault(week_start, []).append(i)
+
+    # Weekly max meals: read each week's counter once (locked), accept items
+    # in order, then apply the accepted total in one update
+    for week_start, indexes in weeks.items():
+        current_meals = meal_counters.current_meals(
+            db, current_user.id, week_start, for_update=True
+        )
+        accepted: List[int] = []
+        accepted_meals = 0
+        for i in indexes:
+            if current_meals + accepted_meals + items[i].meals > MAX_MEALS_PER_WEEK:
+                errors[i] = (
+                    f"Weekly limit exceeded: you already have {current_meals + accepted_meals} meals; "
+                    f"max is {MAX_MEALS_PER_WEEK}."
+                )
+                continue
+            accepted.append(i)
+            accepted_meals += items[i].meals
+        if not meal_counters.add_meals(db, current_user.id, week_start, accepted_meals):
+            for i in accepted:
+                errors[i] = f"Weekly limit exceeded: max is {MAX_MEALS_PER_WEEK}."
+
+    created: Dict[int, dict] = {}
+    for i, b in enumerate(items):
+        if i in errors:
+            continue
+        created[i] = {
+            "user_id": current_user.id,
+            "address_id": b.address_id,
+            "delivery_date": b.delivery_date,
+            "time_block": b.time_block,
+            "meals": b.meals,
+            "dish_choice": b.dish_choice,
+            "status": "active",
+        }
+
+    if created:
+        # INSERT ... RETURNING id, ids in the order of the rows sent. PostgreSQL
+        # gets one multi-row statement; SQLite has no way to order a bulk
+        # RETURNING, so SQLAlchemy sends one INSERT per row there (a batch
+        # is at most a week of slots).
+        new_ids = (
+            db.execute(
+                insert(BookingModel).returning(BookingModel.id, sort_by_parameter_order=True),
+                list(created.values()),
+            )
+            .scalars()
+            .all()
+        )
+        for row, new_id in zip(created.values(), new_ids):
+            row["id"] = new_id
+        versions = bump_booking_versions(db, [row["delivery_date"] for row in created.values()])
+    db.commit()
+    if created:
+        publish_booking_changes(
+            db, "created", {row["id"]: row["delivery_date"] for row in created.values()}, versions
+        )
+
+    results = []
+    for i in range(len(items)):
+        if i in created:
+            results.append({"index": i, "ok": True, "booking": created[i]})
+        else:
+            results.append({"index": i, "ok": False, "error": errors[i]})
+
+    return {"created": len(created), "results": results}
+
+
 @router.get("/", response_model=List[BookingOut])
 def list_my_bookings(
     db: Session = Depends(get_db_session),
@@ -275,32 +323,22 @@ def update_booking(
             raise HTTPException(status_code=400, detail="Invalid dish choice")
         # TODO: Map delivery_date -> rotation day_number and validate against MenuDay
 
-    # Re-check weekly max with the new meals
-    week_start = new_week_start
-    week_end = week_start + timedelta(days=6)
-
-    existing = (
-        db.query(BookingModel)
-        .filter(
-            BookingModel.user_id == current_user.id,
-            BookingModel.delivery_date >= week_start,
-            BookingModel.delivery_date <= week_end,
-            BookingModel.status == "active",
-            BookingModel.id != booking.id,
-        )
-        .all()
-    )
-    current_meals = sum(b.meals for b in existing)
-
-    if current_meals + payload.meals > MAX_MEALS_PER_WEEK:
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                f"Weekly limit exceeded: you already have {current_meals} meals; "
-                f"max is {MAX_MEALS_PER_WEEK}."
-            ),
+    # Re-check weekly max with the new meals: move this booking's meals
+    # out of its old week and into the new one
+    old_week_start = get_week_start(booking.delivery_date)
+    if old_week_start == new_week_start:
+        ok = meal_counters.add_meals(
+            db, current_user.id, new_week_start, payload.meals - booking.meals
         )
-
+    else:
+        ok = meal_counters.add_meals(db, current_user.id, new_week_start, payload.meals)
+        if ok:
+            meal_counters.add_meals(db, current_user.id, old_week_start, -booking.meals)
+    if not ok:
+        _raise_weekly_limit(db, current_user.id, new_week_start)
+
+    old_date = booking.delivery_date
+    versions = bump_booking_versions(db, [old_date, payload.delivery_date])
     booking.address_id = payload.address_id
     booking.delivery_date = payload.delivery_date
     booking.time_block = payload.time_block
@@ -309,6 +347,13 @@ def update_booking(
 
     db.commit()
     db.refresh(booking)
+    publish_booking_changes(
+        db,
+        "updated",
+        {booking.id: booking.delivery_date},
+        versions,
+        previous={booking.id: old_date},
+    )
     return booking
 
 
@@ -344,7 +389,11 @@ def cancel_booking(
         )
 
     booking.status = "cancelled"
+    meal_counters.add_meals(db, current_user.id, week_start, -booking.meals)
+    versions = bump_booking_versions(db, [booking.delivery_date])
+    changes = {booking.id: booking.delivery_date}
     db.commit()
+    publish_booking_changes(db, "cancelled", changes, versions)
     return {"detail": "Booking cancelled"}
 
 
@@ -369,7 +418,7 @@ def get_week_pricing(
             BookingModel.user_id == current_user.id,
             BookingModel.delivery_date >= week_start,
             BookingModel.delivery_date <= week_end,
-            BookingModel.status == "active",
+            BookingModel.status != "cancelled",
         )
         .all()
     )
@@ -430,7 +479,7 @@ def bootstrap_from_onboarding(
             .filter(
                 BookingModel.user_id == current_user.id,
                 BookingModel.delivery_date == s.delivery_date,
-                BookingModel.status == "active",
+                BookingModel.status != "cancelled",
             )
             .first()
         )
@@ -457,8 +506,15 @@ def bootstrap_from_onboarding(
         )
         db.add(booking)
         created.append(booking)
+        meal_counters.add_meals(
+            db, current_user.id, get_week_start(s.delivery_date), s.meals, enforce_cap=False
+        )
 
+    versions = bump_booking_versions(db, [b.delivery_date for b in created])
+    db.flush()  # assigns the new ids
+    changes = {b.id: b.delivery_date for b in created}
     db.commit()
+    publish_booking_changes(db, "created", changes, versions)
     return {"created": len(created)}
 
 @router.post("/ensure-week")
@@ -508,7 +564,8 @@ def ensure_week_bookings(
     if not template:
         raise HTTPException(status_code=400, detail="No first-week template found.")
 
-    created = 0
+    created_dates = []
+    created: List[BookingModel] = []
     for s in template:
         d = week_start + timedelta(days=s.weekday_index)
         if s.meals <= 0:
@@ -519,7 +576,7 @@ def ensure_week_bookings(
             .filter(
                 BookingModel.user_id == current_user.id,
                 BookingModel.delivery_date == d,
-                BookingModel.status == "active",
+                BookingModel.status != "cancelled",
             )
             .first()
         )
@@ -533,17 +590,8 @@ def ensure_week_bookings(
             if desired_type == "blank":
                 continue
 
-            menu = _menu_for_date(db, d)
-            a_type = infer_dish_type(menu["dish_a"])
-            b_type = infer_dish_type(menu["dish_b"])
-
-            # pick A if it matches desired type, else B, else fallback A
-            if a_type == desired_type:
-                dish_choice = "A"
-            elif b_type == desired_type:
-                dish_choice = "B"
-            else:
-                dish_choice = "A"
+            dish_a_type, dish_b_type = _dish_types_for_date(db, d)
+            dish_choice = pick_single_dish_by_type(desired_type, dish_a_type, dish_b_type)
 
         booking = BookingModel(
             user_id=current_user.id,
@@ -555,7 +603,13 @@ def ensure_week_bookings(
             status="active",
         )
         db.add(booking)
-        created += 1
+        created.append(booking)
+        created_dates.append(d)
+        meal_counters.add_meals(db, current_user.id, get_week_start(d), s.meals, enforce_cap=False)
 
+    versions = bump_booking_versions(db, created_dates)
+    db.flush()  # assigns the new ids
+    changes = {b.id: b.delivery_date for b in created}
     db.commit()
-    return {"created": created}
+    publish_booking_changes(db, "created", changes, versions)
+    return {"created": len(created_dates)}
@@ -1,256 +1,246 @@
 # backend/app/routers/exports.py
 
 from datetime import date, timedelta
-import csv
-import io
-from typing import Optional
+from typing import Iterable, NamedTuple, Optional
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import not_, or_, select
 from sqlalchemy.orm import Session
 
+from ..config import EXPORT_RANGE_MAX_DAYS
 from ..core.deps import get_db_session
-from ..core.security import require_role
-from ..models.booking import Booking
+from ..core.security import Principal, require_role
+from ..models.export_job import ExportJob
 from ..models.user import User
-from ..models.address import Address  # for type hints / relationship access
-from ..models.menu import MenuDay
-from .menu import get_rotation_day_number
+from ..schemas.export import ExportJobCreate
+from ..services.export_cache import export_cache
+from ..services.export_data import (
+    BOOKING_EXPORT_LAYOUT,
+    BOOKING_STATUSES,
+    EXPORT_FORMATS,
+    encode_chunks,
+    export_bookings,
+    export_bookings_by_day,
+    export_version,
+    iter_csv,
+    iter_ndjson,
+    render_bookings,
+    service_weeks,
+    stream_keyset,
+    zip_chunks,
+)
+from ..services.procurement import ingredient_bill, ingredients_version, render_ingredients
+from ..services.service_week import get_week_start
+from ..services.week_snapshots import snapshot_rows_query
+from ..services.export_jobs import (
+    ExportJobsBusy,
+    job_filename,
+    job_media_type,
+    job_path,
+    job_to_dict,
+    submit_export_job,
+)
 
 router = APIRouter(
     tags=["Export"],
 )
-def _resolve_dish_name(db: Session, booking: Booking) -> str:
-    """
-    Given a booking, return the human-readable dish name(s) for that day
-    using the same 14-day rotation as /menu/public-week.
-    """
-    if not booking.delivery_date:
-        # Fallback: if somehow there's no date, just return the raw code
-        return booking.dish_choice or ""
-
-    # 1) Map calendar date -> rotation day number (1–14)
-    rotation_day = get_rotation_day_number(booking.delivery_date)
-
-    # 2) Get the MenuDay for that rotation day
-    menu_day: MenuDay | None = (
-        db.query(MenuDay)
-        .filter(MenuDay.day_number == rotation_day)
-        .first()
-    )
-
-    if not menu_day:
-        # If menu not configured for this rotation day, fallback to raw code
-        return booking.dish_choice or ""
 
-    # 3) Build the dish name based on meals and dish_choice
-    if booking.meals == 2:
-        # 2 meals always means A + B
-        return f"{menu_day.dish_a} + {menu_day.dish_b}"
-
-    # 1 meal: respect dish_choice
-    if booking.dish_choice == "A":
-        return menu_day.dish_a
-    elif booking.dish_choice == "B":
-        return menu_day.dish_b
-    else:
-        return ""
-
-
-
-def _format_address(addr: Address) -> str:
-    """Build a human-readable address string for exports."""
-    if addr is None:
-        return ""
-    parts = [addr.line1]
-    if addr.line2:
-        parts.append(addr.line2)
-    parts.append(f"{addr.postal_code} {addr.city}")
-    return ", ".join(parts)
 
+# ---------------------------------------------------------------------------
+# Output format / compression
+# ---------------------------------------------------------------------------
 
-def _get_week_start(d: date) -> date:
+class _Output(NamedTuple):
+    fmt: str              # key of EXPORT_FORMATS (or "text" for the driver sheet)
+    media_type: str
+    extension: str
+    gzip: bool            # body is gzip-compressed
+    content_encoding: bool  # ... transparently (Accept-Encoding), not as a .gz file
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "x-gzip"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _output(request: Request, fmt: str, compress: Optional[str], formats=EXPORT_FORMATS) -> _Output:
     """
-    Wednesday-based service week.
-    Returns the Wednesday that starts the week containing the given date.
+    Resolve ?format= and ?compress=gzip. compress=gzip downloads a .gz file;
+    without it a client sending Accept-Encoding: gzip gets the same bytes
+    with Content-Encoding: gzip (browsers and curl --compressed decode it).
     """
-    weekday = d.weekday()  # Monday = 0
-    offset = (weekday - 2) % 7  # Wednesday = 2
-    return d - timedelta(days=offset)
-
-
-def _csv_stream(filename: str, headers, rows):
+    if fmt not in formats:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown format {fmt!r} (one of: {', '.join(formats)})",
+        )
+    if compress not in (None, "gzip"):
+        raise HTTPException(status_code=422, detail="compress must be 'gzip'")
+    media_type, extension = formats[fmt]
+    if compress == "gzip":
+        return _Output(fmt, media_type, extension, gzip=True, content_encoding=False)
+    return _Output(fmt, media_type, extension, gzip=_accepts_gzip(request), content_encoding=True)
+
+
+def _export_response(out: _Output, stem: str, body: Optional[Iterable[bytes]] = None, path=None) -> Response:
+    """StreamingResponse of body, or FileResponse of a cached file at path."""
+    filename = f"{stem}.{out.extension}"
+    media_type = out.media_type
+    headers = {"Vary": "Accept-Encoding"}
+    if out.gzip and out.content_encoding:
+        headers["Content-Encoding"] = "gzip"
+    elif out.gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if path is not None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def _booking_export_response(
+    db: Session,
+    request: Request,
+    stem: str,
+    start: date,
+    end: date,
+    fmt: str,
+    compress: Optional[str],
+) -> Response:
     """
-    Build a StreamingResponse returning CSV.
-    `rows` is an iterable of lists.
+    Bookings of a date range as CSV / NDJSON, optionally gzipped: served
+    from the export cache when the range's data versions haven't changed,
+    otherwise streamed and cached.
     """
-    def iterfile():
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(headers)
-        for row in rows:
-            writer.writerow(row)
-        buf.seek(0)
-        data = buf.read()
-        buf.close()
-        yield data
-
-    return StreamingResponse(
-        iterfile(),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    out = _output(request, fmt, compress)
+    key = ("bookings", BOOKING_EXPORT_LAYOUT, out.fmt, out.gzip, start, end, export_version(db, start, end))
+    path = export_cache.get(key)
+    if path is not None:
+        return _export_response(out, stem, path=path)
+
+    chunks = render_bookings(export_bookings(db, start, end), out.fmt)
+    return _export_response(out, stem, export_cache.tee(key, encode_chunks(chunks, out.gzip)))
+
+
+_FORMAT_QUERY = Query("csv", description="csv | ndjson")
+_COMPRESS_QUERY = Query(
+    None,
+    description="gzip: download a .gz file (otherwise Accept-Encoding: gzip is honoured)",
+)
 
 
 # ---------------------------------------------------------------------------
-# LEGACY-LIKE ENDPOINTS (KEPT, BUT NOW STREAM CSV)
+# LEGACY-LIKE ENDPOINTS (KEPT, BUT NOW STREAMED)
 # ---------------------------------------------------------------------------
 
 @router.get("/export/today/csv")
 def export_today_csv_legacy(
+    request: Request,
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("kitchen")),
-) -> StreamingResponse:
+    current_user: Principal = Depends(require_role("kitchen")),
+) -> Response:
     """
-    Legacy: Export today's bookings as CSV for kitchen staff.
+    Legacy: Export today's bookings as CSV (or NDJSON) for kitchen staff.
     Path: GET /export/today/csv
     """
     today = date.today()
 
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.delivery_date == today, Booking.status == "active")
-        .order_by(Booking.time_block)
-        .all()
+    return _booking_export_response(
+        db, request, f"kitchen_export_{today}", today, today, format, compress
     )
 
-    headers = [
-        "Date",
-        "Time Block",
-        "Client Name",
-        "Phone",
-        "label",
-        "Address",
-        "Meals (qty)",
-        "Dish Choice",
-    ]
-    rows = []
-    for b in bookings:
-        addr_str = _format_address(b.address)
-        dish_name = _resolve_dish_name(db, b)
-        rows.append(
-            [
-                b.delivery_date.isoformat(),
-                b.time_block,
-                b.user.name,  
-                b.user.phone,
-                b.address.label if b.address else "",
-                addr_str,
-                b.meals,
-                dish_name,
-            ]
-        )
-
-
-    filename = f"kitchen_export_{today}.csv"
-    return _csv_stream(filename, headers, rows)
-
 
 @router.get("/export/week/csv")
 def export_week_csv_legacy(
+    request: Request,
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("admin")),
-) -> StreamingResponse:
+    current_user: Principal = Depends(require_role("admin")),
+) -> Response:
     """
-    Legacy: Export all bookings for the current service week (Wed–Tue) as CSV.
+    Legacy: Export all bookings for the current service week (Wed–Tue) as CSV (or NDJSON).
     Path: GET /export/week/csv
     """
     today = date.today()
-    start_of_week = _get_week_start(today)
+    start_of_week = get_week_start(today)
     end_of_week = start_of_week + timedelta(days=6)
 
-    bookings = (
-        db.query(Booking)
-        .filter(
-            Booking.delivery_date >= start_of_week,
-            Booking.delivery_date <= end_of_week,
-            Booking.status == "active",
-        )
-        .order_by(Booking.delivery_date, Booking.time_block)
-        .all()
+    return _booking_export_response(
+        db,
+        request,
+        f"week_export_{start_of_week}_to_{end_of_week}",
+        start_of_week,
+        end_of_week,
+        format,
+        compress,
     )
 
-    headers = [
-        "Date",
-        "Time Block",
-        "Client Name",
-        "Phone",
-        "label",
-        "Address",
-        "Meals (qty)",
-        "Dish Choice",
-    ]
-    rows = []
-    for b in bookings:
-        addr_str = _format_address(b.address)
-        dish_name = _resolve_dish_name(db, b)
-        rows.append(
-            [
-                b.delivery_date.isoformat(),
-                b.time_block,
-                b.user.name,  
-                b.user.phone,
-                b.address.label if b.address else "",
-                addr_str,
-                b.meals,
-                dish_name,
-            ]
-        )
-
 
-    filename = f"week_export_{start_of_week}_to_{end_of_week}.csv"
-    return _csv_stream(filename, headers, rows)
+_DRIVER_FORMATS = {"text": ("text/plain", "txt"), **EXPORT_FORMATS}
+_DRIVER_CSV_HEADERS = ["Time Block", "Client Name", "Address", "Meals (qty)", "Dish Choice"]
 
 
 @router.get("/export/driver/today")
 def export_driver_sheet(
+    request: Request,
+    format: str = Query("text", description="text | csv | ndjson"),
+    compress: Optional[str] = _COMPRESS_QUERY,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("admin")),
+    current_user: Principal = Depends(require_role("admin")),
 ) -> StreamingResponse:
     """
-    Export a simplified driver route sheet as plain text.
+    Export a simplified driver route sheet as plain text (or csv / ndjson).
     Path: GET /export/driver/today
     """
+    out = _output(request, format, compress, formats=_DRIVER_FORMATS)
     today = date.today()
 
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.delivery_date == today, Booking.status == "active")
-        .order_by(Booking.time_block)
-        .all()
-    )
-
-    lines = []
-    lines.append("DRIVER ROUTE SHEET — TODAY")
-    lines.append(f"DATE: {today.isoformat()}")
-    lines.append("-------------------------------------------")
-
-    for b in bookings:
-        addr_str = _format_address(b.address)
-        lines.append(
-            f"{b.time_block} — {b.user.name} — {addr_str} — {b.meals} meal(s) — {b.dish_choice or 'N/A'}"
-        )
-
-    content = "\n".join(lines)
+    bookings = export_bookings(db, today, today)
 
     def iterfile():
-        yield content
+        yield "DRIVER ROUTE SHEET — TODAY\n"
+        yield f"DATE: {today.isoformat()}\n"
+        yield "-------------------------------------------"
+        for b in bookings:
+            yield (
+                f"\n{b.time_block} — {b.client_name} — {b.address_text} — "
+                f"{b.meals} meal(s) — {b.dish_choice or 'N/A'}"
+            )
+
+    if out.fmt == "csv":
+        chunks = iter_csv(
+            _DRIVER_CSV_HEADERS,
+            ([b.time_block, b.client_name, b.address_text, b.meals, b.dish_choice or ""] for b in bookings),
+        )
+    elif out.fmt == "ndjson":
+        chunks = iter_ndjson(
+            {
+                "time_block": b.time_block,
+                "client_name": b.client_name,
+                "address": b.address_text,
+                "meals": b.meals,
+                "dish_choice": b.dish_choice,
+            }
+            for b in bookings
+        )
+    else:
+        chunks = iterfile()
 
-    return StreamingResponse(
-        iterfile(),
-        media_type="text/plain",
-        headers={"Content-Disposition": f'attachment; filename="driver_route_today.txt"'},
-    )
+    return _export_response(out, "driver_route_today", encode_chunks(chunks, out.gzip))
 
 
 # ---------------------------------------------------------------------------
@@ -261,67 +251,110 @@ def export_driver_sheet(
 
 @router.get("/kitchen/export/day")
 def export_kitchen_day(
+    request: Request,
     service_date: date = Query(..., description="Service date (YYYY-MM-DD)"),
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("kitchen")),
-) -> StreamingResponse:
+    current_user: Principal = Depends(require_role("kitchen")),
+) -> Response:
     """
-    Export one service day's kitchen sheet as CSV.
+    Export one service day's kitchen sheet as CSV (or NDJSON).
     Path: GET /kitchen/export/day?service_date=YYYY-MM-DD
     """
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.delivery_date == service_date, Booking.status == "active")
-        .order_by(Booking.time_block)
-        .all()
+    return _booking_export_response(
+        db, request, f"kitchen_{service_date.isoformat()}", service_date, service_date, format, compress
     )
 
-    headers = [
-        "Date",
-        "Time Block",
-        "Client Name",
-        "Phone",
-        "label",
-        "Address",
-        "Meals (qty)",
-        "Dish Choice",
-    ]
-    rows = []
-    for b in bookings:
-        addr_str = _format_address(b.address)
-        dish_name = _resolve_dish_name(db, b)
-        rows.append(
-            [
-                b.delivery_date.isoformat(),
-                b.time_block,
-                b.user.name,  
-                b.user.phone,
-                b.address.label if b.address else "",
-                addr_str,
-                b.meals,
-                dish_name,
-            ]
-        )
 
+# 1b) KITCHEN: ingredient quantities for procurement
+
+@router.get("/kitchen/export/ingredients")
+def export_kitchen_ingredients(
+    request: Request,
+    day: Optional[date] = Query(None, description="One delivery date"),
+    week_for: Optional[date] = Query(None, description="Any date in the service week (Wed–Tue)"),
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(require_role("kitchen")),
+) -> Response:
+    """
+    Total ingredient quantities for one day or one service week: portions
+    of each dish times its recipe (net and purchase quantity, per unit).
+    Path: GET /kitchen/export/ingredients?week_for=YYYY-MM-DD
+
+    Locked weeks are served from the export cache until their snapshot or
+    a recipe changes; open days are computed on every call.
+    """
+    if (day is None) == (week_for is None):
+        raise HTTPException(status_code=422, detail="Pass either day or week_for")
+    if day is not None:
+        start = end = day
+        stem = f"ingredients_{day.isoformat()}"
+    else:
+        start = get_week_start(week_for)
+        end = start + timedelta(days=6)
+        stem = f"ingredients_{start.isoformat()}_to_{end.isoformat()}"
 
+    out = _output(request, format, compress)
+    key = None
+    if snapshot_rows_query(db, start, end) is not None:
+        key = ("ingredients", out.fmt, out.gzip, start, end, ingredients_version(db, start, end))
+        path = export_cache.get(key)
+        if path is not None:
+            return _export_response(out, stem, path=path)
 
-    filename = f"kitchen_{service_date.isoformat()}.csv"
-    return _csv_stream(filename, headers, rows)
+    _, rows = ingredient_bill(db, start, end)
+    body = encode_chunks(render_ingredients(rows, out.fmt), out.gzip)
+    if key is not None:
+        body = export_cache.tee(key, body)
+    return _export_response(out, stem, body)
 
 
 # 2) ADMIN: clients CSV (used by admin.js → /admin/export/clients)
 
 @router.get("/admin/export/clients")
 def export_clients(
-    db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("admin")),
+    request: Request,
+    role: Optional[str] = Query(None, description="client | admin | kitchen"),
+    client_type: Optional[str] = Query(None, description="weekly | subscriber"),
+    is_active: Optional[bool] = None,
+    is_founder: Optional[bool] = None,
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
+    current_user: Principal = Depends(require_role("admin")),
 ) -> StreamingResponse:
     """
-    Export all users (clients) as CSV.
+    Export users (clients) as CSV or NDJSON, optionally filtered.
     Path: GET /admin/export/clients
+
+    Paged by users.id (keyset, EXPORT_YIELD_PER per query), so memory and
+    lock time stay flat however many users there are.
     """
-    # No order_by here because User.created_at does not exist
-    users = db.query(User).all()
+    out = _output(request, format, compress)
+    users = select(
+        User.id,
+        User.name,
+        User.email,
+        User.phone,
+        User.role,
+        User.client_type,
+        User.is_active,
+        User.is_founder,
+        User.created_at,
+    )
+    if role is not None:
+        users = users.where(User.role == role)
+    if client_type is not None:
+        users = users.where(User.client_type == client_type)
+    # NULL flags mean the column defaults (active, not a founder)
+    if is_active is not None:
+        active = or_(User.is_active.is_(True), User.is_active.is_(None))
+        users = users.where(active if is_active else not_(active))
+    if is_founder is not None:
+        founder = User.is_founder.is_(True)
+        users = users.where(founder if is_founder else not_(founder))
 
     headers = [
         "User ID",
@@ -329,41 +362,62 @@ def export_clients(
         "Email",
         "Phone",
         "Role",
+        "Client Type",
         "Active",
-        "Created At",   # this will be blank unless you add it later
+        "Founder",
+        "Created At",
     ]
 
-    rows = []
-    for u in users:
-        rows.append(
-            [
-                u.id,
-                u.name,
-                u.email,
-                u.phone or "",
-                getattr(u, "role", ""),
-                getattr(u, "is_active", True),
-                getattr(u, "created_at", ""),  # safe fallback
-            ]
-        )
+    def to_row(u) -> list:
+        return [
+            u.id,
+            u.name,
+            u.email,
+            u.phone or "",
+            u.role or "",
+            u.client_type or "",
+            u.is_active if u.is_active is not None else True,
+            bool(u.is_founder),
+            u.created_at.isoformat(timespec="seconds") if u.created_at else "",
+        ]
+
+    def to_record(u) -> dict:
+        return {
+            "id": u.id,
+            "name": u.name,
+            "email": u.email,
+            "phone": u.phone,
+            "role": u.role,
+            "client_type": u.client_type,
+            "is_active": u.is_active if u.is_active is not None else True,
+            "is_founder": bool(u.is_founder),
+            "created_at": u.created_at.isoformat(timespec="seconds") if u.created_at else None,
+        }
+
+    if out.fmt == "ndjson":
+        chunks = iter_ndjson(stream_keyset(users, User.id, to_record))
+    else:
+        chunks = iter_csv(headers, stream_keyset(users, User.id, to_row))
 
-    filename = "clients.csv"
-    return _csv_stream(filename, headers, rows)
+    return _export_response(out, "clients", encode_chunks(chunks, out.gzip))
 
 
 # 3) ADMIN: weekly bookings CSV (used by admin.js → /admin/export/bookings)
 
 @router.get("/admin/export/bookings")
 def export_admin_week_bookings(
+    request: Request,
     service_week_start: Optional[date] = Query(
         None,
         description="Service week start (Monday or Wednesday); if omitted, current service week is used.",
     ),
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_role("admin")),
-) -> StreamingResponse:
+    current_user: Principal = Depends(require_role("admin")),
+) -> Response:
     """
-    Export bookings for one service week as CSV for admin.
+    Export bookings for one service week as CSV (or NDJSON) for admin.
     Path: GET /admin/export/bookings?service_week_start=YYYY-MM-DD
     We apply the Wed–Tue logic around the given date (or today if None).
     """
@@ -372,48 +426,159 @@ def export_admin_week_bookings(
     else:
         base = service_week_start
 
-    start_of_week = _get_week_start(base)
+    start_of_week = get_week_start(base)
     end_of_week = start_of_week + timedelta(days=6)
 
-    bookings = (
-        db.query(Booking)
-        .filter(
-            Booking.delivery_date >= start_of_week,
-            Booking.delivery_date <= end_of_week,
-            Booking.status == "active",
+    return _booking_export_response(
+        db,
+        request,
+        f"bookings_{start_of_week.isoformat()}_to_{end_of_week.isoformat()}",
+        start_of_week,
+        end_of_week,
+        format,
+        compress,
+    )
+
+
+# 4) ADMIN: any date range, streamed day by day
+
+@router.get("/admin/export/bookings/range")
+def export_admin_booking_range(
+    request: Request,
+    from_date: date = Query(..., alias="from", description="First delivery date"),
+    to_date: date = Query(..., alias="to", description="Last delivery date (inclusive)"),
+    booking_status: Optional[str] = Query(
+        None,
+        alias="status",
+        description="active | locked | cancelled (default: everything not cancelled)",
+    ),
+    split: Optional[str] = Query(None, description="week: a zip with one file per service week"),
+    format: str = _FORMAT_QUERY,
+    compress: Optional[str] = _COMPRESS_QUERY,
+    current_user: Principal = Depends(require_role("admin")),
+) -> StreamingResponse:
+    """
+    Export the bookings of an arbitrary date range.
+    Path: GET /admin/export/bookings/range?from=YYYY-MM-DD&to=YYYY-MM-DD
+
+    Read one delivery day at a time (export_bookings_by_day) and streamed as
+    it is read, so memory and DB time per partition stay the same for any
+    range up to EXPORT_RANGE_MAX_DAYS. Not cached; for long ranges that are
+    downloaded repeatedly use a background job (POST /admin/exports).
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=422, detail="'to' must not be before 'from'")
+    days = (to_date - from_date).days + 1
+    if days > EXPORT_RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range too long: {days} days (max {EXPORT_RANGE_MAX_DAYS})",
+        )
+    if booking_status is not None and booking_status not in BOOKING_STATUSES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown status {booking_status!r} (one of: {', '.join(BOOKING_STATUSES)})",
+        )
+    if split not in (None, "week"):
+        raise HTTPException(status_code=422, detail="split must be 'week'")
+
+    stem = f"bookings_{from_date.isoformat()}_to_{to_date.isoformat()}"
+    if split is None:
+        out = _output(request, format, compress)
+        chunks = render_bookings(export_bookings_by_day(from_date, to_date, booking_status), out.fmt)
+        return _export_response(out, stem, encode_chunks(chunks, out.gzip))
+
+    # Zip members are deflated already: no gzip on top
+    if compress is not None:
+        raise HTTPException(status_code=422, detail="compress is not supported with split=week")
+    fmt = _output(request, format, None).fmt
+    members = (
+        (
+            f"bookings_{first.isoformat()}_to_{last.isoformat()}.{EXPORT_FORMATS[fmt][1]}",
+            render_bookings(export_bookings_by_day(first, last, booking_status), fmt),
         )
-        .order_by(Booking.delivery_date, Booking.time_block)
-        .all()
+        for first, last in service_weeks(from_date, to_date)
     )
+    out = _Output(fmt, "application/zip", "zip", gzip=False, content_encoding=False)
+    return _export_response(out, stem, zip_chunks(members))
 
-    headers = [
-        "Date",
-        "Time Block",
-        "Client Name",
-        "Phone",
-        "label",
-        "Address",
-        "Meals (qty)",
-        "Dish Choice",
-    ]
-    rows = []
-    for b in bookings:
-        addr_str = _format_address(b.address)
-        dish_name = _resolve_dish_name(db, b)
-        rows.append(
-            [
-                b.delivery_date.isoformat(),
-                b.time_block,
-                b.user.name,  
-                b.user.phone,
-                b.address.label if b.address else "",
-                addr_str,
-                b.meals,
-                dish_name,
-            ]
+
+# ---------------------------------------------------------------------------
+# ADMIN: BACKGROUND EXPORT JOBS (long ranges)
+# ---------------------------------------------------------------------------
+
+@router.post("/admin/exports", status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    payload: ExportJobCreate,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """
+    Queue a booking export for a (long) date range, rendered in the
+    background. Poll GET /admin/exports/{id}; download from its download_url.
+    """
+    try:
+        job = submit_export_job(
+            db,
+            payload.start_date,
+            payload.end_date,
+            fmt=payload.format,
+            compression=payload.compress,
+            filters={"user_id": payload.user_id, "time_block": payload.time_block},
+            requested_by=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ExportJobsBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many exports in progress, please retry later.",
+            headers={"Retry-After": "30"},
         )
+    return job_to_dict(job)
+
+
+@router.get("/admin/exports")
+def list_export_jobs(
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """The 50 most recent export jobs (finished ones are kept for a limited time)."""
+    jobs = db.query(ExportJob).order_by(ExportJob.created_at.desc()).limit(50).all()
+    return [job_to_dict(j) for j in jobs]
+
 
+def _get_job(db: Session, job_id: str) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
 
 
-    filename = f"bookings_{start_of_week.isoformat()}_to_{end_of_week.isoformat()}.csv"
-    return _csv_stream(filename, headers, rows)
+@router.get("/admin/exports/{job_id}")
+def get_export_job(
+    job_id: str,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """Status and progress of an export job."""
+    return job_to_dict(_get_job(db, job_id))
+
+
+@router.get("/admin/exports/{job_id}/file")
+def download_export_job(
+    job_id: str,
+    db: Session = Depends(get_db_session),
+    current_user: Principal = Depends(require_role("admin")),
+) -> FileResponse:
+    """
+    The finished export. Supports Range requests, so large downloads can
+    be resumed.
+    """
+    job = _get_job(db, job_id)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    path = job_path(job)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+    return FileResponse(path, media_type=job_media_type(job), filename=job_filename(job))
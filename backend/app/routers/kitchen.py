@@ -1,15 +1,24 @@
 # backend/app/routers/kitchen.py
 
-from datetime import date
-from typing import List, Dict
+import asyncio
+import json
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, List, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload  # ⬅ add joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
+from ..config import KITCHEN_STREAM_HEARTBEAT_SECONDS
 from ..core.deps import get_db_session
-from ..core.security import require_role
-from ..models.booking import Booking as BookingModel
-from ..models.user import User
+from ..core.security import Principal, require_role
+from ..database import SessionLocal
+from ..services.data_versions import booking_version_name, read_version
+from ..services.kitchen_board import kitchen_board, kitchen_hub, kitchen_rows
+from ..services.kitchen_production import production
+from ..services.service_week import get_week_start
 
 router = APIRouter(prefix="/kitchen", tags=["Kitchen"])
 
@@ -18,79 +27,163 @@ router = APIRouter(prefix="/kitchen", tags=["Kitchen"])
 def kitchen_day_view(
     day: date = Query(..., description="Delivery date"),
     db: Session = Depends(get_db_session),
-    kitchen_user: User = Depends(require_role("kitchen")),
+    kitchen_user: Principal = Depends(require_role("kitchen")),
 ):
     """
     Kitchen view for a specific delivery date.
 
     Returns list of bookings with:
+    - booking_id, status
     - time_block
     - meals
-    - dish_choice
+    - dish_choice, dish_description (dish names of the day)
     - address_id
 
     PLUS extra fields for kitchen.js:
     - client_name
     - client_phone
     - address_label / address_line1 / address_city / address_postal_code
-    """
-    bookings = (
-        db.query(BookingModel)
-        .options(
-            joinedload(BookingModel.user),     # needs BookingModel.user relationship
-            joinedload(BookingModel.address),  # needs BookingModel.address relationship
-        )
-        .filter(
-            BookingModel.delivery_date == day,
-            BookingModel.status == "active",
-        )
-        .order_by(BookingModel.time_block, BookingModel.id)
-        .all()
-    )
 
-    if not bookings:
+    Days of a locked week are read from the week snapshot (no joins).
+    For a screen kept open all day, use GET /kitchen/stream instead.
+    """
+    rows = kitchen_rows(db, day)
+    if not rows:
         raise HTTPException(status_code=404, detail="No bookings for this day")
+    return rows
+
+
+@router.get("/production", response_model=Dict[str, Any])
+def kitchen_production(
+    day: Optional[date] = Query(None, description="One delivery date"),
+    week_for: Optional[date] = Query(None, description="Any date in the service week (Wed–Tue)"),
+    db: Session = Depends(get_db_session),
+    kitchen_user: Principal = Depends(require_role("kitchen")),
+):
+    """
+    Production totals for one day or one service week: portions of dish A
+    and dish B per day and time block, per delivery region, and overall,
+    with the day's dish names. Computed in SQL, so the response size
+    depends on the number of slots, not bookings.
+    """
+    if (day is None) == (week_for is None):
+        raise HTTPException(status_code=422, detail="Pass either day or week_for")
+    if day is not None:
+        return production(db, day, day)
+    week_start = get_week_start(week_for)
+    return production(db, week_start, week_start + timedelta(days=6))
+
+
+# ---------------------------------------------------------------------------
+# Live board (Server-Sent Events)
+# ---------------------------------------------------------------------------
+
+def _load_board(day: date):
+    db = SessionLocal()
+    try:
+        return kitchen_board(db, day)
+    finally:
+        db.close()
+
+
+def _load_version(day: date) -> int:
+    db = SessionLocal()
+    try:
+        return read_version(db, booking_version_name(day))[0]
+    finally:
+        db.close()
 
-    out: List[Dict] = []
-    for b in bookings:
-        user = b.user
-        addr = b.address
-
-        # base payload (what you already had)
-        row: Dict = {
-            "time_block": b.time_block,
-            "meals": b.meals,
-            "dish_choice": b.dish_choice,
-            "dish_description": None,  # menu text still comes from /menu/public-week on frontend
-            "address_id": b.address_id,
-        }
-
-        # NEW: client info
-        row["client_name"] = user.name if user else None
-        # adjust attribute if your User model uses a different field (phone_number, mobile, etc.)
-        row["client_phone"] = getattr(user, "phone", None) if user else None
-
-        # NEW: address info (flattened for kitchen.js)
-        if addr is not None:
-            row["address_label"] = getattr(addr, "label", None)
-            row["address_line1"] = getattr(addr, "line1", None)
-            row["address_city"] = getattr(addr, "city", None)
-            row["address_postal_code"] = getattr(addr, "postal_code", None)
-            # optional combined field – kitchen.js will happily use this too
-            parts = [
-                getattr(addr, "label", None),
-                getattr(addr, "line1", None),
-                getattr(addr, "city", None),
-                getattr(addr, "postal_code", None),
-            ]
-            row["address_full"] = " – ".join([p for p in parts if p])
-        else:
-            row["address_label"] = None
-            row["address_line1"] = None
-            row["address_city"] = None
-            row["address_postal_code"] = None
-            row["address_full"] = None
-
-        out.append(row)
-
-    return out
+
+def _sse(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def kitchen_stream(
+    day: date = Query(..., description="Delivery date"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    kitchen_user: Principal = Depends(require_role("kitchen")),
+) -> StreamingResponse:
+    """
+    Live kitchen board for one delivery date (text/event-stream).
+
+    Events:
+    - snapshot: {"day", "bookings": [...]}, the same rows as /kitchen/day;
+      sent first, and again whenever the day changed in a way this process
+      didn't publish (another worker, week lock, ...) or the client fell
+      too far behind
+    - created / updated: one row (upsert by booking_id)
+    - cancelled: {"booking_id"}; moved: {"booking_id", "delivery_date"}
+      (the booking left this day); both mean "remove"
+    A comment line is sent every KITCHEN_STREAM_HEARTBEAT_SECONDS.
+    Reconnecting with Last-Event-ID replays only the missed events when
+    this process still has them, otherwise starts with a snapshot.
+
+    Runs on the event loop: a connected screen holds a queue, not a thread.
+    """
+    async def events() -> AsyncIterator[str]:
+        sent_seq = 0        # last hub event the client has (or that its snapshot covers)
+        known_version = 0   # the day's booking version the client has
+
+        async def snapshot() -> str:
+            nonlocal sent_seq, known_version
+            seq = kitchen_hub.last_seq
+            known_version, rows = await run_in_threadpool(_load_board, day)
+            sent_seq = seq
+            return _sse(
+                "snapshot",
+                {"day": day, "bookings": rows},
+                kitchen_hub.event_id(seq, known_version),
+            )
+
+        # Subscribe before reading anything, so no change falls in between
+        sub = kitchen_hub.subscribe(day)
+        try:
+            yield f"retry: {int(KITCHEN_STREAM_HEARTBEAT_SECONDS * 1000)}\n\n"
+
+            replay = kitchen_hub.replay(day, last_event_id) if last_event_id else None
+            if replay is None:
+                yield await snapshot()
+            else:
+                sent_seq, known_version, missed = replay
+                for ev in missed:
+                    known_version = max(known_version, ev.version)
+                    sent_seq = ev.seq
+                    yield _sse(ev.kind, ev.data, kitchen_hub.event_id(ev.seq, known_version))
+                # Changes made while nobody here was watching the day aren't buffered
+                if await run_in_threadpool(_load_version, day) > known_version:
+                    yield await snapshot()
+
+            while True:
+                if sub.overflowed:
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.overflowed = False
+                    yield await snapshot()
+                    continue
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), KITCHEN_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await run_in_threadpool(_load_version, day) > known_version:
+                        yield await snapshot()
+                    else:
+                        yield ": heartbeat\n\n"
+                    continue
+                if ev.seq <= sent_seq:
+                    continue  # already part of the snapshot / replay
+                known_version = max(known_version, ev.version)
+                sent_seq = ev.seq
+                yield _sse(ev.kind, ev.data, kitchen_hub.event_id(ev.seq, known_version))
+        finally:
+            kitchen_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
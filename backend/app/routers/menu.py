@@ -1,48 +1,106 @@
 # backend/app/routers/menu.py
 
-from datetime import date, timedelta
-from typing import List, Dict, Any
-
-from fastapi import APIRouter, Depends, Query
+import json
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Dict, Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from ..config import (
+    MENU_HTTP_MAX_AGE_SECONDS,
+    MENU_HTTP_STALE_WHILE_REVALIDATE_SECONDS,
+    MENU_RANGE_MAX_DAYS,
+    MENU_RESPONSE_CACHE_MAX_ENTRIES,
+)
+from ..core.cache import TTLCache
 from ..core.deps import get_db_session
-from ..models.menu import MenuDay
-from ..config import MENU_ROTATION_START_DATE
+from ..services.menu_rotation import get_rotation_day_number, menu_rotation  # noqa: F401 (re-exported)
+from ..services.service_week import get_week_start
 
 router = APIRouter(prefix="/menu", tags=["Menu"])
 
+# (menu version, week_start) -> serialized JSON body. Keyed by version, so an
+# admin edit never needs to clear it; old versions just age out (LRU).
+public_week_cache = TTLCache(
+    max_entries=MENU_RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=24 * 3600,
+)
 
-def get_week_start(d: date) -> date:
-    """
-    Service week is Wednesday–Tuesday.
-    Monday = 0, Tuesday = 1, Wednesday = 2, ...
-    """
-    weekday = d.weekday()
-    offset = (weekday - 2) % 7  # shift so week starts on Wednesday
-    return d - timedelta(days=offset)
 
+def _build_public_week(db: Session, week_start: date) -> List[Dict[str, Any]]:
+    result: List[Dict[str, Any]] = []
+
+    for i in range(7):
+        current_date = week_start + timedelta(days=i)
+        menu_day = menu_rotation.for_date(db, current_date)
+
+        if menu_day:
+            dish_a_name = menu_day.dish_a
+            dish_b_name = menu_day.dish_b
+            calories_a = menu_day.calories_a
+            calories_b = menu_day.calories_b
+        else:
+            # If rotation not fully configured yet, return empty slots
+            dish_a_name = None
+            dish_b_name = None
+            calories_a = None
+            calories_b = None
+
+        result.append(
+            {
+                "date": current_date,
+                "weekday": current_date.strftime("%A"),
+                "dish_a": {
+                    "name": dish_a_name,
+                    "calories": calories_a,
+                    "description": None,
+                },
+                "dish_b": {
+                    "name": dish_b_name,
+                    "calories": calories_b,
+                    "description": None,
+                },
+            }
+        )
+
+    return result
 
-def get_rotation_day_number(day: date) -> int:
-    """
-    Map a calendar date to a 1–14 rotation day_number.
 
-    MENU_ROTATION_START_DATE is defined in config.py and is treated as day_number = 1.
-    Then we cycle every 14 days.
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
     """
-    delta_days = (day - MENU_ROTATION_START_DATE).days
-    # Protect against negative values as well
-    return (delta_days % 14) + 1
+    RFC 9110 conditional GET: If-None-Match (weak comparison, so ETags that
+    nginx/CDN weakened after gzip still match) wins over If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
 
 
 @router.get("/public-week")
 def get_public_week_menu(
+    request: Request,
     week_for: date = Query(
         default=None,
         description="Any date inside the desired service week. Defaults to today.",
     ),
     db: Session = Depends(get_db_session),
-) -> List[Dict[str, Any]]:
+) -> Response:
     """
     Public endpoint: returns the menu for a full service week (Wed–Tue).
     No auth, no roles.
@@ -54,51 +112,113 @@ def get_public_week_menu(
         "dish_a": {"name": ..., "calories": ..., "description": None},
         "dish_b": {"name": ..., "calories": ..., "description": None},
     }
+
+    Cacheable: strong ETag from the rotation version + week start,
+    Last-Modified from the last rotation edit, 304 on a matching
+    If-None-Match / If-Modified-Since, and Cache-Control with
+    stale-while-revalidate for a CDN / nginx in front.
     """
+    follows_today = week_for is None
     if week_for is None:
         week_for = date.today()
 
     week_start = get_week_start(week_for)
+    version = menu_rotation.version(db)
+    last_modified = menu_rotation.last_modified(db)
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)  # stored as UTC
+    if follows_today:
+        # Without week_for the body also changes when the week rolls over
+        rollover = datetime(week_start.year, week_start.month, week_start.day, tzinfo=timezone.utc)
+        last_modified = max(last_modified, rollover) if last_modified else rollover
+
+    etag = f'"menu-v{version}-{week_start.isoformat()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={MENU_HTTP_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={MENU_HTTP_STALE_WHILE_REVALIDATE_SECONDS}"
+        ),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
 
-    result: List[Dict[str, Any]] = []
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
 
-    for i in range(7):
-        current_date = week_start + timedelta(days=i)
-        rotation_day = get_rotation_day_number(current_date)
+    key = (version, week_start)
+    body = public_week_cache.get(key)
+    if body is None:
+        body = json.dumps(
+            jsonable_encoder(_build_public_week(db, week_start)),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        public_week_cache.set(key, body)
 
-        menu_day: MenuDay | None = (
-            db.query(MenuDay)
-            .filter(MenuDay.day_number == rotation_day)
-            .first()
-        )
+    return Response(content=body, media_type="application/json", headers=headers)
 
-        if menu_day:
-            dish_a_name = menu_day.dish_a
-            dish_b_name = menu_day.dish_b
-            calories_a = menu_day.calories_a
-            calories_b = menu_day.calories_b
-        else:
-            # If rotation not fully configured yet, return empty slots
-            dish_a_name = None
-            dish_b_name = None
-            calories_a = None
-            calories_b = None
 
-        result.append(
-            {
-                "date": current_date,
+@router.get("/range")
+def get_menu_range(
+    from_date: date = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    to_date: date = Query(..., alias="to", description="Last date, inclusive (YYYY-MM-DD)"),
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    """
+    Public endpoint: the menu for every day from `from` to `to` (inclusive),
+    for planning screens and subscriber previews several weeks ahead.
+    At most MENU_RANGE_MAX_DAYS days per call.
+
+    Output (streamed JSON array, one entry per day):
+    {
+        "date": <ISO date>,
+        "weekday": "Wednesday",
+        "week_start": <ISO date of the service week's Wednesday>,
+        "rotation_day": 1..14,
+        "dish_a": {"name": ..., "calories": ..., "type": <category name>},
+        "dish_b": {"name": ..., "calories": ..., "type": <category name>},
+    }
+    "type" is the name of a dish category (dish_categories, admin-edited;
+    "meat" / "fish" by default). Days whose rotation entry isn't configured
+    have null dishes.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=422, detail="'to' must not be before 'from'")
+    days = (to_date - from_date).days + 1
+    if days > MENU_RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range too long: {days} days (max {MENU_RANGE_MAX_DAYS})",
+        )
+
+    # One rotation load; the generator below only does date arithmetic
+    rotation = {m.day_number: m for m in menu_rotation.days(db)}
+    first_rotation_day = get_rotation_day_number(from_date)
+
+    def iter_json():
+        yield "["
+        for i in range(days):
+            current_date = from_date + timedelta(days=i)
+            rotation_day = (first_rotation_day - 1 + i) % 14 + 1
+            m = rotation.get(rotation_day)
+            item = {
+                "date": current_date.isoformat(),
                 "weekday": current_date.strftime("%A"),
+                "week_start": get_week_start(current_date).isoformat(),
+                "rotation_day": rotation_day,
                 "dish_a": {
-                    "name": dish_a_name,
-                    "calories": calories_a,
-                    "description": None,
+                    "name": m.dish_a if m else None,
+                    "calories": m.calories_a if m else None,
+                    "type": m.dish_a_type if m else None,
                 },
                 "dish_b": {
-                    "name": dish_b_name,
-                    "calories": calories_b,
-                    "description": None,
+                    "name": m.dish_b if m else None,
+                    "calories": m.calories_b if m else None,
+                    "type": m.dish_b_type if m else None,
                 },
             }
-        )
+            yield ("," if i else "") + json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+        yield "]"
 
-    return result
+    return StreamingResponse(iter_json(), media_type="application/json")
@@ -9,9 +9,7 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from ..config import MENU_ROTATION_START_DATE
 from ..core.deps import get_db_session
-from ..models.menu import MenuDay
 from ..models.onboarding import OnboardingDraft, OnboardingBehaviorCell, OnboardingFirstWeekSelection
 from ..schemas.onboarding import (
     OnboardingClientTypeRequest,
@@ -21,6 +19,7 @@ from ..schemas.onboarding import (
     OnboardingStep8ExplanationResponse,
 )
 from ..services.dish_type import infer_dish_type
+from ..services.menu_rotation import menu_rotation
 from ..schemas.onboarding import OnboardingIbanRequest
 
 router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
@@ -28,21 +27,12 @@ router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
 _SERVICE_DAYS = ["Wednesday", "Thursday", "Friday", "Saturday", "Sunday", "Monday", "Tuesday"]
 
 
-def _rotation_day_number(day: date) -> int:
-    """
-    Match backend/app/routers/menu.py mapping:
-    MENU_ROTATION_START_DATE is day_number=1 and cycles every 14 days.
-    """
-    delta_days = (day - MENU_ROTATION_START_DATE).days
-    return (delta_days % 14) + 1
-
-
-def _menu_for_date(db: Session, day: date) -> Dict[str, str | None]:
-    day_no = _rotation_day_number(day)
-    m = db.query(MenuDay).filter(MenuDay.day_number == day_no).first()
+def _dish_types_for_date(db: Session, day: date) -> tuple[str, str]:
+    """(dish_a_type, dish_b_type) of the rotation day, from the menu cache."""
+    m = menu_rotation.for_date(db, day)
     if not m:
-        return {"dish_a": None, "dish_b": None}
-    return {"dish_a": m.dish_a, "dish_b": m.dish_b}
+        return infer_dish_type(None), infer_dish_type(None)
+    return m.dish_a_type, m.dish_b_type
 
 
 def _compute_behaviour_for_day(db: Session, day: date, meals: int, dish_choice: str | None) -> Dict[str, str]:
@@ -55,9 +45,7 @@ def _compute_behaviour_for_day(db: Session, day: date, meals: int, dish_choice:
     if meals <= 0:
         return {"meal1": "blank", "meal2": "blank"}
 
-    menu = _menu_for_date(db, day)
-    dish_a_type = infer_dish_type(menu["dish_a"])
-    dish_b_type = infer_dish_type(menu["dish_b"])
+    dish_a_type, dish_b_type = _dish_types_for_date(db, day)
 
     if meals == 2:
         return {"meal1": dish_a_type, "meal2": dish_b_type}
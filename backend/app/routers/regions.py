@@ -6,9 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..core.deps import get_db_session
-from ..core.security import require_role
+from ..core.security import Principal, require_role
 from ..models.region import Region
-from ..models.user import User
 from ..schemas.region import RegionCreate, RegionOut
 
 router = APIRouter(
@@ -20,7 +19,7 @@ router = APIRouter(
 @router.get("/", response_model=List[RegionOut])
 def list_regions(
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     regions = db.query(Region).order_by(Region.name).all()
     return regions
@@ -30,7 +29,7 @@ def list_regions(
 def create_region(
     payload: RegionCreate,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     existing = db.query(Region).filter(Region.name == payload.name).first()
     if existing:
@@ -53,7 +52,7 @@ def update_region(
     region_id: int,
     payload: RegionCreate,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     region = db.query(Region).filter(Region.id == region_id).first()
     if not region:
@@ -82,7 +81,7 @@ def update_region(
 def delete_region(
     region_id: int,
     db: Session = Depends(get_db_session),
-    admin: User = Depends(require_role("admin")),
+    admin: Principal = Depends(require_role("admin")),
 ):
     region = db.query(Region).filter(Region.id == region_id).first()
     if not region:
@@ -1,7 +1,7 @@
 # backend/app/schemas/booking.py
 
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -25,3 +25,23 @@ class BookingOut(BookingBase):
 
     class Config:
         orm_mode = True
+
+
+class BookingBatchCreate(BaseModel):
+    """
+    A whole service week (or two) submitted at once.
+    Items are validated together and inserted in one transaction.
+    """
+    bookings: List[BookingCreate] = Field(..., min_items=1, max_items=14)
+
+
+class BookingBatchItemResult(BaseModel):
+    index: int                         # position in the request list
+    ok: bool
+    booking: Optional[BookingOut] = None
+    error: Optional[str] = None
+
+
+class BookingBatchOut(BaseModel):
+    created: int
+    results: List[BookingBatchItemResult]
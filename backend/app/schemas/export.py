@@ -0,0 +1,18 @@
+# backend/app/schemas/export.py
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExportJobCreate(BaseModel):
+    """POST /admin/exports: a background export of a booking date range."""
+    start_date: date
+    end_date: date = Field(..., description="Inclusive")
+    format: str = Field("csv", description="csv | ndjson")
+    compress: Optional[str] = Field(None, description="gzip: store and serve a .gz file")
+
+    # Filters
+    user_id: Optional[int] = None
+    time_block: Optional[str] = None
@@ -1,10 +1,15 @@
 # backend/app/schemas/menu.py
 
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
 
+# A dish taxonomy category name (meat, fish, poultry, ... see
+# /admin/dish-taxonomy); validated against the taxonomy by the admin router
+DishType = str
+
+
 class MenuDayBase(BaseModel):
     day_number: int = Field(..., ge=1, le=14, description="Rotation day number (1–14)")
     dish_a: str
@@ -16,12 +21,52 @@ class MenuDayBase(BaseModel):
 class MenuDayCreate(MenuDayBase):
     """
     Used by admin to create or update a rotation day.
+    Dish types are inferred from the names unless given explicitly.
     """
-    pass
+    dish_a_type: Optional[DishType] = None
+    dish_b_type: Optional[DishType] = None
 
 
 class MenuDayOut(MenuDayBase):
     id: int
+    dish_a_type: DishType
+    dish_b_type: DishType
+    dish_types_manual: bool
+
+    class Config:
+        orm_mode = True
+
+
+class DishCategoryIn(BaseModel):
+    """Admin create/update of one dish taxonomy category."""
+    priority: int = Field(..., description="Higher wins when a name matches several categories")
+    keywords: List[str] = Field(default_factory=list, description="Matched case- and accent-insensitively")
+    is_default: bool = Field(False, description="Type of dishes that match no keyword")
+
+
+class DishCategoryOut(DishCategoryIn):
+    name: str
+
+    class Config:
+        orm_mode = True
+
+
+class RecipeLineIn(BaseModel):
+    """One ingredient of a dish, per portion."""
+    ingredient: str = Field(..., min_length=1, max_length=100)
+    quantity: float = Field(..., gt=0, description="Net quantity per portion, in unit")
+    unit: str = Field(..., min_length=1, max_length=20, description="g, ml, pcs, ...")
+    yield_loss: float = Field(
+        0.0,
+        ge=0,
+        lt=1,
+        description="Share lost in preparation; 0.2 buys 1.25x the net quantity",
+    )
+
+
+class RecipeLineOut(RecipeLineIn):
+    id: int
+    dish: str
 
     class Config:
         orm_mode = True
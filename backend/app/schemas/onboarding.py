@@ -9,7 +9,8 @@ from pydantic import BaseModel, Field
 
 
 ClientType = Literal["weekly", "subscriber"]
-PrefType = Literal["meat", "fish", "blank"]
+# A dish taxonomy category name (see /admin/dish-taxonomy) or "blank"
+PrefType = str
 
 
 class FirstWeekDaySelection(BaseModel):
@@ -0,0 +1,63 @@
+# backend/app/services/data_versions.py
+
+"""
+Named version counters (data_versions table) for data that each worker
+caches in memory. Writers call bump_version() inside the transaction that
+changes the data; readers compare read_version() with what they loaded.
+
+Bookings are versioned per delivery date ("bookings:YYYY-MM-DD", see
+bump_booking_versions) so that caches of one day or week are not
+invalidated by writes to other dates.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.data_version import DataVersion
+
+
+def read_version(db: Session, name: str) -> Tuple[int, Optional[datetime]]:
+    """(version, updated_at); (0, None) when the counter was never bumped."""
+    row = db.execute(
+        select(DataVersion.version, DataVersion.updated_at).where(DataVersion.name == name)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def bump_version(db: Session, name: str) -> int:
+    """
+    Increment the counter inside the caller's transaction (no commit).
+    One upsert, so concurrent writers never lose an increment or collide
+    creating the row.
+    """
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    now = datetime.utcnow()
+    stmt = insert(DataVersion).values(name=name, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={"version": DataVersion.version + 1, "updated_at": now},
+    ).returning(DataVersion.version)
+    return db.execute(stmt).scalar_one()
+
+
+def read_versions(db: Session, names: List[str]) -> Dict[str, int]:
+    """{name: version} for several counters in one query (0 when never bumped)."""
+    found = dict(
+        db.execute(
+            select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names))
+        ).all()
+    )
+    return {name: found.get(name, 0) for name in names}
+
+
+def booking_version_name(day: date) -> str:
+    return f"bookings:{day.isoformat()}"
+
+
+def bump_booking_versions(db: Session, days: Iterable[date]) -> Dict[date, int]:
+    """Bump the counter of every delivery date whose bookings changed (no commit)."""
+    return {day: bump_version(db, booking_version_name(day)) for day in sorted(set(days))}
@@ -0,0 +1,262 @@
+# backend/app/services/dish_taxonomy.py
+
+"""
+Admin-managed dish taxonomy (dish_categories) and the reclassification job.
+
+Every edit through /admin/dish-taxonomy bumps the "dish_taxonomy" data
+version. sync_taxonomy(db) compares that version with the one compiled into
+this worker's matcher (one primary-key SELECT) and, when it changed, compiles
+a new DishMatcher and swaps it in (services/dish_type.set_matcher). It runs
+at startup and before every classification that gets stored (admin menu
+writes, reclassification), so each uvicorn worker classifies with the
+latest taxonomy without a restart.
+
+Stored MenuDay types are not touched by a taxonomy edit. The
+reclassification job recomputes them in bulk and reports which subscriber
+auto-picks (1-meal template days) would flip over the next rotation cycle:
+    python -m app.services.dish_taxonomy --dry-run   # report only
+    python -m app.services.dish_taxonomy             # apply
+or POST /admin/jobs/reclassify-dishes?dry_run=true|false.
+"""
+
+import sys
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..models.menu import DishCategory, MenuDay
+from ..models.onboarding import OnboardingBehaviorCell, OnboardingFirstWeekSelection
+from ..models.user import User
+from .data_versions import bump_version, read_version
+from .dish_type import (
+    DEFAULT_DISH_TYPE,
+    DishMatcher,
+    current_matcher,
+    pick_single_dish_by_type,
+    set_matcher,
+)
+from .menu_rotation import bump_menu_version, get_rotation_day_number, menu_rotation
+
+TAXONOMY_VERSION_NAME = "dish_taxonomy"
+
+# Flips listed individually in the job report (the total is always given)
+MAX_REPORTED_FLIPS = 200
+
+_loaded_version: Optional[int] = None
+_sync_lock = threading.Lock()
+
+
+def load_matcher(db: Session) -> DishMatcher:
+    """Compile the taxonomy stored in the DB (does not swap it in)."""
+    version, _ = read_version(db, TAXONOMY_VERSION_NAME)
+    rows = db.execute(
+        select(DishCategory.name, DishCategory.keywords, DishCategory.is_default).order_by(
+            DishCategory.priority.desc(), DishCategory.name
+        )
+    ).all()
+    default = next((r.name for r in rows if r.is_default), DEFAULT_DISH_TYPE)
+    return DishMatcher(
+        [(r.name, r.keywords or []) for r in rows],
+        default=default,
+        version=version,
+    )
+
+
+def sync_taxonomy(db: Session) -> DishMatcher:
+    """Swap in the stored taxonomy if its version differs from the compiled one."""
+    global _loaded_version
+    version, _ = read_version(db, TAXONOMY_VERSION_NAME)
+    if version == _loaded_version:
+        return current_matcher()
+    with _sync_lock:
+        if version != _loaded_version:
+            set_matcher(load_matcher(db))
+            _loaded_version = version
+    return current_matcher()
+
+
+def bump_taxonomy_version(db: Session) -> int:
+    """Call inside the edit's transaction, then sync_taxonomy() after the commit."""
+    return bump_version(db, TAXONOMY_VERSION_NAME)
+
+
+def known_dish_types(db: Session) -> Set[str]:
+    matcher = sync_taxonomy(db)
+    return set(matcher.categories) | {matcher.default}
+
+
+# ---------------------------------------------------------------------------
+# Reclassification job
+# ---------------------------------------------------------------------------
+
+def _auto_pick_flips(
+    db: Session,
+    old_types: Dict[int, Tuple[str, str]],
+    new_types: Dict[int, Tuple[str, str]],
+    first_week: date,
+) -> List[Dict[str, Any]]:
+    """
+    Subscriber 1-meal template days whose A/B auto-pick changes between the
+    two classifications, over the two service weeks from first_week (= every
+    rotation day once). Preloads with one query per table.
+    """
+    changed_days = {n for n in new_types if old_types.get(n) != new_types[n]}
+    if not changed_days:
+        return []
+
+    is_subscriber = (
+        User.client_type == "subscriber",
+        User.is_active.is_(True),
+        User.onboarding_draft_id.isnot(None),
+    )
+    draft_ids = select(User.onboarding_draft_id).where(*is_subscriber).scalar_subquery()
+
+    prefs: Dict[str, Dict[int, str]] = defaultdict(dict)
+    for draft_id, weekday_index, pref in db.execute(
+        select(
+            OnboardingBehaviorCell.draft_id,
+            OnboardingBehaviorCell.weekday_index,
+            OnboardingBehaviorCell.pref,
+        ).where(
+            OnboardingBehaviorCell.draft_id.in_(draft_ids),
+            OnboardingBehaviorCell.slot == 1,
+        )
+    ):
+        prefs[draft_id][weekday_index] = pref
+
+    single_meal_days: Dict[str, List[int]] = defaultdict(list)
+    for draft_id, weekday_index in db.execute(
+        select(
+            OnboardingFirstWeekSelection.draft_id,
+            OnboardingFirstWeekSelection.weekday_index,
+        ).where(
+            OnboardingFirstWeekSelection.draft_id.in_(draft_ids),
+            OnboardingFirstWeekSelection.meals == 1,
+        )
+    ):
+        single_meal_days[draft_id].append(weekday_index)
+
+    flips: List[Dict[str, Any]] = []
+    for user_id, draft_id in db.execute(
+        select(User.id, User.onboarding_draft_id).where(*is_subscriber).order_by(User.id)
+    ):
+        for weekday_index in sorted(single_meal_days.get(draft_id, ())):
+            desired = prefs[draft_id].get(weekday_index, "meat")
+            if desired == "blank":
+                continue
+            for week in (first_week, first_week + timedelta(days=7)):
+                d = week + timedelta(days=weekday_index)
+                day_number = get_rotation_day_number(d)
+                if day_number not in changed_days:
+                    continue
+                before = pick_single_dish_by_type(desired, *old_types[day_number])
+                after = pick_single_dish_by_type(desired, *new_types[day_number])
+                if before != after:
+                    flips.append(
+                        {
+                            "user_id": user_id,
+                            "date": d,
+                            "preference": desired,
+                            "before": before,
+                            "after": after,
+                        }
+                    )
+    return flips
+
+
+def reclassify_menu(db: Session, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Recompute the stored dish types of every MenuDay (except days with a
+    manual override) with the current taxonomy, in one SELECT and one
+    executemany UPDATE. Commits unless dry_run.
+    """
+    from .subscriber_weeks import next_service_week
+
+    matcher = sync_taxonomy(db)
+    rows = db.execute(
+        select(
+            MenuDay.id,
+            MenuDay.day_number,
+            MenuDay.dish_a,
+            MenuDay.dish_b,
+            MenuDay.dish_a_type,
+            MenuDay.dish_b_type,
+            MenuDay.dish_types_manual,
+        ).order_by(MenuDay.day_number)
+    ).all()
+
+    old_types: Dict[int, Tuple[str, str]] = {}
+    new_types: Dict[int, Tuple[str, str]] = {}
+    changes: List[Dict[str, Any]] = []
+    for r in rows:
+        old_types[r.day_number] = (r.dish_a_type, r.dish_b_type)
+        if r.dish_types_manual:
+            new_types[r.day_number] = old_types[r.day_number]
+            continue
+        new_types[r.day_number] = (matcher.classify(r.dish_a), matcher.classify(r.dish_b))
+        if new_types[r.day_number] != old_types[r.day_number]:
+            changes.append(
+                {
+                    "b_id": r.id,
+                    "day_number": r.day_number,
+                    "dish_a": r.dish_a,
+                    "dish_b": r.dish_b,
+                    "before": old_types[r.day_number],
+                    "after": new_types[r.day_number],
+                }
+            )
+
+    flips = _auto_pick_flips(db, old_types, new_types, next_service_week())
+
+    if not dry_run and changes:
+        db.connection().execute(
+            update(MenuDay.__table__)
+            .where(MenuDay.__table__.c.id == bindparam("b_id"))
+            .values(dish_a_type=bindparam("b_a"), dish_b_type=bindparam("b_b")),
+            [{"b_id": c["b_id"], "b_a": c["after"][0], "b_b": c["after"][1]} for c in changes],
+        )
+        bump_menu_version(db)
+        db.commit()
+        menu_rotation.mark_stale()
+
+    return {
+        "dry_run": dry_run,
+        "taxonomy_version": matcher.version,
+        "days_checked": len(rows),
+        "days_manual": sum(1 for r in rows if r.dish_types_manual),
+        "days_changed": [{k: v for k, v in c.items() if k != "b_id"} for c in changes],
+        "auto_pick_flips_total": len(flips),
+        "auto_pick_flips": flips[:MAX_REPORTED_FLIPS],
+    }
+
+
+def main(argv: List[str]) -> int:
+    from ..database import SessionLocal, engine
+    from ..migrations import run_migrations
+
+    dry_run = "--dry-run" in argv
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        report = reclassify_menu(db, dry_run=dry_run)
+    finally:
+        db.close()
+
+    for c in report["days_changed"]:
+        print(f"day {c['day_number']:2d}: {c['before']} -> {c['after']}  ({c['dish_a']} / {c['dish_b']})")
+    for f in report["auto_pick_flips"]:
+        print(f"user {f['user_id']} {f['date']} ({f['preference']}): {f['before']} -> {f['after']}")
+    print(
+        f"{len(report['days_changed'])} menu days {'would change' if dry_run else 'changed'}, "
+        f"{report['auto_pick_flips_total']} subscriber auto-picks would flip "
+        f"(taxonomy v{report['taxonomy_version']})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
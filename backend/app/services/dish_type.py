@@ -1,32 +1,193 @@
 # backend/app/services/dish_type.py
 
 import re
-from typing import Optional
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 _FISH_KEYWORDS = {
-    # Portuguese + English common fish/seafood terms
-    "fish", "salmon", "tuna", "cod", "hake", "sardine", "anchovy",
-    "bacalhau", "atum", "salmão", "salmao", "pescada", "robalo", "dourada",
-    "polvo", "lulas", "camarao", "camarão", "shrimp", "prawn",
+    # Portuguese + English common fish/seafood terms (accents are folded,
+    # so "salmão" also covers "salmao", "camarão" covers "camarao", ...)
+    "fish", "salmon", "tuna", "cod", "hake", "sardine", "sardinha", "anchovy",
+    "bacalhau", "atum", "salmão", "pescada", "robalo", "dourada",
+    "polvo", "lulas", "camarão", "shrimp", "prawn",
     "octopus", "squid", "marisco", "seafood", "enguia", "trout", "tilapia",
 }
 
+# Built-in taxonomy: (category, priority, keywords). The first category (by
+# priority, highest first) with a keyword in the name wins; no match means
+# DEFAULT_DISH_TYPE. Seeds the admin-editable dish_categories table
+# (services/dish_taxonomy), which replaces it at runtime.
+DEFAULT_DISH_TYPE = "meat"
+DEFAULT_TAXONOMY: List[Tuple[str, int, List[str]]] = [
+    ("fish", 50, sorted(_FISH_KEYWORDS)),
+    ("poultry", 40, [
+        "frango", "chicken", "peru", "turkey", "pato", "duck", "galinha",
+    ]),
+    ("meat", 30, [
+        "carne", "beef", "vaca", "bife", "steak", "porco", "pork", "borrego",
+        "lamb", "vitela", "veal", "bacon", "chourico", "presunto",
+    ]),
+    ("vegetarian", 20, [
+        "vegetariano", "vegetariana", "vegetarian", "omelete", "omelette",
+        "ovos", "eggs", "queijo", "cheese",
+    ]),
+    ("vegan", 10, [
+        "vegan", "vegano", "vegana", "tofu", "tempeh", "seitan", "lentilhas",
+        "lentils", "grao-de-bico", "chickpea", "falafel",
+    ]),
+]
+
+# Distinct normalized names remembered per matcher
+_MEMO_SIZE = 4096
+
+
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+
+
+def fold_text(text: str) -> str:
+    """Casefold, strip accents (NFKD minus combining marks), collapse whitespace."""
+    s = text.casefold()
+    if not s.isascii():
+        s = _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", s))
+    return " ".join(s.split())
+
+
+def _prefix_pattern(words: Iterable[str]) -> str:
+    """
+    Alternation regex factored by common prefix, e.g. salmao|salmon|sardine ->
+    s(?:a(?:lm(?:ao|on)|rdine)). The regex engine then branches on one
+    character at a time instead of retrying every keyword at each position.
+    Only "does any keyword occur" matters, so a keyword that is a prefix of
+    another makes the longer one redundant.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        if "" in node:
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+
+class DishMatcher:
+    """
+    Keyword matcher compiled once: every category's keywords are folded and
+    merged into one prefix-factored regex (one named group per category), so
+    a name is scanned in a single pass instead of one substring test per
+    keyword. The groups sit in a lookahead, so matches consume nothing and
+    overlapping keywords are all seen ("porcod" holds both "porco" and
+    "cod"); at each position the highest-priority group is tried first.
+    Results are memoized per name (LRU), so repeated names skip folding and
+    scanning altogether.
+
+    categories: (name, keywords) in priority order, first wins.
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[Tuple[str, Iterable[str]]],
+        default: str = DEFAULT_DISH_TYPE,
+        version: int = 0,
+    ):
+        self.default = default
+        self.version = version
+        self.categories: List[str] = []
+        self.keywords: Dict[str, Tuple[str, ...]] = {}
+        groups = []
+        for name, keywords in categories:
+            folded = sorted({fold_text(k) for k in keywords if k and k.strip()})
+            self.categories.append(name)
+            self.keywords[name] = tuple(folded)
+            if folded:
+                groups.append(f"(?P<c{len(self.categories) - 1}>{_prefix_pattern(folded)})")
+        self._pattern = re.compile(f"(?={'|'.join(groups)})") if groups else None
+        self._classify = lru_cache(maxsize=_MEMO_SIZE)(self._classify_uncached)
+
+    def _classify_uncached(self, dish_name: str) -> str:
+        if self._pattern is None:
+            return self.default
+        best: Optional[int] = None
+        for match in self._pattern.finditer(fold_text(dish_name)):
+            rank = int(match.lastgroup[1:])
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return self.categories[best] if best is not None else self.default
+
+    def classify(self, dish_name: Optional[str]) -> str:
+        if not dish_name:
+            return self.default
+        return self._classify(dish_name)
+
+    def stats(self) -> Dict[str, int]:
+        info = self._classify.cache_info()
+        return {
+            "version": self.version,
+            "categories": len(self.categories),
+            "keywords": sum(len(k) for k in self.keywords.values()),
+            "memo_size": info.currsize,
+            "memo_hits": info.hits,
+            "memo_misses": info.misses,
+        }
+
+
+_matcher = DishMatcher(
+    [(name, keywords) for name, _, keywords in sorted(DEFAULT_TAXONOMY, key=lambda c: -c[1])]
+)
+_swap_lock = threading.Lock()
+
+
+def set_matcher(matcher: DishMatcher) -> DishMatcher:
+    """
+    Swap in a newly compiled matcher (a single reference assignment, so
+    concurrent callers see either the old or the new one, never a mix).
+    """
+    global _matcher
+    with _swap_lock:
+        _matcher = matcher
+    return matcher
+
+
+def current_matcher() -> DishMatcher:
+    return _matcher
+
 
 def infer_dish_type(dish_name: Optional[str]) -> str:
     """
-    Deterministic classifier for Slice 1.
+    Deterministic classifier.
+
+    - The highest-priority taxonomy category with a keyword in the name
+      (fish, poultry, meat, vegetarian, vegan, ... see dish_taxonomy)
+    - Else the default category ('meat')
+
+    Behaviour storage must only use category names or 'blank' (never dish names).
+    """
+    return _matcher.classify(dish_name)
 
-    - If dish name contains a fish/seafood keyword -> 'fish'
-    - Else -> 'meat'
 
-    Behaviour storage must only use: meat | fish | blank (never dish names).
+def pick_single_dish(desired_type: str, dish_a: Optional[str], dish_b: Optional[str]) -> str:
     """
-    if not dish_name:
-        return "meat"
+    Subscriber auto-pick for a 1-meal day:
+    A if it matches the preferred type, else B if it does, else fallback A.
+    """
+    return pick_single_dish_by_type(desired_type, infer_dish_type(dish_a), infer_dish_type(dish_b))
+
 
-    s = re.sub(r"\s+", " ", dish_name.strip().lower())
-    for kw in _FISH_KEYWORDS:
-        if kw in s:
-            return "fish"
-    return "meat"
+def pick_single_dish_by_type(desired_type: str, dish_a_type: str, dish_b_type: str) -> str:
+    """Same as pick_single_dish() for already classified dishes."""
+    if dish_a_type == desired_type:
+        return "A"
+    if dish_b_type == desired_type:
+        return "B"
+    return "A"
@@ -0,0 +1,118 @@
+# backend/app/services/export_cache.py
+
+"""
+On-disk cache of rendered booking exports.
+
+A key is (export name, first date, last date, data versions): see
+services/export_data.export_version(). Booking writes bump the versions of
+the dates they touch, menu edits the rotation version and address edits the
+"clients" version, so a key never needs invalidating: after a real change
+the next download simply misses and renders a new file. Locked weeks keep
+their key until the snapshot is rewritten.
+
+Files live in EXPORT_CACHE_DIR, shared by the workers of one host. A miss
+streams the export to the client while writing it to a temporary file that
+is renamed into place only once complete; hits are served from disk
+(FileResponse, sendfile where the server supports it). Files are touched on
+every hit, and the least recently used ones are removed once the directory
+grows past EXPORT_CACHE_MAX_BYTES.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Iterator, Optional
+
+from ..config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES
+
+
+class ExportFileCache:
+    """Size-bounded LRU of files, keyed by any repr()-stable key."""
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".export"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def get(self, key: Hashable) -> Optional[Path]:
+        path = self._path(key)
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def tee(self, key: Hashable, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Yield chunks unchanged while writing them to the cache; the file is
+        published only if the whole export was produced (not on a client
+        disconnect or an error).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp, self._path(key))
+            complete = True
+            self.stores += 1
+        finally:
+            if not complete:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed by another worker
+                files.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "max_bytes": self.max_bytes,
+        }
+
+
+export_cache = ExportFileCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,479 @@
+# backend/app/services/export_data.py
+
+"""
+Shared data source of the booking exports (CSV endpoints, driver sheet).
+
+export_bookings(db, start, end) decides once, with the request's session,
+where a range is read from:
+- weeks with a snapshot (services/week_snapshots): the frozen rows, one table;
+- otherwise the live tables: one SELECT joining bookings, users and
+  addresses, projected to the exported columns, with dish names resolved
+  from one load of the menu rotation.
+
+Both paths yield the same ExportBooking rows, fetched EXPORT_YIELD_PER at a
+time on a session owned by the iterator (a StreamingResponse body is sent
+after the request's session has been closed). stream_keyset() pages
+through a table by primary key instead, one short query per batch, for
+scans that would otherwise hold a read transaction open for minutes (the
+client export).
+
+export_version(db, start, end) tags what export_bookings() would return, for
+services/export_cache. render_bookings() encodes the rows as CSV or NDJSON
+and gzip_chunks() compresses any such stream, chunk by chunk; zip_chunks()
+packs several streams into one zip archive, also as it goes.
+"""
+
+import csv
+import io
+import json
+import time
+import zipfile
+import zlib
+from datetime import date, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from ..config import EXPORT_CHUNK_SIZE, EXPORT_GZIP_LEVEL, EXPORT_YIELD_PER
+from ..database import SessionLocal
+from ..models.address import Address
+from ..models.booking import Booking, WeekSnapshotBooking
+from ..models.user import User
+from .data_versions import booking_version_name, read_versions
+from .menu_rotation import (
+    MENU_VERSION_NAME,
+    RotationDay,
+    get_rotation_day_number,
+    menu_rotation,
+)
+from .service_week import get_week_start
+from .week_snapshots import dish_name_for, format_address_text, snapshot_rows_query
+
+T = TypeVar("T")
+
+# Bumped by address edits (client names/phones are not editable via the API)
+CLIENTS_VERSION_NAME = "clients"
+
+
+class ExportBooking(NamedTuple):
+    booking_id: int
+    delivery_date: date
+    time_block: str
+    status: str
+    user_id: int
+    client_name: str
+    client_phone: Optional[str]
+    address_label: Optional[str]
+    address_text: str
+    meals: int
+    dish_choice: Optional[str]
+    dish_name: str
+
+
+def stream_query(stmt: Select, to_row: Callable[[object], T]) -> Iterator[T]:
+    """Yield to_row(row) per result row of stmt, run on its own session."""
+    db = SessionLocal()
+    try:
+        for r in db.execute(stmt.execution_options(yield_per=EXPORT_YIELD_PER)):
+            yield to_row(r)
+    finally:
+        db.close()
+
+
+def stream_keyset(
+    stmt: Select,
+    key: Any,
+    to_row: Callable[[object], T],
+    batch_size: int = EXPORT_YIELD_PER,
+) -> Iterator[T]:
+    """
+    Yield to_row(row) per result row of stmt (which must select key, a
+    unique column, and have no ORDER BY / LIMIT) in key order, one
+    "key > last LIMIT batch_size" query at a time on its own session. Each
+    batch is its own read transaction, so neither memory nor the time a
+    snapshot is held grows with the table.
+    """
+    db = SessionLocal()
+    try:
+        last = None
+        while True:
+            page = stmt.order_by(key).limit(batch_size)
+            if last is not None:
+                page = page.where(key > last)
+            rows = db.execute(page).all()
+            db.commit()
+            for r in rows:
+                yield to_row(r)
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]._mapping[key]
+    finally:
+        db.close()
+
+
+def _from_snapshot(r) -> ExportBooking:
+    return ExportBooking(
+        booking_id=r.booking_id,
+        delivery_date=r.delivery_date,
+        time_block=r.time_block,
+        status=r.status,
+        user_id=r.user_id,
+        client_name=r.client_name,
+        client_phone=r.client_phone,
+        address_label=r.address_label,
+        address_text=r.address_text,
+        meals=r.meals,
+        dish_choice=r.dish_choice,
+        dish_name=r.dish_name,
+    )
+
+
+BOOKING_STATUSES = ("active", "locked", "cancelled")
+
+
+def _live_query(start: date, end: date, status: Optional[str] = None) -> Select:
+    if status is None:
+        status_filter = (Booking.status != "cancelled",)
+    elif status == "cancelled":
+        status_filter = (Booking.status == "cancelled",)
+    else:
+        # The redundant != keeps SQLite on the partial ix_bookings_live_date_time
+        status_filter = (Booking.status != "cancelled", Booking.status == status)
+    return (
+        select(
+            Booking.id,
+            Booking.delivery_date,
+            Booking.time_block,
+            Booking.status,
+            Booking.user_id,
+            Booking.meals,
+            Booking.dish_choice,
+            User.name,
+            User.phone,
+            Address.label,
+            Address.line1,
+            Address.line2,
+            Address.postal_code,
+            Address.city,
+        )
+        .join(User, User.id == Booking.user_id)
+        .outerjoin(Address, Address.id == Booking.address_id)
+        .where(
+            Booking.delivery_date >= start,
+            Booking.delivery_date <= end,
+            *status_filter,
+        )
+        .order_by(Booking.delivery_date, Booking.time_block, Booking.id)
+    )
+
+
+def export_bookings(
+    db: Session,
+    start: date,
+    end: date,
+    user_id: Optional[int] = None,
+    time_block: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Iterator[ExportBooking]:
+    """
+    Live (not cancelled) bookings delivered between start and end inclusive,
+    optionally of one client / time block / status (one of BOOKING_STATUSES),
+    ordered by date, time block, booking id. Lazy: nothing is fetched until
+    the iterator is consumed.
+    """
+    # Snapshots hold no cancelled rows; those are always read live
+    frozen = snapshot_rows_query(db, start, end) if status != "cancelled" else None
+    if frozen is not None:
+        if user_id is not None:
+            frozen = frozen.where(WeekSnapshotBooking.user_id == user_id)
+        if time_block is not None:
+            frozen = frozen.where(WeekSnapshotBooking.time_block == time_block)
+        if status is not None:
+            frozen = frozen.where(WeekSnapshotBooking.status == status)
+        return stream_query(frozen, _from_snapshot)
+
+    live = _live_query(start, end, status)
+    if user_id is not None:
+        live = live.where(Booking.user_id == user_id)
+    if time_block is not None:
+        live = live.where(Booking.time_block == time_block)
+
+    rotation: Dict[int, RotationDay] = {m.day_number: m for m in menu_rotation.days(db)}
+    menu_by_date: Dict[date, Optional[RotationDay]] = {}
+
+    def to_row(r) -> ExportBooking:
+        if r.delivery_date not in menu_by_date:
+            menu_by_date[r.delivery_date] = rotation.get(get_rotation_day_number(r.delivery_date))
+        menu = menu_by_date[r.delivery_date]
+        return ExportBooking(
+            booking_id=r.id,
+            delivery_date=r.delivery_date,
+            time_block=r.time_block,
+            status=r.status,
+            user_id=r.user_id,
+            client_name=r.name,
+            client_phone=r.phone,
+            address_label=r.label,
+            address_text=(
+                format_address_text(r.line1, r.line2, r.postal_code, r.city)
+                if r.line1 is not None
+                else ""
+            ),
+            meals=r.meals,
+            dish_choice=r.dish_choice,
+            # Raw code when the rotation day isn't configured
+            dish_name=(
+                dish_name_for(menu.dish_a, menu.dish_b, r.meals, r.dish_choice)
+                if menu
+                else (r.dish_choice or "")
+            ),
+        )
+
+    return stream_query(live, to_row)
+
+
+def export_bookings_by_day(
+    start: date,
+    end: date,
+    status: Optional[str] = None,
+) -> Iterator[ExportBooking]:
+    """
+    export_bookings() over start..end, read one delivery day at a time on a
+    fresh session: a short index range query per day, so memory and the
+    time a read transaction stays open don't grow with the range.
+    """
+    d = start
+    while d <= end:
+        db = SessionLocal()
+        try:
+            yield from export_bookings(db, d, d, status=status)
+        finally:
+            db.close()
+        d += timedelta(days=1)
+
+
+def service_weeks(start: date, end: date) -> Iterator[Tuple[date, date]]:
+    """(first, last) day of each service week overlapping start..end."""
+    week_start = get_week_start(start)
+    while week_start <= end:
+        yield max(start, week_start), min(end, week_start + timedelta(days=6))
+        week_start += timedelta(days=7)
+
+
+# ---------------------------------------------------------------------------
+# CSV encoding
+# ---------------------------------------------------------------------------
+
+BOOKING_CSV_HEADERS = [
+    "Date",
+    "Time Block",
+    "Client Name",
+    "Phone",
+    "label",
+    "Address",
+    "Meals (qty)",
+    "Dish Choice",
+]
+
+
+def booking_csv_rows(bookings: Iterable[ExportBooking]) -> Iterator[List[Any]]:
+    """CSV rows (BOOKING_CSV_HEADERS) of export_bookings() results."""
+    for b in bookings:
+        yield [
+            b.delivery_date.isoformat(),
+            b.time_block,
+            b.client_name,
+            b.client_phone,
+            b.address_label or "",
+            b.address_text,
+            b.meals,
+            b.dish_name,
+        ]
+
+
+def iter_csv(
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    header: bool = True,
+) -> Iterator[str]:
+    """
+    Encode rows incrementally: the header line is yielded at once, then
+    chunks of about chunk_size characters, so memory stays flat for any
+    export size.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(headers)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= chunk_size:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    if buf.tell():
+        yield buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# NDJSON encoding
+# ---------------------------------------------------------------------------
+
+def booking_record(b: ExportBooking) -> Dict[str, Any]:
+    """One NDJSON object: the CSV columns plus ids, status and the raw dish code."""
+    return {
+        "booking_id": b.booking_id,
+        "date": b.delivery_date.isoformat(),
+        "time_block": b.time_block,
+        "status": b.status,
+        "user_id": b.user_id,
+        "client_name": b.client_name,
+        "phone": b.client_phone,
+        "address_label": b.address_label,
+        "address": b.address_text,
+        "meals": b.meals,
+        "dish_choice": b.dish_choice,
+        "dish_name": b.dish_name,
+    }
+
+
+def iter_ndjson(
+    records: Iterable[Dict[str, Any]],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """One compact JSON object per line, yielded in chunks of about chunk_size characters."""
+    parts: List[str] = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(parts)
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Output formats
+# ---------------------------------------------------------------------------
+
+# Part of the export cache key of booking exports: bump when their columns
+# or NDJSON fields change, so files cached by an older release are not served
+BOOKING_EXPORT_LAYOUT = 2
+
+# format -> (media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def render_bookings(
+    bookings: Iterable[ExportBooking],
+    fmt: str,
+    header: bool = True,
+) -> Iterator[str]:
+    """export_bookings() rows as "csv" (BOOKING_CSV_HEADERS) or "ndjson" chunks."""
+    if fmt == "ndjson":
+        return iter_ndjson(booking_record(b) for b in bookings)
+    return iter_csv(BOOKING_CSV_HEADERS, booking_csv_rows(bookings), header=header)
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = EXPORT_GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Gzip a chunk stream incrementally: each chunk is compressed and
+    sync-flushed as it arrives (the compression window is kept across
+    chunks), so the client receives data as soon as it is rendered.
+    """
+    z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = z.compress(chunk.encode("utf-8")) + z.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield z.flush()
+
+
+def encode_chunks(chunks: Iterable[str], gzip: bool) -> Iterator[bytes]:
+    """UTF-8 bytes of a chunk stream, gzip-compressed if asked."""
+    if gzip:
+        return gzip_chunks(chunks)
+    return (chunk.encode("utf-8") for chunk in chunks)
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable file for zipfile that hands written bytes back via drain()."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def zip_chunks(members: Iterable[Tuple[str, Iterable[str]]]) -> Iterator[bytes]:
+    """
+    A deflated zip of (name, chunk stream) members, produced incrementally:
+    one member is rendered at a time and its compressed bytes are yielded as
+    they come (sizes go in data descriptors, so nothing is buffered).
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, chunks in members:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, "w") as member:
+                for chunk in chunks:
+                    member.write(chunk.encode("utf-8"))
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()  # rest of the member + its data descriptor
+    yield sink.drain()  # central directory
+
+
+# ---------------------------------------------------------------------------
+# Cache key
+# ---------------------------------------------------------------------------
+
+def export_version(db: Session, start: date, end: date) -> Tuple[Tuple[str, int], ...]:
+    """
+    Data versions export_bookings(db, start, end) depends on (one query):
+    the bookings of each date, plus the menu rotation and client addresses
+    unless the whole range is read from week snapshots. Read before the
+    export rows, so a cached file is never older than its key.
+    """
+    names = [booking_version_name(start + timedelta(days=i)) for i in range((end - start).days + 1)]
+    if snapshot_rows_query(db, start, end) is None:
+        names += [MENU_VERSION_NAME, CLIENTS_VERSION_NAME]
+    return tuple(sorted(read_versions(db, names).items()))
@@ -0,0 +1,389 @@
+# backend/app/services/export_jobs.py
+
+"""
+Background booking exports for long (multi-month) date ranges.
+
+POST /admin/exports creates an ExportJob row and hands its id to this
+process's ExportJobRunner (EXPORT_JOB_WORKERS threads); the request returns
+at once. The job renders the range one service week at a time, each in its
+own short read (locked weeks from their snapshot), appends it (CSV or
+NDJSON, optionally through one gzip stream) to
+EXPORT_JOB_DIR/<id>.<ext>[.gz].part and records progress on the row, which
+doubles as a heartbeat. The file is renamed into place when complete.
+GET /admin/exports/{id} reads the row, so any worker can answer.
+
+Limits: at most EXPORT_JOB_MAX_ACTIVE jobs queued or running across all
+workers (counted and inserted in one transaction under the write lock on
+submit; 429 beyond), and per process only EXPORT_JOB_WORKERS of them
+render at a time, so exports can't take the request threads or the DB
+away from booking traffic.
+
+Cleanup runs on every submit, or by hand / from cron:
+    python -m app.services.export_jobs cleanup
+- done / failed jobs older than EXPORT_JOB_RETENTION_HOURS: row and file
+  are deleted;
+- running jobs without progress for EXPORT_JOB_STALE_SECONDS, and jobs
+  still queued EXPORT_JOB_QUEUED_TIMEOUT_SECONDS after they were created
+  (their process died or was restarted), are marked failed. A queued job
+  only waits for the jobs ahead of it, so it is timed from created_at;
+  its updated_at never moves before it starts.
+"""
+
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from ..config import (
+    EXPORT_JOB_DIR,
+    EXPORT_JOB_MAX_ACTIVE,
+    EXPORT_JOB_MAX_DAYS,
+    EXPORT_JOB_QUEUED_TIMEOUT_SECONDS,
+    EXPORT_JOB_RETENTION_HOURS,
+    EXPORT_JOB_STALE_SECONDS,
+    EXPORT_JOB_WORKERS,
+)
+from ..database import SessionLocal
+from ..models.export_job import ExportJob
+from .export_data import (
+    EXPORT_FORMATS,
+    encode_chunks,
+    export_bookings,
+    render_bookings,
+    service_weeks,
+)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class ExportJobsBusy(Exception):
+    """EXPORT_JOB_MAX_ACTIVE jobs are already queued or running."""
+
+
+def _extension(job: ExportJob) -> str:
+    ext = EXPORT_FORMATS[job.format][1]
+    return f"{ext}.gz" if job.compression == "gzip" else ext
+
+
+def job_path(job: ExportJob) -> Path:
+    return EXPORT_JOB_DIR / f"{job.id}.{_extension(job)}"
+
+
+def job_filename(job: ExportJob) -> str:
+    """Download name, e.g. bookings_2026-01-07_to_2026-03-31.csv.gz"""
+    return f"bookings_{job.start_date.isoformat()}_to_{job.end_date.isoformat()}.{_extension(job)}"
+
+
+def job_media_type(job: ExportJob) -> str:
+    return "application/gzip" if job.compression == "gzip" else EXPORT_FORMATS[job.format][0]
+
+
+def job_to_dict(job: ExportJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "start_date": job.start_date,
+        "end_date": job.end_date,
+        "filters": job.filters or {},
+        "format": job.format,
+        "compression": job.compression,
+        "progress": {
+            "days_done": job.days_done,
+            "days_total": job.days_total,
+            "percent": round(100 * job.days_done / job.days_total, 1) if job.days_total else 0.0,
+            "rows_written": job.rows_written,
+        },
+        "size_bytes": job.size_bytes,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "download_url": f"/admin/exports/{job.id}/file" if job.status == "done" else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rendering (runs in a runner thread)
+# ---------------------------------------------------------------------------
+
+def _progress(db: Session, job_id: str, **values) -> bool:
+    """Record progress; False if the job is no longer running (e.g. swept as stale)."""
+    result = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == "running")
+        .values(updated_at=datetime.utcnow(), **values)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def run_export_job(job_id: str) -> None:
+    """Render one queued job to disk. Never raises: failures end up on the row."""
+    db = SessionLocal()
+    tmp: Optional[Path] = None
+    try:
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == "queued")
+            .values(status="running", started_at=now, updated_at=now)
+        )
+        db.commit()
+        if claimed.rowcount != 1:
+            return  # swept as stale before it could start
+        job = db.get(ExportJob, job_id)
+        filters = job.filters or {}
+
+        EXPORT_JOB_DIR.mkdir(parents=True, exist_ok=True)
+        path = job_path(job)
+        tmp = path.with_name(path.name + ".part")
+        stopped = False
+
+        def rendered():
+            """All weeks as one chunk stream, recording progress after each week."""
+            nonlocal stopped
+            days_done = 0
+            rows_written = 0
+            for i, (first, last) in enumerate(service_weeks(job.start_date, job.end_date)):
+                counted = 0
+
+                def counting(bookings):
+                    nonlocal counted
+                    for b in bookings:
+                        counted += 1
+                        yield b
+
+                bookings = export_bookings(
+                    db,
+                    first,
+                    last,
+                    user_id=filters.get("user_id"),
+                    time_block=filters.get("time_block"),
+                )
+                yield from render_bookings(counting(bookings), job.format, header=(i == 0))
+
+                days_done += (last - first).days + 1
+                rows_written += counted
+                if not _progress(db, job_id, days_done=days_done, rows_written=rows_written):
+                    stopped = True
+                    return
+
+        with open(tmp, "wb") as f:
+            for data in encode_chunks(rendered(), gzip=job.compression == "gzip"):
+                f.write(data)
+        if stopped:
+            return
+
+        os.replace(tmp, path)
+        tmp = None
+        _progress(
+            db,
+            job_id,
+            status="done",
+            size_bytes=path.stat().st_size,
+            finished_at=datetime.utcnow(),
+        )
+    except Exception as e:  # noqa: BLE001 - reported on the job
+        db.rollback()
+        db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id)
+            .values(
+                status="failed",
+                error=f"{type(e).__name__}: {e}",
+                finished_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            )
+        )
+        db.commit()
+    finally:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+        db.close()
+
+
+class ExportJobRunner:
+    """Per-process thread pool that renders export jobs."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+
+    def submit(self, job_id: str) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="export-job"
+                )
+            self.submitted += 1
+            self._executor.submit(run_export_job, job_id)
+
+    def shutdown(self) -> None:
+        """Stop taking jobs; unfinished ones are swept as stale later."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "submitted": self.submitted}
+
+
+export_job_runner = ExportJobRunner(workers=EXPORT_JOB_WORKERS)
+
+
+# ---------------------------------------------------------------------------
+# Submit / cleanup
+# ---------------------------------------------------------------------------
+
+def _fail_stale_jobs(db: Session, now: datetime) -> int:
+    """
+    Mark jobs whose worker died failed (no commit): running without a
+    heartbeat for EXPORT_JOB_STALE_SECONDS, or still queued
+    EXPORT_JOB_QUEUED_TIMEOUT_SECONDS after they were created.
+    """
+    return db.execute(
+        update(ExportJob)
+        .where(
+            or_(
+                and_(
+                    ExportJob.status == "running",
+                    ExportJob.updated_at < now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS),
+                ),
+                and_(
+                    ExportJob.status == "queued",
+                    ExportJob.created_at < now - timedelta(seconds=EXPORT_JOB_QUEUED_TIMEOUT_SECONDS),
+                ),
+            )
+        )
+        .values(
+            status="failed",
+            error="Export worker stopped before finishing the job",
+            finished_at=now,
+            updated_at=now,
+        )
+    ).rowcount
+
+
+def _delete_expired_jobs(db: Session, now: datetime) -> int:
+    """Delete finished jobs past retention and their files (no commit)."""
+    expired = db.execute(
+        select(ExportJob).where(
+            ExportJob.status.notin_(ACTIVE_STATUSES),
+            ExportJob.finished_at < now - timedelta(hours=EXPORT_JOB_RETENTION_HOURS),
+        )
+    ).scalars().all()
+    for job in expired:
+        path = job_path(job)
+        for p in (path, path.with_name(path.name + ".part")):
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+    if expired:
+        db.execute(delete(ExportJob).where(ExportJob.id.in_([j.id for j in expired])))
+    return len(expired)
+
+
+def cleanup_export_jobs(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Fail stale active jobs and delete expired ones with their files. Commits."""
+    now = now or datetime.utcnow()
+    stale = _fail_stale_jobs(db, now)
+    expired = _delete_expired_jobs(db, now)
+    db.commit()
+    return {"stale_failed": stale, "expired_deleted": expired}
+
+
+def submit_export_job(
+    db: Session,
+    start: date,
+    end: date,
+    fmt: str = "csv",
+    compression: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    requested_by: Optional[int] = None,
+) -> ExportJob:
+    """
+    Validate, enforce EXPORT_JOB_MAX_ACTIVE and queue a job. Raises ValueError
+    for a bad request and ExportJobsBusy at the limit.
+    """
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    days = (end - start).days + 1
+    if days > EXPORT_JOB_MAX_DAYS:
+        raise ValueError(f"Range too long: {days} days (max {EXPORT_JOB_MAX_DAYS})")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (one of: {', '.join(EXPORT_FORMATS)})")
+    if compression not in (None, "gzip"):
+        raise ValueError(f"Unknown compression {compression!r} (gzip or none)")
+
+    # Count and insert in one transaction under the write lock, so two
+    # submits (from any worker) can't both take the last free slot.
+    # Postgres: the table lock conflicts with itself, not with readers.
+    # SQLite: the stale sweep is the transaction's first write and takes
+    # the database write lock even when it matches no rows.
+    now = datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE export_jobs IN SHARE ROW EXCLUSIVE MODE"))
+    _fail_stale_jobs(db, now)
+    _delete_expired_jobs(db, now)
+    active = db.execute(
+        select(func.count()).select_from(ExportJob).where(ExportJob.status.in_(ACTIVE_STATUSES))
+    ).scalar_one()
+    if active >= EXPORT_JOB_MAX_ACTIVE:
+        db.commit()  # keep the cleanup
+        raise ExportJobsBusy()
+
+    job = ExportJob(
+        id=str(uuid.uuid4()),
+        status="queued",
+        requested_by=requested_by,
+        start_date=start,
+        end_date=end,
+        filters={k: v for k, v in (filters or {}).items() if v is not None},
+        format=fmt,
+        compression=compression,
+        days_total=days,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    export_job_runner.submit(job.id)
+    return job
+
+
+def main(argv: List[str]) -> int:
+    from ..database import engine
+    from ..migrations import run_migrations
+
+    if argv != ["cleanup"]:
+        print("usage: python -m app.services.export_jobs cleanup")
+        return 2
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        result = cleanup_export_jobs(db)
+    finally:
+        db.close()
+    print(
+        f"{result['stale_failed']} stale job(s) marked failed, "
+        f"{result['expired_deleted']} expired job(s) deleted"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,294 @@
+# backend/app/services/kitchen_board.py
+
+"""
+Rows of the kitchen board (/kitchen/day) and their live updates
+(/kitchen/stream, Server-Sent Events).
+
+kitchen_rows(db, day) is the day's board: frozen rows for snapshotted weeks,
+otherwise one joined SELECT of the live bookings.
+
+KitchenEventHub is the in-process publisher. The booking router calls
+publish_booking_changes() after each commit; when a screen is watching one
+of the affected days, the changed rows are loaded (one query) and fanned out
+to every subscriber of that day through its asyncio queue
+(loop.call_soon_threadsafe, since routes run in the threadpool). Nothing is
+queried when nobody is watching.
+
+Event ids are "<epoch>-<seq>-<version>":
+- epoch identifies this process and seq orders its events; the last
+  KITCHEN_STREAM_BUFFER events are kept, so a client reconnecting with
+  Last-Event-ID to the same process gets only what it missed;
+- version is the day's booking version (services/data_versions) after the
+  event. Writes this process doesn't see (other uvicorn workers, week
+  locks, onboarding bootstrap) still bump it, and the stream compares it
+  at every heartbeat: when it moved past the last version sent, the client
+  gets a fresh snapshot.
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from ..config import KITCHEN_STREAM_BUFFER, KITCHEN_STREAM_QUEUE
+from ..models.address import Address
+from ..models.booking import Booking
+from ..models.user import User
+from .data_versions import booking_version_name, read_version
+from .menu_rotation import menu_rotation
+from .week_snapshots import dish_name_for, snapshot_rows
+
+
+# ---------------------------------------------------------------------------
+# Board rows
+# ---------------------------------------------------------------------------
+
+def _address_full(*parts: Optional[str]) -> str:
+    """Combined address as shown by kitchen.js: label – line1 – city – postal code."""
+    return " – ".join([p for p in parts if p])
+
+
+def _snapshot_row(r) -> Dict[str, Any]:
+    return {
+        "booking_id": r.booking_id,
+        "status": r.status,
+        "time_block": r.time_block,
+        "meals": r.meals,
+        "dish_choice": r.dish_choice,
+        "dish_description": r.dish_name or None,
+        "address_id": r.address_id,
+        "client_name": r.client_name,
+        "client_phone": r.client_phone,
+        "address_label": r.address_label,
+        "address_line1": r.address_line1,
+        "address_city": r.address_city,
+        "address_postal_code": r.address_postal_code,
+        "address_full": (
+            _address_full(r.address_label, r.address_line1, r.address_city, r.address_postal_code)
+            if r.address_line1 is not None
+            else None
+        ),
+    }
+
+
+def _live_query() -> Select:
+    return (
+        select(
+            Booking.id,
+            Booking.delivery_date,
+            Booking.status,
+            Booking.time_block,
+            Booking.meals,
+            Booking.dish_choice,
+            Booking.address_id,
+            User.name,
+            User.phone,
+            Address.label,
+            Address.line1,
+            Address.city,
+            Address.postal_code,
+        )
+        .outerjoin(User, User.id == Booking.user_id)
+        .outerjoin(Address, Address.id == Booking.address_id)
+    )
+
+
+def _live_row(db: Session, r) -> Dict[str, Any]:
+    menu = menu_rotation.for_date(db, r.delivery_date)
+    return {
+        "booking_id": r.id,
+        "status": r.status,
+        "time_block": r.time_block,
+        "meals": r.meals,
+        "dish_choice": r.dish_choice,
+        "dish_description": (
+            dish_name_for(menu.dish_a, menu.dish_b, r.meals, r.dish_choice) or None
+            if menu
+            else None
+        ),
+        "address_id": r.address_id,
+        "client_name": r.name,
+        "client_phone": r.phone,
+        "address_label": r.label,
+        "address_line1": r.line1,
+        "address_city": r.city,
+        "address_postal_code": r.postal_code,
+        "address_full": (
+            _address_full(r.label, r.line1, r.city, r.postal_code) if r.line1 is not None else None
+        ),
+    }
+
+
+def kitchen_rows(db: Session, day: date) -> List[Dict[str, Any]]:
+    """The day's (not cancelled) bookings, by time block and booking id."""
+    frozen = snapshot_rows(db, day, day)
+    if frozen is not None:
+        return [_snapshot_row(r) for r in frozen]
+
+    live = db.execute(
+        _live_query()
+        .where(Booking.delivery_date == day, Booking.status != "cancelled")
+        .order_by(Booking.time_block, Booking.id)
+    ).all()
+    return [_live_row(db, r) for r in live]
+
+
+def kitchen_board(db: Session, day: date) -> Tuple[int, List[Dict[str, Any]]]:
+    """(booking version, rows) of one day, read in one transaction."""
+    version, _ = read_version(db, booking_version_name(day))
+    return version, kitchen_rows(db, day)
+
+
+# ---------------------------------------------------------------------------
+# Publisher
+# ---------------------------------------------------------------------------
+
+@dataclass
+class KitchenEvent:
+    seq: int
+    day: date
+    kind: str           # created | updated | cancelled | moved
+    data: Dict[str, Any]
+    version: int        # the day's booking version after the change
+
+
+@dataclass(eq=False)
+class KitchenSubscriber:
+    """One connected screen: its day, its queue and the loop that owns it."""
+    day: date
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[KitchenEvent]" = field(
+        default_factory=lambda: asyncio.Queue(maxsize=KITCHEN_STREAM_QUEUE)
+    )
+    overflowed: bool = False
+
+    def deliver(self, event: KitchenEvent) -> None:
+        """Runs on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True  # the stream resends a snapshot
+
+
+class KitchenEventHub:
+    """Fan-out of booking changes to the /kitchen/stream clients of this process."""
+
+    def __init__(self, buffer_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer: Deque[KitchenEvent] = deque(maxlen=buffer_size)
+        self._subscribers: Dict[date, Set[KitchenSubscriber]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def event_id(self, seq: int, version: int) -> str:
+        return f"{self.epoch}-{seq}-{version}"
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def watching(self, day: date) -> bool:
+        return bool(self._subscribers.get(day))
+
+    def subscribe(self, day: date) -> KitchenSubscriber:
+        """Call on the event loop that will read the queue."""
+        sub = KitchenSubscriber(day=day, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[day].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: KitchenSubscriber) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.day)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.day]
+
+    def publish(self, day: date, kind: str, data: Dict[str, Any], version: int) -> KitchenEvent:
+        """Thread-safe; call after the change is committed."""
+        with self._lock:
+            self._seq += 1
+            event = KitchenEvent(self._seq, day, kind, data, version)
+            self._buffer.append(event)
+            subs = list(self._subscribers.get(day, ()))
+            self.published += 1
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                pass  # loop closed: the stream is gone
+        return event
+
+    def replay(self, day: date, last_event_id: str) -> Optional[Tuple[int, int, List[KitchenEvent]]]:
+        """
+        (seq, version, events of day after it) for a Last-Event-ID issued by
+        this process whose successors are all still buffered; else None.
+        """
+        try:
+            epoch, seq_text, version_text = last_event_id.split("-")
+            seq, version = int(seq_text), int(version_text)
+        except ValueError:
+            return None
+        with self._lock:
+            if epoch != self.epoch or seq > self._seq:
+                return None
+            oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+            if seq < oldest - 1:
+                return None
+            events = [e for e in self._buffer if e.seq > seq and e.day == day]
+        return seq, version, events
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "days_watched": len(self._subscribers),
+            "published": self.published,
+            "buffered": len(self._buffer),
+        }
+
+
+kitchen_hub = KitchenEventHub(buffer_size=KITCHEN_STREAM_BUFFER)
+
+
+def publish_booking_changes(
+    db: Session,
+    kind: str,
+    changes: Dict[int, date],
+    versions: Dict[date, int],
+    previous: Optional[Dict[int, date]] = None,
+) -> None:
+    """
+    Announce committed booking changes ({booking_id: delivery_date}) to the
+    screens watching those days. kind is created, updated or cancelled;
+    previous ({booking_id: old date}) adds a "moved" event on the old day
+    for bookings whose date changed.
+    """
+    watched = {bid: d for bid, d in changes.items() if kitchen_hub.watching(d)}
+    if watched:
+        if kind == "cancelled":
+            rows = {bid: {"booking_id": bid} for bid in watched}
+        else:
+            rows = {
+                r.id: _live_row(db, r)
+                for r in db.execute(_live_query().where(Booking.id.in_(list(watched))))
+            }
+        for bid, day in watched.items():
+            if bid in rows:
+                kitchen_hub.publish(day, kind, rows[bid], versions.get(day, 0))
+
+    for bid, old_day in (previous or {}).items():
+        if old_day != changes.get(bid) and kitchen_hub.watching(old_day):
+            kitchen_hub.publish(
+                old_day,
+                "moved",
+                {"booking_id": bid, "delivery_date": changes.get(bid)},
+                versions.get(old_day, 0),
+            )
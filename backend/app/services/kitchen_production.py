@@ -0,0 +1,179 @@
+# backend/app/services/kitchen_production.py
+
+"""
+Kitchen production totals (GET /kitchen/production).
+
+Portions of dish A and dish B per day and time block, and per delivery
+region, computed with GROUP BY in the database instead of shipping every
+booking to the client. Portions are counted as in
+week_snapshots.slot_totals(): a 2-meal or "A+B" booking is one portion of
+each dish.
+
+Snapshotted (locked) ranges read the per-slot totals written with the
+snapshot (week_snapshot_slots) and group the frozen bookings by the region
+of their address; other ranges group the live bookings. Dish names come
+from the menu rotation (in-memory copy, no query when fresh).
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.address import Address
+from ..models.booking import Booking, WeekSnapshotBooking
+from ..models.region import Region
+from .menu_rotation import get_rotation_day_number, menu_rotation
+from .week_snapshots import snapshot_slots
+
+COUNT_KEYS = ("bookings", "meals", "portions_a", "portions_b")
+
+
+def _count_columns(table) -> tuple:
+    """bookings, meals, portions_a, portions_b aggregates over a booking-like table."""
+    both = or_(table.meals == 2, table.dish_choice == "A+B")
+    has_a = case((or_(both, table.dish_choice == "A"), 1), else_=0)
+    has_b = case((or_(both, table.dish_choice == "B"), 1), else_=0)
+    return (
+        func.count().label("bookings"),
+        func.coalesce(func.sum(table.meals), 0).label("meals"),
+        func.coalesce(func.sum(has_a), 0).label("portions_a"),
+        func.coalesce(func.sum(has_b), 0).label("portions_b"),
+    )
+
+
+def _counts(r) -> Dict[str, int]:
+    return {k: getattr(r, k) for k in COUNT_KEYS}
+
+
+def _add(into: Dict[str, int], counts: Dict[str, int]) -> None:
+    for k in COUNT_KEYS:
+        into[k] += counts[k]
+
+
+def _zero() -> Dict[str, int]:
+    return dict.fromkeys(COUNT_KEYS, 0)
+
+
+def _live_slots(db: Session, start: date, end: date) -> List[Any]:
+    return db.execute(
+        select(Booking.delivery_date, Booking.time_block, *_count_columns(Booking))
+        .where(
+            Booking.delivery_date >= start,
+            Booking.delivery_date <= end,
+            Booking.status != "cancelled",
+        )
+        .group_by(Booking.delivery_date, Booking.time_block)
+        .order_by(Booking.delivery_date, Booking.time_block)
+    ).all()
+
+
+def _region_totals(db: Session, table, start: date, end: date, *where) -> List[Any]:
+    """Per day / region counts; bookings without an address region get region_id None."""
+    return db.execute(
+        select(table.delivery_date, Address.region_id, Region.name, *_count_columns(table))
+        .outerjoin(Address, Address.id == table.address_id)
+        .outerjoin(Region, Region.id == Address.region_id)
+        .where(table.delivery_date >= start, table.delivery_date <= end, *where)
+        .group_by(table.delivery_date, Address.region_id, Region.name)
+        .order_by(table.delivery_date, Region.name.is_(None), Region.name)
+    ).all()
+
+
+def day_portions(db: Session, start: date, end: date) -> Tuple[str, Dict[date, Tuple[int, int]]]:
+    """
+    (source, {date: (portions_a, portions_b)}) for start..end: summed from
+    the snapshot slots of a locked range, else one GROUP BY over the live
+    bookings. Days without bookings are left out.
+    """
+    portions: Dict[date, Tuple[int, int]] = {}
+    slots = snapshot_slots(db, start, end)
+    if slots is not None:
+        for r in slots:
+            a, b = portions.get(r.delivery_date, (0, 0))
+            portions[r.delivery_date] = (a + r.portions_a, b + r.portions_b)
+        return "snapshot", portions
+
+    _, _, portions_a, portions_b = _count_columns(Booking)
+    for r in db.execute(
+        select(Booking.delivery_date, portions_a, portions_b)
+        .where(
+            Booking.delivery_date >= start,
+            Booking.delivery_date <= end,
+            Booking.status != "cancelled",
+        )
+        .group_by(Booking.delivery_date)
+    ):
+        portions[r.delivery_date] = (r.portions_a, r.portions_b)
+    return "live", portions
+
+
+def production(db: Session, start: date, end: date) -> Dict[str, Any]:
+    """
+    Totals for start..end (inclusive) from two GROUP BY queries: per day,
+    per time block and per region, plus range totals. Every day of the
+    range is listed, with zeros when nothing is booked.
+    """
+    slots = snapshot_slots(db, start, end)
+    if slots is not None:
+        source = "snapshot"
+        regions = _region_totals(db, WeekSnapshotBooking, start, end)
+    else:
+        source = "live"
+        slots = _live_slots(db, start, end)
+        regions = _region_totals(db, Booking, start, end, Booking.status != "cancelled")
+
+    slots_by_day: Dict[date, List[Any]] = defaultdict(list)
+    for r in slots:
+        slots_by_day[r.delivery_date].append(r)
+    regions_by_day: Dict[date, List[Any]] = defaultdict(list)
+    for r in regions:
+        regions_by_day[r.delivery_date].append(r)
+
+    totals = _zero()
+    range_regions: Dict[Any, Dict[str, Any]] = {}
+    days: List[Dict[str, Any]] = []
+    d = start
+    while d <= end:
+        menu = menu_rotation.for_date(db, d)
+        day_totals = _zero()
+        time_blocks = []
+        for r in slots_by_day.get(d, ()):
+            counts = _counts(r)
+            _add(day_totals, counts)
+            time_blocks.append({"time_block": r.time_block, **counts})
+        day_regions = []
+        for r in regions_by_day.get(d, ()):
+            counts = _counts(r)
+            day_regions.append({"region_id": r.region_id, "region": r.name, **counts})
+            region = range_regions.setdefault(
+                r.region_id, {"region_id": r.region_id, "region": r.name, **_zero()}
+            )
+            _add(region, counts)
+        _add(totals, day_totals)
+        days.append(
+            {
+                "date": d,
+                "day_number": get_rotation_day_number(d),
+                "dish_a": menu.dish_a if menu else None,
+                "dish_b": menu.dish_b if menu else None,
+                "totals": day_totals,
+                "time_blocks": time_blocks,
+                "regions": day_regions,
+            }
+        )
+        d += timedelta(days=1)
+
+    return {
+        "start_date": start,
+        "end_date": end,
+        "source": source,
+        "totals": totals,
+        "days": days,
+        # Named regions first, "no region" last
+        "regions": sorted(
+            range_regions.values(), key=lambda r: (r["region"] is None, r["region"] or "")
+        ),
+    }
@@ -0,0 +1,272 @@
+# backend/app/services/meal_counters.py
+
+"""
+Weekly meal counters: (user_id, week_start) -> active_meals.
+
+Every booking write adjusts the counter inside the same transaction, and the
+MAX_MEALS_PER_WEEK rule is enforced by a conditional UPDATE:
+
+    UPDATE weekly_meal_counters
+       SET active_meals = active_meals + :delta
+     WHERE user_id = :u AND week_start = :w
+       AND active_meals + :delta <= :max
+
+The UPDATE takes the write lock (SQLite) / row lock (Postgres), so two
+concurrent requests can no longer both pass the check.
+
+Missing counter rows are created lazily from the bookings table, so existing
+databases don't need a backfill before the first write. To recompute or
+check every counter:
+
+    python -m app.services.meal_counters rebuild
+    python -m app.services.meal_counters verify
+"""
+
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..config import MAX_MEALS_PER_WEEK
+from ..models.booking import Booking, WeeklyMealCounter
+from .service_week import get_week_start
+
+
+def _insert_ignore(db: Session):
+    """INSERT ... ON CONFLICT DO NOTHING for the counter table."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(WeeklyMealCounter)
+    return sqlite.insert(WeeklyMealCounter)
+
+
+def _week_sum_subquery(user_id: int, week_start: date):
+    return (
+        select(func.coalesce(func.sum(Booking.meals), 0))
+        .where(
+            Booking.user_id == user_id,
+            Booking.delivery_date >= week_start,
+            Booking.delivery_date <= week_start + timedelta(days=6),
+            Booking.status != "cancelled",
+        )
+        .scalar_subquery()
+    )
+
+
+def ensure_counter(db: Session, user_id: int, week_start: date) -> None:
+    """Create the counter row (seeded from bookings) if it doesn't exist yet."""
+    stmt = (
+        _insert_ignore(db)
+        .values(
+            user_id=user_id,
+            week_start=week_start,
+            active_meals=_week_sum_subquery(user_id, week_start),
+        )
+        .on_conflict_do_nothing()
+    )
+    db.execute(stmt)
+
+
+def current_meals(db: Session, user_id: int, week_start: date, for_update: bool = False) -> int:
+    """
+    Read the counter (creating it if needed).
+    for_update=True locks the row on databases that support it. SQLite has
+    no row locks; there the conditional UPDATE in add_meals() is what keeps
+    concurrent writers under the cap.
+    """
+    stmt = select(WeeklyMealCounter.active_meals).where(
+        WeeklyMealCounter.user_id == user_id,
+        WeeklyMealCounter.week_start == week_start,
+    )
+    if for_update:
+        stmt = stmt.with_for_update()
+    meals = db.execute(stmt).scalar_one_or_none()
+    if meals is None:
+        ensure_counter(db, user_id, week_start)
+        meals = db.execute(stmt).scalar_one()
+    return meals
+
+
+def add_meals(
+    db: Session,
+    user_id: int,
+    week_start: date,
+    delta: int,
+    enforce_cap: bool = True,
+) -> bool:
+    """
+    Adjust the week's counter by delta (negative for cancellations).
+
+    Returns False (and changes nothing) when delta > 0, enforce_cap is set
+    and the result would exceed MAX_MEALS_PER_WEEK.
+    Does not commit; the caller commits together with the booking change.
+
+    Once the row exists this is a single UPDATE, so a booking write takes
+    the write lock for one statement here; the row is seeded (and the
+    UPDATE retried) only the first time a client books in a week.
+    """
+    if delta == 0:
+        return True
+
+    stmt = (
+        update(WeeklyMealCounter)
+        .where(
+            WeeklyMealCounter.user_id == user_id,
+            WeeklyMealCounter.week_start == week_start,
+        )
+        .values(active_meals=WeeklyMealCounter.active_meals + delta)
+        .execution_options(synchronize_session=False)
+    )
+    if delta > 0 and enforce_cap:
+        stmt = stmt.where(WeeklyMealCounter.active_meals + delta <= MAX_MEALS_PER_WEEK)
+
+    if db.execute(stmt).rowcount == 1:
+        return True
+    # No row yet (or over the cap): seed the row if missing and try once more
+    ensure_counter(db, user_id, week_start)
+    return db.execute(stmt).rowcount == 1
+
+
+def add_meals_bulk(db: Session, week_start: date, deltas: Dict[int, int]) -> None:
+    """
+    Apply {user_id: delta} for one service week with two executemany
+    statements (seed missing rows, then increment). No cap check: meant for
+    server-side jobs that create bookings from a validated template.
+    Call it before inserting the new bookings so seeding doesn't count them.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    week_end = week_start + timedelta(days=6)
+    seed = (
+        _insert_ignore(db)
+        .values(
+            user_id=bindparam("b_user"),
+            week_start=bindparam("b_week"),
+            active_meals=(
+                select(func.coalesce(func.sum(Booking.meals), 0))
+                .where(
+                    Booking.user_id == bindparam("b_user"),
+                    Booking.delivery_date >= bindparam("b_week"),
+                    Booking.delivery_date <= bindparam("b_week_end"),
+                    Booking.status != "cancelled",
+                )
+                .scalar_subquery()
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    counters = WeeklyMealCounter.__table__
+    bump = (
+        counters.update()
+        .where(
+            counters.c.user_id == bindparam("b_user"),
+            counters.c.week_start == bindparam("b_week"),
+        )
+        .values(active_meals=counters.c.active_meals + bindparam("b_delta"))
+    )
+
+    params = [
+        {"b_user": user_id, "b_week": week_start, "b_week_end": week_end, "b_delta": delta}
+        for user_id, delta in deltas.items()
+    ]
+    conn = db.connection()
+    conn.execute(seed, params)
+    conn.execute(bump, params)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild / verify
+# ---------------------------------------------------------------------------
+
+def compute_counters(db: Session) -> Dict[Tuple[int, date], int]:
+    """Recompute every (user_id, week_start) total from non-cancelled bookings."""
+    rows = db.execute(
+        select(Booking.user_id, Booking.delivery_date, func.sum(Booking.meals))
+        .where(Booking.status != "cancelled")
+        .group_by(Booking.user_id, Booking.delivery_date)
+    ).all()
+
+    totals: Dict[Tuple[int, date], int] = defaultdict(int)
+    for user_id, delivery_date, meals in rows:
+        totals[(user_id, get_week_start(delivery_date))] += int(meals or 0)
+    return dict(totals)
+
+
+def verify_counters(db: Session) -> List[Dict]:
+    """Return every counter that disagrees with the bookings table."""
+    expected = compute_counters(db)
+    stored = {
+        (r.user_id, r.week_start): r.active_meals
+        for r in db.execute(
+            select(
+                WeeklyMealCounter.user_id,
+                WeeklyMealCounter.week_start,
+                WeeklyMealCounter.active_meals,
+            )
+        ).all()
+    }
+
+    mismatches: List[Dict] = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, 0)
+        have = stored.get(key)
+        # A missing row is fine: it is created (correctly seeded) on first write.
+        if have is not None and have != want:
+            mismatches.append(
+                {"user_id": key[0], "week_start": key[1], "stored": have, "expected": want}
+            )
+    return mismatches
+
+
+def rebuild_counters(db: Session) -> int:
+    """Replace all counters with totals recomputed from bookings. Commits."""
+    totals = compute_counters(db)
+    db.execute(delete(WeeklyMealCounter))
+    if totals:
+        db.execute(
+            WeeklyMealCounter.__table__.insert(),
+            [
+                {"user_id": user_id, "week_start": week_start, "active_meals": meals}
+                for (user_id, week_start), meals in totals.items()
+            ],
+        )
+    db.commit()
+    return len(totals)
+
+
+def main(argv: List[str]) -> int:
+    from ..database import SessionLocal, engine
+    from ..migrations import run_migrations
+
+    if len(argv) != 1 or argv[0] not in ("rebuild", "verify"):
+        print("usage: python -m app.services.meal_counters rebuild|verify")
+        return 2
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        if argv[0] == "rebuild":
+            count = rebuild_counters(db)
+            print(f"rebuilt {count} weekly meal counters")
+            return 0
+
+        mismatches = verify_counters(db)
+        for m in mismatches:
+            print(
+                f"user {m['user_id']} week {m['week_start']}: "
+                f"stored {m['stored']} expected {m['expected']}"
+            )
+        print(f"{len(mismatches)} mismatched counters")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,160 @@
+# backend/app/services/menu_rotation.py
+
+"""
+In-process cache of the 14-day menu rotation.
+
+The whole rotation (at most 14 MenuDay rows) is loaded once per worker and
+served from memory: menu_rotation.for_date(db, day) -> RotationDay.
+
+Multi-worker: the rotation carries a version number stored in data_versions
+("menu_rotation"). Admin menu writes call bump_menu_version() in their
+transaction and menu_rotation.mark_stale() after the commit. Every worker
+re-checks the version (one primary-key SELECT) at most every
+MENU_CACHE_REFRESH_SECONDS and reloads the rows only when it changed.
+version(db) can be used as a key by other caches and ETags, and
+last_modified(db) is when that version was written.
+
+Edits made directly in the database (bypassing POST /admin/menu) are only
+seen after bumping the version or restarting the workers.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..config import MENU_CACHE_REFRESH_SECONDS, MENU_ROTATION_START_DATE
+from ..models.menu import MenuDay
+from .data_versions import bump_version, read_version
+
+MENU_VERSION_NAME = "menu_rotation"
+
+
+def get_rotation_day_number(day: date) -> int:
+    """
+    Map a calendar date to a 1–14 rotation day_number.
+
+    MENU_ROTATION_START_DATE is defined in config.py and is treated as day_number = 1.
+    Then we cycle every 14 days.
+    """
+    delta_days = (day - MENU_ROTATION_START_DATE).days
+    # Protect against negative values as well
+    return (delta_days % 14) + 1
+
+
+@dataclass(frozen=True)
+class RotationDay:
+    day_number: int
+    dish_a: str
+    dish_b: str
+    calories_a: Optional[int]
+    calories_b: Optional[int]
+    dish_a_type: str
+    dish_b_type: str
+
+
+def bump_menu_version(db: Session) -> int:
+    """
+    Bump the rotation version inside the caller's transaction; call
+    menu_rotation.mark_stale() after the commit.
+    """
+    return bump_version(db, MENU_VERSION_NAME)
+
+
+class MenuRotationCache:
+    """Per-worker copy of the rotation, keyed by day_number."""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._days: Dict[int, RotationDay] = {}
+        self._version: Optional[int] = None
+        self._updated_at: Optional[datetime] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.version_checks = 0
+        self.reloads = 0
+
+    def mark_stale(self) -> None:
+        """Re-check the version on the next access."""
+        with self._lock:
+            self._checked_at = None
+
+    def _refresh_if_stale(self, db: Session) -> None:
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < self.refresh_seconds:
+            return
+
+        # Version first: the rows read after it are at least that new
+        version, updated_at = read_version(db, MENU_VERSION_NAME)
+        self.version_checks += 1
+        if version == self._version:
+            self._checked_at = now
+            return
+
+        days = {
+            m.day_number: RotationDay(
+                day_number=m.day_number,
+                dish_a=m.dish_a,
+                dish_b=m.dish_b,
+                calories_a=m.calories_a,
+                calories_b=m.calories_b,
+                dish_a_type=m.dish_a_type,
+                dish_b_type=m.dish_b_type,
+            )
+            for m in db.execute(
+                select(
+                    MenuDay.day_number,
+                    MenuDay.dish_a,
+                    MenuDay.dish_b,
+                    MenuDay.calories_a,
+                    MenuDay.calories_b,
+                    MenuDay.dish_a_type,
+                    MenuDay.dish_b_type,
+                )
+            )
+        }
+        with self._lock:
+            self._days = days
+            self._version = version
+            self._updated_at = updated_at
+            self._checked_at = now
+            self.reloads += 1
+
+    def version(self, db: Session) -> int:
+        self._refresh_if_stale(db)
+        return self._version or 0
+
+    def last_modified(self, db: Session) -> Optional[datetime]:
+        """When the loaded version was written (None before the first edit)."""
+        self._refresh_if_stale(db)
+        return self._updated_at
+
+    def days(self, db: Session) -> List[RotationDay]:
+        """The configured rotation days, ordered by day_number."""
+        self._refresh_if_stale(db)
+        return [self._days[n] for n in sorted(self._days)]
+
+    def get(self, db: Session, day_number: int) -> Optional[RotationDay]:
+        self._refresh_if_stale(db)
+        return self._days.get(day_number)
+
+    def for_date(self, db: Session, day: date) -> Optional[RotationDay]:
+        """Rotation entry for a calendar date (None if that day isn't configured)."""
+        return self.get(db, get_rotation_day_number(day))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self._version or 0,
+            "days": len(self._days),
+            "version_checks": self.version_checks,
+            "reloads": self.reloads,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+menu_rotation = MenuRotationCache(refresh_seconds=MENU_CACHE_REFRESH_SECONDS)
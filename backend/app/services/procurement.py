@@ -0,0 +1,163 @@
+# backend/app/services/procurement.py
+
+"""
+Ingredient bill of materials for procurement (GET /kitchen/export/ingredients).
+
+Each rotation dish (menu day + "A" / "B") has recipe lines: ingredient,
+net quantity per portion, unit and yield loss (models/menu.RecipeLine).
+ingredient_bill(db, start, end) expands the bookings of a day or service
+week into total quantities per ingredient and unit:
+
+- portions per day and dish come from one GROUP BY over the bookings, or
+  from the snapshot slots of a locked week (kitchen_production.day_portions);
+  they are folded into one count per rotation dish;
+- the recipe lines of the rotation days involved are read in one query
+  and each is multiplied by its dish's portion count.
+
+So the work grows with the number of recipe lines, not with the number of
+bookings. Nothing converts units: "onion, kg" and "onion, pcs" are two rows.
+
+Recipes belong to the rotation, not to a dated menu: a locked week is
+expanded with the current recipes of its rotation days. Locked ranges are
+cached by the export router under ingredients_version(), which includes the
+"recipes" version bumped by every recipe edit.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.menu import MenuDay, RecipeLine
+from .data_versions import booking_version_name, bump_version, read_versions
+from .export_data import iter_csv, iter_ndjson
+from .kitchen_production import day_portions
+from .menu_rotation import MENU_VERSION_NAME, get_rotation_day_number
+
+RECIPES_VERSION_NAME = "recipes"
+
+DISHES = ("A", "B")
+
+
+def bump_recipes_version(db: Session) -> int:
+    """Bump the recipes version inside the caller's transaction (no commit)."""
+    return bump_version(db, RECIPES_VERSION_NAME)
+
+
+def ingredients_version(db: Session, start: date, end: date) -> Tuple[Tuple[str, int], ...]:
+    """
+    Data versions ingredient_bill(db, start, end) depends on (one query):
+    the bookings of each date, the recipes and the rotation (dish names).
+    """
+    names = [booking_version_name(start + timedelta(days=i)) for i in range((end - start).days + 1)]
+    names += [RECIPES_VERSION_NAME, MENU_VERSION_NAME]
+    return tuple(sorted(read_versions(db, names).items()))
+
+
+def rotation_portions(db: Session, start: date, end: date) -> Tuple[str, Dict[Tuple[int, str], int]]:
+    """
+    (source, {(rotation day_number, "A" | "B"): portions}) for start..end.
+    A service week maps each day to its own rotation day; longer ranges
+    add up the days that share one.
+    """
+    source, by_day = day_portions(db, start, end)
+    portions: Dict[Tuple[int, str], int] = {}
+    for d, counts in by_day.items():
+        day_number = get_rotation_day_number(d)
+        for dish, n in zip(DISHES, counts):
+            if n:
+                portions[(day_number, dish)] = portions.get((day_number, dish), 0) + n
+    return source, portions
+
+
+def ingredient_bill(db: Session, start: date, end: date) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    (source, rows) for start..end (inclusive), one row per ingredient and
+    unit, sorted by ingredient: portions that use it, net quantity and
+    purchase quantity (net / (1 - yield_loss), per recipe line), and the
+    dishes it goes into. Dishes without recipe lines contribute nothing.
+    """
+    source, portions = rotation_portions(db, start, end)
+    day_numbers = sorted({day_number for day_number, _ in portions})
+    if not day_numbers:
+        return source, []
+
+    lines = db.execute(
+        select(
+            MenuDay.day_number,
+            MenuDay.dish_a,
+            MenuDay.dish_b,
+            RecipeLine.dish,
+            RecipeLine.ingredient,
+            RecipeLine.unit,
+            RecipeLine.quantity,
+            RecipeLine.yield_loss,
+        )
+        .join(MenuDay, MenuDay.id == RecipeLine.menu_day_id)
+        .where(MenuDay.day_number.in_(day_numbers))
+    ).all()
+
+    totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for line in lines:
+        n = portions.get((line.day_number, line.dish))
+        if not n:
+            continue
+        row = totals.get((line.ingredient, line.unit))
+        if row is None:
+            row = totals[(line.ingredient, line.unit)] = {
+                "ingredient": line.ingredient,
+                "unit": line.unit,
+                "portions": 0,
+                "net_quantity": 0.0,
+                "purchase_quantity": 0.0,
+                "dishes": set(),
+            }
+        net = n * line.quantity
+        row["portions"] += n
+        row["net_quantity"] += net
+        row["purchase_quantity"] += net / (1 - line.yield_loss)
+        row["dishes"].add(line.dish_a if line.dish == "A" else line.dish_b)
+
+    rows = []
+    for key in sorted(totals, key=lambda k: (k[0].casefold(), k[1])):
+        row = totals[key]
+        row["net_quantity"] = round(row["net_quantity"], 3)
+        row["purchase_quantity"] = round(row["purchase_quantity"], 3)
+        row["dishes"] = sorted(row["dishes"])
+        rows.append(row)
+    return source, rows
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+INGREDIENT_CSV_HEADERS = [
+    "Ingredient",
+    "Unit",
+    "Portions",
+    "Net Quantity",
+    "Purchase Quantity",
+    "Dishes",
+]
+
+
+def render_ingredients(rows: Iterable[Dict[str, Any]], fmt: str) -> Iterator[str]:
+    """ingredient_bill() rows as "csv" (INGREDIENT_CSV_HEADERS) or "ndjson" chunks."""
+    if fmt == "ndjson":
+        return iter_ndjson(rows)
+    return iter_csv(
+        INGREDIENT_CSV_HEADERS,
+        (
+            [
+                r["ingredient"],
+                r["unit"],
+                r["portions"],
+                r["net_quantity"],
+                r["purchase_quantity"],
+                "; ".join(r["dishes"]),
+            ]
+            for r in rows
+        ),
+    )
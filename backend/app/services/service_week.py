@@ -0,0 +1,79 @@
+# backend/app/services/service_week.py
+
+"""
+Service week calendar: the Wednesday–Tuesday week, its client cutoff and
+the delivery time blocks. Plain functions with no dependencies, shared by
+the routers and the services (jobs import them without loading FastAPI
+routers).
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import List
+
+from ..config import (
+    DINNER_END_HOUR,
+    DINNER_END_MINUTE,
+    DINNER_START_HOUR,
+    DINNER_START_MINUTE,
+    LUNCH_END_HOUR,
+    LUNCH_END_MINUTE,
+    LUNCH_START_HOUR,
+    LUNCH_START_MINUTE,
+    SLOT_MINUTES,
+)
+
+
+# ---------------------------------------------------------------------------
+# Time slot generation
+# ---------------------------------------------------------------------------
+
+def _generate_slots() -> List[str]:
+    slots: List[str] = []
+
+    def _range(start: time, end: time):
+        current = datetime.combine(date.today(), start)
+        finish = datetime.combine(date.today(), end)
+        delta = timedelta(minutes=SLOT_MINUTES)
+        while current < finish:
+            slot_start = current
+            slot_end = current + delta
+            slots.append(
+                f"{slot_start.strftime('%H:%M')}-{slot_end.strftime('%H:%M')}"
+            )
+            current += delta
+
+    lunch_start = time(LUNCH_START_HOUR, LUNCH_START_MINUTE)
+    lunch_end = time(LUNCH_END_HOUR, LUNCH_END_MINUTE)
+    dinner_start = time(DINNER_START_HOUR, DINNER_START_MINUTE)
+    dinner_end = time(DINNER_END_HOUR, DINNER_END_MINUTE)
+
+    _range(lunch_start, lunch_end)
+    _range(dinner_start, dinner_end)
+    return slots
+
+
+ALL_SLOTS = _generate_slots()
+
+
+# ---------------------------------------------------------------------------
+# Week + cutoff helpers
+# ---------------------------------------------------------------------------
+
+def get_week_start(d: date) -> date:
+    """
+    Wednesday-based service week.
+    Returns the Wednesday that starts the week containing the given date.
+    """
+    weekday = d.weekday()  # Monday=0
+    offset = (weekday - 2) % 7  # Wednesday=2
+    return d - timedelta(days=offset)
+
+
+def get_cutoff_for_week(week_start: date) -> datetime:
+    """
+    For a service week starting Wednesday, cutoff for CLIENT changes is
+    Monday 23:59 *before* that service week.
+    Example: week_start = Wed 8 -> cutoff = Mon 6 23:59.
+    """
+    cutoff_date = week_start - timedelta(days=2)  # Monday
+    return datetime(cutoff_date.year, cutoff_date.month, cutoff_date.day, 23, 59)
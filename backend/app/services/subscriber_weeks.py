@@ -0,0 +1,238 @@
+# backend/app/services/subscriber_weeks.py
+
+"""
+Batch generation of subscriber bookings for a service week.
+
+Same rules as POST /booking/ensure-week, but for every subscriber in one pass:
+everything is preloaded with one query per table, dish choices are computed in
+memory and only the missing bookings are inserted (one executemany).
+Re-running for the same week creates nothing new. Weeks past their cutoff
+(locked, or about to be) are refused: clients can no longer change them.
+
+Schedule it weekly (e.g. cron, Tuesday 03:00, for the week starting 8 days later):
+    python -m app.services.subscriber_weeks                 # first week still open
+    python -m app.services.subscriber_weeks 2026-01-14      # explicit Wednesday
+or trigger it from POST /admin/jobs/subscriber-week.
+"""
+
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.address import Address
+from ..models.booking import Booking
+from ..models.onboarding import (
+    OnboardingBehaviorCell,
+    OnboardingDraft,
+    OnboardingFirstWeekSelection,
+)
+from ..models.user import User
+from . import meal_counters
+from .data_versions import bump_booking_versions
+from .dish_type import infer_dish_type, pick_single_dish_by_type
+from .menu_rotation import menu_rotation
+from .service_week import ALL_SLOTS
+from .week_locks import first_open_week
+
+
+def next_service_week(now: Optional[datetime] = None) -> date:
+    """The week generated by default: the first one whose cutoff has not passed."""
+    return first_open_week(now or datetime.utcnow())
+
+
+def generate_subscriber_week(db: Session, week_start: date) -> Dict[str, Any]:
+    """
+    Create the missing subscriber bookings for the week starting week_start
+    (a Wednesday whose cutoff has not passed). Commits. Returns counts and
+    per-phase timings (ms).
+    """
+    if week_start.weekday() != 2:
+        raise ValueError("week_start must be a Wednesday (service week start)")
+    open_from = first_open_week(datetime.utcnow())
+    if week_start < open_from:
+        raise ValueError(f"week {week_start} is past its cutoff; the first open week is {open_from}")
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    def lap(phase: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        timings[phase] = round((now - started) * 1000, 2)
+        started = now
+
+    week_end = week_start + timedelta(days=6)
+
+    # ---- preload -----------------------------------------------------------
+    is_subscriber = (
+        User.client_type == "subscriber",
+        User.is_active.is_(True),
+        User.onboarding_draft_id.isnot(None),
+    )
+    subscribers: List[Tuple[int, str]] = db.execute(
+        select(User.id, User.onboarding_draft_id).where(*is_subscriber)
+    ).all()
+    # Sub-selects rather than IN (...) lists: no bound-parameter limit
+    user_ids = select(User.id).where(*is_subscriber).scalar_subquery()
+    draft_ids = select(User.onboarding_draft_id).where(*is_subscriber).scalar_subquery()
+    lap("load_subscribers")
+
+    existing_drafts = set(
+        db.execute(select(OnboardingDraft.id).where(OnboardingDraft.id.in_(draft_ids))).scalars()
+    )
+
+    prefs: Dict[str, Dict[Tuple[int, int], str]] = defaultdict(dict)
+    for draft_id, weekday_index, slot, pref in db.execute(
+        select(
+            OnboardingBehaviorCell.draft_id,
+            OnboardingBehaviorCell.weekday_index,
+            OnboardingBehaviorCell.slot,
+            OnboardingBehaviorCell.pref,
+        ).where(OnboardingBehaviorCell.draft_id.in_(draft_ids))
+    ):
+        prefs[draft_id][(weekday_index, slot)] = pref
+
+    templates: Dict[str, List[Tuple[int, int, Optional[str]]]] = defaultdict(list)
+    for draft_id, weekday_index, meals, time_block in db.execute(
+        select(
+            OnboardingFirstWeekSelection.draft_id,
+            OnboardingFirstWeekSelection.weekday_index,
+            OnboardingFirstWeekSelection.meals,
+            OnboardingFirstWeekSelection.time_block,
+        )
+        .where(OnboardingFirstWeekSelection.draft_id.in_(draft_ids))
+        .order_by(OnboardingFirstWeekSelection.weekday_index.asc())
+    ):
+        templates[draft_id].append((weekday_index, meals, time_block))
+    lap("load_drafts")
+
+    # Default address: is_default first, then lowest id (same as ensure-week)
+    default_address: Dict[int, int] = {}
+    for user_id, address_id in db.execute(
+        select(Address.user_id, Address.id)
+        .where(Address.user_id.in_(user_ids))
+        .order_by(Address.user_id, Address.is_default.desc(), Address.id.asc())
+    ):
+        default_address.setdefault(user_id, address_id)
+
+    booked = set(
+        db.execute(
+            select(Booking.user_id, Booking.delivery_date).where(
+                Booking.user_id.in_(user_ids),
+                Booking.delivery_date >= week_start,
+                Booking.delivery_date <= week_end,
+                Booking.status != "cancelled",
+            )
+        ).all()
+    )
+
+    week_types: List[Tuple[str, str]] = []
+    for i in range(7):
+        m = menu_rotation.for_date(db, week_start + timedelta(days=i))
+        week_types.append(
+            (m.dish_a_type, m.dish_b_type) if m else (infer_dish_type(None), infer_dish_type(None))
+        )
+    lap("load_addresses_bookings_menu")
+
+    # ---- compute -----------------------------------------------------------
+    skipped: Dict[str, int] = defaultdict(int)
+    rows: List[Dict[str, Any]] = []
+    meal_deltas: Dict[int, int] = defaultdict(int)
+
+    for user_id, draft_id in subscribers:
+        if draft_id not in existing_drafts:
+            skipped["no_draft"] += 1
+            continue
+        if user_id not in default_address:
+            skipped["no_address"] += 1
+            continue
+        if not prefs.get(draft_id):
+            skipped["no_behaviour_grid"] += 1
+            continue
+        if not templates.get(draft_id):
+            skipped["no_template"] += 1
+            continue
+
+        pref = prefs[draft_id]
+        for weekday_index, meals, time_block in templates[draft_id]:
+            if meals <= 0:
+                continue
+            d = week_start + timedelta(days=weekday_index)
+            if (user_id, d) in booked:
+                continue
+
+            if meals == 2:
+                dish_choice = "A+B"
+            else:
+                desired_type = pref.get((weekday_index, 1), "meat")
+                if desired_type == "blank":
+                    continue
+                dish_a_type, dish_b_type = week_types[weekday_index]
+                dish_choice = pick_single_dish_by_type(desired_type, dish_a_type, dish_b_type)
+
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "address_id": default_address[user_id],
+                    "delivery_date": d,
+                    "time_block": time_block or ALL_SLOTS[0],
+                    "meals": meals,
+                    "dish_choice": dish_choice,
+                    "status": "active",
+                }
+            )
+            booked.add((user_id, d))
+            meal_deltas[user_id] += meals
+    lap("compute")
+
+    # ---- write -------------------------------------------------------------
+    if rows:
+        meal_counters.add_meals_bulk(db, week_start, meal_deltas)
+        db.execute(Booking.__table__.insert(), rows)
+        bump_booking_versions(db, [r["delivery_date"] for r in rows])
+    db.commit()
+    lap("insert_commit")
+
+    return {
+        "week_start": week_start,
+        "subscribers": len(subscribers),
+        "users_with_new_bookings": len(meal_deltas),
+        "created": len(rows),
+        "skipped": dict(skipped),
+        "timings_ms": timings,
+    }
+
+
+def main(argv: List[str]) -> int:
+    from ..database import SessionLocal, engine
+    from ..migrations import run_migrations
+
+    week_start = date.fromisoformat(argv[0]) if argv else next_service_week()
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        report = generate_subscriber_week(db, week_start)
+    except ValueError as e:
+        print(e)
+        return 2
+    finally:
+        db.close()
+
+    print(
+        f"week {report['week_start']}: {report['created']} bookings created "
+        f"for {report['users_with_new_bookings']}/{report['subscribers']} subscribers"
+    )
+    if report["skipped"]:
+        print(f"skipped: {report['skipped']}")
+    print("timings (ms): " + ", ".join(f"{k}={v}" for k, v in report["timings_ms"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,146 @@
+# backend/app/services/week_locks.py
+
+"""
+Cutoff locking.
+
+Once a service week's cutoff (Monday 23:59 before the week, see
+get_cutoff_for_week) has passed, every active booking of that week is flipped
+to "locked" with one set-based UPDATE, and a ServiceWeekLock marker is written
+per week. Marked weeks never change again; in the same transaction each newly
+locked week is snapshotted (services/week_snapshots) for kitchen / export /
+admin readers.
+
+The job is idempotent; run it shortly after each cutoff (cron, e.g. Tuesday
+00:05, or every few minutes):
+    python -m app.services.week_locks
+or trigger it from POST /admin/jobs/lock-weeks.
+"""
+
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..models.booking import Booking, ServiceWeekLock
+from .service_week import get_cutoff_for_week, get_week_start
+from .week_snapshots import write_week_snapshot
+
+
+def first_open_week(now: datetime) -> date:
+    """The earliest service week whose cutoff has not passed yet."""
+    week_start = get_week_start(now.date())
+    while get_cutoff_for_week(week_start) < now:
+        week_start += timedelta(days=7)
+    return week_start
+
+
+def is_week_locked(db: Session, week_start: date) -> bool:
+    return (
+        db.query(ServiceWeekLock.week_start)
+        .filter(ServiceWeekLock.week_start == week_start)
+        .first()
+        is not None
+    )
+
+
+def locked_weeks(db: Session, week_starts: List[date]) -> Set[date]:
+    """Subset of week_starts that carry a lock marker (one query)."""
+    if not week_starts:
+        return set()
+    return set(
+        db.execute(
+            select(ServiceWeekLock.week_start).where(ServiceWeekLock.week_start.in_(week_starts))
+        ).scalars()
+    )
+
+
+def lock_due_weeks(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Lock every week whose cutoff has passed. Commits.
+    Uses the same clock as the booking endpoints (datetime.utcnow()).
+    """
+    now = now or datetime.utcnow()
+    horizon = first_open_week(now)  # everything before this is past cutoff
+
+    # Per-week counts for the markers (grouped by day, folded into weeks)
+    per_week: Dict[date, int] = defaultdict(int)
+    for delivery_date, count in db.execute(
+        select(Booking.delivery_date, func.count())
+        .where(Booking.status == "active", Booking.delivery_date < horizon)
+        .group_by(Booking.delivery_date)
+    ):
+        per_week[get_week_start(delivery_date)] += count
+
+    result = db.execute(
+        update(Booking)
+        .where(Booking.status == "active", Booking.delivery_date < horizon)
+        .values(status="locked", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    # The week that just passed cutoff gets a marker even if nobody booked it
+    per_week.setdefault(horizon - timedelta(days=7), 0)
+    already = locked_weeks(db, list(per_week))
+    new_markers = [
+        {"week_start": week_start, "locked_at": now, "bookings_locked": count}
+        for week_start, count in sorted(per_week.items())
+        if week_start not in already
+    ]
+    if new_markers:
+        db.execute(ServiceWeekLock.__table__.insert(), new_markers)
+
+    # Late stragglers in weeks that were already marked
+    for week_start in sorted(already):
+        if per_week[week_start]:
+            db.query(ServiceWeekLock).filter(ServiceWeekLock.week_start == week_start).update(
+                {ServiceWeekLock.bookings_locked: ServiceWeekLock.bookings_locked + per_week[week_start]},
+                synchronize_session=False,
+            )
+
+    # Snapshot new weeks, weeks that got stragglers, and weeks locked before
+    # snapshots existed
+    to_snapshot = {m["week_start"] for m in new_markers}
+    to_snapshot.update(w for w in already if per_week[w])
+    to_snapshot.update(
+        db.execute(
+            select(ServiceWeekLock.week_start).where(ServiceWeekLock.snapshot_at.is_(None))
+        ).scalars()
+    )
+    for week_start in sorted(to_snapshot):
+        write_week_snapshot(db, week_start, now)
+
+    db.commit()
+    return {
+        "locked_before": horizon,
+        "bookings_locked": result.rowcount,
+        "weeks_marked": [m["week_start"] for m in new_markers],
+        "weeks_snapshotted": sorted(to_snapshot),
+    }
+
+
+def main(argv: List[str]) -> int:
+    from ..database import SessionLocal, engine
+    from ..migrations import run_migrations
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        report = lock_due_weeks(db)
+    finally:
+        db.close()
+
+    weeks = ", ".join(str(w) for w in report["weeks_marked"]) or "none"
+    print(
+        f"locked {report['bookings_locked']} bookings before {report['locked_before']}; "
+        f"new week markers: {weeks}"
+    )
+    if report["weeks_snapshotted"]:
+        print("snapshots written: " + ", ".join(str(w) for w in report["weeks_snapshotted"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,298 @@
+# backend/app/services/week_snapshots.py
+
+"""
+Snapshots of locked service weeks.
+
+When services/week_locks locks a week, write_week_snapshot() resolves its
+bookings once (client name/phone, address, rotation dish names) into
+week_snapshot_bookings, plus per day / time block totals in
+week_snapshot_slots, and stamps ServiceWeekLock.snapshot_at.
+
+Kitchen, export and admin readers call snapshot_rows() first: for a range
+inside snapshotted weeks it returns the frozen rows from one table (no joins);
+otherwise None and the reader falls back to the live tables. Later edits to
+users, addresses or the 14-day MenuDay rotation don't change a locked week.
+
+To rewrite one week's snapshot by hand (e.g. after a data fix):
+    python -m app.services.week_snapshots 2026-01-14
+"""
+
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Select, delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..models.address import Address
+from ..models.booking import (
+    Booking,
+    ServiceWeekLock,
+    WeekSnapshotBooking,
+    WeekSnapshotSlot,
+)
+from ..models.user import User
+from .data_versions import bump_booking_versions
+from .menu_rotation import menu_rotation
+from .service_week import get_week_start
+
+
+def format_address_text(
+    line1: Optional[str],
+    line2: Optional[str],
+    postal_code: Optional[str],
+    city: Optional[str],
+) -> str:
+    """Export address format: "line1, line2, postal_code city"."""
+    parts = [line1]
+    if line2:
+        parts.append(line2)
+    parts.append(f"{postal_code} {city}")
+    return ", ".join(parts)
+
+
+def dish_name_for(
+    dish_a: Optional[str],
+    dish_b: Optional[str],
+    meals: int,
+    dish_choice: Optional[str],
+) -> str:
+    """Human-readable dish name(s) of a booking given that day's rotation dishes."""
+    if meals == 2:
+        return f"{dish_a} + {dish_b}"
+    if dish_choice == "A":
+        return dish_a
+    if dish_choice == "B":
+        return dish_b
+    return ""
+
+
+def slot_totals(rows: Iterable[Any]) -> Dict[Tuple[date, str], Dict[str, int]]:
+    """
+    Aggregate booking-like rows (delivery_date, time_block, meals, dish_choice)
+    into {(date, time_block): {bookings, meals, portions_a, portions_b}}.
+    """
+    totals: Dict[Tuple[date, str], Dict[str, int]] = defaultdict(
+        lambda: {"bookings": 0, "meals": 0, "portions_a": 0, "portions_b": 0}
+    )
+    for r in rows:
+        slot = totals[(r.delivery_date, r.time_block)]
+        slot["bookings"] += 1
+        slot["meals"] += r.meals
+        if r.meals == 2 or r.dish_choice == "A+B":
+            slot["portions_a"] += 1
+            slot["portions_b"] += 1
+        elif r.dish_choice == "A":
+            slot["portions_a"] += 1
+        elif r.dish_choice == "B":
+            slot["portions_b"] += 1
+    return dict(sorted(totals.items()))
+
+
+# ---------------------------------------------------------------------------
+# Write
+# ---------------------------------------------------------------------------
+
+def write_week_snapshot(db: Session, week_start: date, now: Optional[datetime] = None) -> int:
+    """
+    (Re)write the snapshot of one locked week from the live tables and stamp
+    its lock marker. Does not commit. Returns the number of bookings.
+    """
+    now = now or datetime.utcnow()
+    week_end = week_start + timedelta(days=6)
+
+    # Frozen for good: check the rotation version now rather than trusting
+    # a copy that may be up to MENU_CACHE_REFRESH_SECONDS old
+    menu_rotation.mark_stale()
+
+    live = db.execute(
+        select(
+            Booking.id,
+            Booking.delivery_date,
+            Booking.time_block,
+            Booking.status,
+            Booking.meals,
+            Booking.dish_choice,
+            Booking.user_id,
+            Booking.address_id,
+            User.name,
+            User.phone,
+            Address.label,
+            Address.line1,
+            Address.line2,
+            Address.city,
+            Address.postal_code,
+        )
+        .join(User, User.id == Booking.user_id)
+        .outerjoin(Address, Address.id == Booking.address_id)
+        .where(
+            Booking.delivery_date >= week_start,
+            Booking.delivery_date <= week_end,
+            Booking.status != "cancelled",
+        )
+        .order_by(Booking.delivery_date, Booking.time_block, Booking.id)
+    ).all()
+
+    rows: List[Dict[str, Any]] = []
+    for b in live:
+        menu = menu_rotation.for_date(db, b.delivery_date)
+        rows.append(
+            {
+                "booking_id": b.id,
+                "week_start": week_start,
+                "delivery_date": b.delivery_date,
+                "time_block": b.time_block,
+                "status": b.status,
+                "user_id": b.user_id,
+                "client_name": b.name,
+                "client_phone": b.phone,
+                "address_id": b.address_id,
+                "address_label": b.label,
+                "address_line1": b.line1,
+                "address_line2": b.line2,
+                "address_city": b.city,
+                "address_postal_code": b.postal_code,
+                "address_text": (
+                    format_address_text(b.line1, b.line2, b.postal_code, b.city)
+                    if b.line1 is not None
+                    else ""
+                ),
+                "meals": b.meals,
+                "dish_choice": b.dish_choice,
+                # Same fallback as the live exports: raw code when the menu is missing
+                "dish_name": (
+                    dish_name_for(menu.dish_a, menu.dish_b, b.meals, b.dish_choice)
+                    if menu
+                    else (b.dish_choice or "")
+                ),
+            }
+        )
+
+    db.execute(delete(WeekSnapshotBooking).where(WeekSnapshotBooking.week_start == week_start))
+    db.execute(delete(WeekSnapshotSlot).where(WeekSnapshotSlot.week_start == week_start))
+    if rows:
+        db.execute(WeekSnapshotBooking.__table__.insert(), rows)
+        db.execute(
+            WeekSnapshotSlot.__table__.insert(),
+            [
+                {"week_start": week_start, "delivery_date": d, "time_block": t, **totals}
+                for (d, t), totals in slot_totals(live).items()
+            ],
+        )
+    db.execute(
+        update(ServiceWeekLock)
+        .where(ServiceWeekLock.week_start == week_start)
+        .values(snapshot_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    # Cached exports of the week now come from the snapshot
+    bump_booking_versions(db, [week_start + timedelta(days=i) for i in range(7)])
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+
+def snapshotted_weeks(db: Session, week_starts: List[date]) -> Set[date]:
+    """Subset of week_starts whose snapshot has been written (one query)."""
+    if not week_starts:
+        return set()
+    return set(
+        db.execute(
+            select(ServiceWeekLock.week_start).where(
+                ServiceWeekLock.week_start.in_(week_starts),
+                ServiceWeekLock.snapshot_at.isnot(None),
+            )
+        ).scalars()
+    )
+
+
+def _weeks_in_range(start: date, end: date) -> List[date]:
+    weeks = []
+    week_start = get_week_start(start)
+    while week_start <= end:
+        weeks.append(week_start)
+        week_start += timedelta(days=7)
+    return weeks
+
+
+def snapshot_rows_query(db: Session, start: date, end: date) -> Optional[Select]:
+    """
+    SELECT of the frozen bookings delivered between start and end (inclusive),
+    ordered by date, time block, booking id, for callers that stream it.
+    None unless every week in the range has a snapshot.
+    """
+    weeks = _weeks_in_range(start, end)
+    if snapshotted_weeks(db, weeks) != set(weeks):
+        return None
+    return (
+        select(*WeekSnapshotBooking.__table__.c)
+        .where(
+            WeekSnapshotBooking.delivery_date >= start,
+            WeekSnapshotBooking.delivery_date <= end,
+        )
+        .order_by(
+            WeekSnapshotBooking.delivery_date,
+            WeekSnapshotBooking.time_block,
+            WeekSnapshotBooking.booking_id,
+        )
+    )
+
+
+def snapshot_rows(db: Session, start: date, end: date) -> Optional[List[Row]]:
+    """
+    Frozen bookings delivered between start and end (inclusive), ordered by
+    date, time block, booking id. None unless every week in the range has a
+    snapshot; the caller then reads the live tables.
+    """
+    stmt = snapshot_rows_query(db, start, end)
+    if stmt is None:
+        return None
+    return db.execute(stmt).all()
+
+
+def snapshot_slots(db: Session, start: date, end: date) -> Optional[List[Row]]:
+    """Per day / time block totals for a snapshotted range (None as above)."""
+    weeks = _weeks_in_range(start, end)
+    if snapshotted_weeks(db, weeks) != set(weeks):
+        return None
+    return db.execute(
+        select(*WeekSnapshotSlot.__table__.c)
+        .where(
+            WeekSnapshotSlot.delivery_date >= start,
+            WeekSnapshotSlot.delivery_date <= end,
+        )
+        .order_by(WeekSnapshotSlot.delivery_date, WeekSnapshotSlot.time_block)
+    ).all()
+
+
+def main(argv: List[str]) -> int:
+    from ..database import SessionLocal, engine
+    from ..migrations import run_migrations
+
+    if len(argv) != 1:
+        print("usage: python -m app.services.week_snapshots YYYY-MM-DD  (locked week start)")
+        return 2
+    week_start = get_week_start(date.fromisoformat(argv[0]))
+
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        locked = db.get(ServiceWeekLock, week_start)
+        if locked is None:
+            print(f"week {week_start} is not locked; nothing to snapshot")
+            return 1
+        count = write_week_snapshot(db, week_start)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"week {week_start}: snapshot of {count} bookings written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
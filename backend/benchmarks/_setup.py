@@ -0,0 +1,79 @@
+# backend/benchmarks/_setup.py
+
+"""
+Throwaway environment for the benchmark scripts: a fresh SQLite file in a
+temporary directory (never backend/mealprep.db), seeded with an admin, a
+kitchen user, two clients with an address and the 14-day rotation, and an
+in-process TestClient.
+
+Import this module before anything from app: the app reads DATABASE_URL
+and runs its migrations on import.
+"""
+
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Dict
+
+_tmp = tempfile.mkdtemp(prefix="mealprep-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(_tmp, "export_cache"))
+os.environ.setdefault("EXPORT_JOB_DIR", os.path.join(_tmp, "export_jobs"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.address import Address  # noqa: E402
+from app.models.menu import MenuDay  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.dish_type import infer_dish_type  # noqa: E402
+
+PASSWORD = "secret1"
+
+client = TestClient(app)
+
+
+def seed() -> None:
+    """Users a@ (admin), k@ (kitchen), c@ and d@ (clients, address ids 1 and 2), menu days 1-14."""
+    db = SessionLocal()
+    try:
+        for role, email in (("admin", "a@x.io"), ("kitchen", "k@x.io"), ("client", "c@x.io"), ("client", "d@x.io")):
+            db.add(User(name=email, email=email, phone="9", hashed_password=get_password_hash(PASSWORD), role=role, is_active=True))
+        db.flush()
+        for user in db.query(User).filter(User.role == "client").order_by(User.id):
+            db.add(Address(user_id=user.id, label="Home", line1="Rua 1", city="Lisboa", postal_code="1000", is_default=True))
+        for n in range(1, 15):
+            dish_a, dish_b = f"Frango {n}", f"Salmão {n}"
+            db.add(
+                MenuDay(
+                    day_number=n,
+                    dish_a=dish_a,
+                    dish_b=dish_b,
+                    calories_a=500,
+                    calories_b=400,
+                    dish_a_type=infer_dish_type(dish_a),
+                    dish_b_type=infer_dish_type(dish_b),
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def login(email: str) -> Dict[str, str]:
+    r = client.post("/auth/token", data={"username": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def next_week_start() -> date:
+    """Wednesday of next week: always before its booking cutoff."""
+    today = date.today()
+    return today - timedelta(days=(today.weekday() - 2) % 7) + timedelta(days=7)
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
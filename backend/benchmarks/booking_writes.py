@@ -0,0 +1,146 @@
+# backend/benchmarks/booking_writes.py
+
+"""
+Concurrent POST /booking/ latency and the weekly meal cap under a race.
+
+    cd backend && python -m benchmarks.booking_writes [--requests 500] [--threads 50] [--runs 3]
+
+1. THREADS concurrent 2-meal bookings by one client for one week: reports how
+   many were accepted (MAX_MEALS_PER_WEEK / 2 is correct).
+2. REQUESTS 1-meal bookings spread over THREADS distinct clients, THREADS at
+   a time: p50 / p99 latency per run. Each run books a later week, so the
+   first write of every client in a run also seeds its weekly counter.
+
+In-process TestClient on a temporary SQLite file: SQLite serialises
+writers, so the numbers measure how long each request holds the write
+lock rather than server throughput. Only the HTTP API is used, so the
+script also runs against older checkouts for comparison.
+
+Request latency in-process is dominated by the harness (THREADS client
+threads sharing one GIL and the 40-thread anyio pool that runs sync routes
+and dependencies), so each run also reports the write-lock hold time: from
+the moment the transaction's first INSERT / UPDATE / DELETE returns (the
+lock is granted) to its COMMIT, measured with engine events. That is the
+part booking code controls; waiting for the lock is not included.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy import event
+
+from ._setup import PASSWORD, SessionLocal, client, login, next_week_start, percentile, seed
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.models.address import Address  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+_DML = ("INSERT", "UPDATE", "DELETE")
+lock_hold_ms: List[float] = []
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _first_write(conn, cursor, statement, parameters, context, executemany):
+    # The first write statement has returned: SQLite granted the write lock
+    if "write_started" not in conn.info and statement.lstrip().upper().startswith(_DML):
+        conn.info["write_started"] = time.perf_counter()
+
+
+@event.listens_for(engine, "commit")
+def _committed(conn):
+    started = conn.info.pop("write_started", None)
+    if started is not None:
+        lock_hold_ms.append((time.perf_counter() - started) * 1000)
+
+
+@event.listens_for(engine, "rollback")
+def _rolled_back(conn):
+    conn.info.pop("write_started", None)
+
+
+def _booking(day, meals, address_id, time_block):
+    return {"delivery_date": str(day), "time_block": time_block, "meals": meals, "address_id": address_id}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.booking_writes")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    seed()
+    slots = client.get("/booking/slots").json()
+    week = next_week_start()
+
+    # 1) Race on one client's week
+    headers = login("c@x.io")
+    with ThreadPoolExecutor(args.threads) as pool:
+        codes = list(
+            pool.map(
+                lambda i: client.post(
+                    "/booking/",
+                    json=_booking(week + timedelta(days=i % 7), 2, 1, slots[i % len(slots)]),
+                    headers=headers,
+                ).status_code,
+                range(args.threads),
+            )
+        )
+    print(f"same client, {args.threads} concurrent 2-meal bookings: {codes.count(200)} accepted")
+
+    # 2) Distinct clients
+    db = SessionLocal()
+    clients = []
+    for i in range(args.threads):
+        user = User(name=f"u{i}", email=f"u{i}@x.io", hashed_password=get_password_hash(PASSWORD), role="client", is_active=True)
+        db.add(user)
+        db.flush()
+        address = Address(user_id=user.id, label="Home", line1="l", city="c", postal_code="p", is_default=True)
+        db.add(address)
+        db.flush()
+        clients.append((user.email, address.id))
+    db.commit()
+    db.close()
+    tokens = [(login(email), address_id) for email, address_id in clients]
+
+    p50s, p99s, hold99s = [], [], []
+    for run in range(args.runs):
+        lock_hold_ms.clear()
+        run_week = week + timedelta(days=7 * (run + 1))
+
+        def post(i):
+            headers, address_id = tokens[i % len(tokens)]
+            day = run_week + timedelta(days=(i // len(tokens)) % 7)
+            t = time.perf_counter()
+            r = client.post("/booking/", json=_booking(day, 1, address_id, slots[0]), headers=headers)
+            return r.status_code, (time.perf_counter() - t) * 1000
+
+        with ThreadPoolExecutor(args.threads) as pool:
+            results = list(pool.map(post, range(args.requests)))
+        latencies = sorted(ms for _, ms in results)
+        p50s.append(percentile(latencies, 0.50))
+        p99s.append(percentile(latencies, 0.99))
+        holds = sorted(lock_hold_ms)
+        hold99s.append(percentile(holds, 0.99))
+        failed = sum(1 for code, _ in results if code != 200)
+        print(
+            f"run {run + 1}: {args.requests} bookings / {len(tokens)} clients: "
+            f"p50 {p50s[-1]:.0f} ms  p99 {p99s[-1]:.0f} ms  failed {failed}  "
+            f"write lock held p50 {percentile(holds, 0.50):.1f} ms  p99 {hold99s[-1]:.1f} ms"
+        )
+    print(
+        f"median of runs: p50 {statistics.median(p50s):.0f} ms  p99 {statistics.median(p99s):.0f} ms  "
+        f"write lock p99 {statistics.median(hold99s):.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
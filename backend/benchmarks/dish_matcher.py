@@ -0,0 +1,110 @@
+# backend/benchmarks/dish_matcher.py
+
+"""
+Dish classification throughput: the per-keyword substring test that
+infer_dish_type used before DishMatcher, against the compiled matcher.
+
+    cd backend && python -m benchmarks.dish_matcher [--repeat 10] [--runs 3]
+
+Names are synthetic Portuguese / English dishes (protein x side x style,
+about 2,400 distinct). Both classifiers get the same fish keywords and
+"meat" as default, so results are comparable one to one; the script prints
+the names they disagree on. Throughput (names per second, best of RUNS) is
+reported for every name once and for the list read REPEAT times, as the
+menu and onboarding paths do, with and without the per-name memo. The full
+default taxonomy (five categories) is timed as well.
+
+No database is needed.
+"""
+
+import argparse
+import itertools
+import random
+import re
+import sys
+import time
+from typing import Callable, List
+
+from app.services.dish_type import DEFAULT_TAXONOMY, DishMatcher, _FISH_KEYWORDS
+
+# The keyword set and loop of infer_dish_type before the compiled matcher
+_OLD_FISH_KEYWORDS = {
+    "fish", "salmon", "tuna", "cod", "hake", "sardine", "anchovy",
+    "bacalhau", "atum", "salmão", "salmao", "pescada", "robalo", "dourada",
+    "polvo", "lulas", "camarao", "camarão", "shrimp", "prawn",
+    "octopus", "squid", "marisco", "seafood", "enguia", "trout", "tilapia",
+}
+
+
+def old_infer_dish_type(dish_name: str) -> str:
+    if not dish_name:
+        return "meat"
+    s = re.sub(r"\s+", " ", dish_name.strip().lower())
+    for kw in _OLD_FISH_KEYWORDS:
+        if kw in s:
+            return "fish"
+    return "meat"
+
+
+_PROTEINS = [
+    "Frango grelhado", "Peru assado", "Bife de vaca", "Carne picada", "Porco preto",
+    "Salmão grelhado", "Salmao no forno", "Bacalhau à Brás", "Atum braseado",
+    "Pescada cozida", "Polvo à lagareiro", "Lulas grelhadas", "Camarão salteado",
+    "Robalo escalado", "Dourada assada", "Grilled chicken", "Beef stew", "Pork loin",
+    "Salmon fillet", "Tuna steak", "Cod loin", "Shrimp curry", "Octopus salad",
+    "Turkey meatballs", "Omelete", "Tofu", "Sardinhas assadas", "Trout", "Hake",
+]
+_SIDES = [
+    "arroz basmati", "batata doce", "brócolos", "espinafres", "legumes salteados",
+    "couscous", "quinoa", "puré", "salada morna", "feijão verde", "sweet potato",
+    "rice", "greens", "roasted vegetables",
+]
+_STYLES = ["", " fit", " leve", " (época)", " com limão & alho", " picante"]
+
+
+def dish_names() -> List[str]:
+    names = [f"{p}{s} + {side}" for p, side, s in itertools.product(_PROTEINS, _SIDES, _STYLES)]
+    random.Random(1).shuffle(names)
+    return names
+
+
+def names_per_second(classify: Callable[[str], str], names: List[str], runs: int) -> float:
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        for name in names:
+            classify(name)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(names) / best
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dish_matcher")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    names = dish_names()
+    fish_only = [("fish", _FISH_KEYWORDS)]
+    taxonomy = [(name, keywords) for name, _, keywords in sorted(DEFAULT_TAXONOMY, key=lambda c: -c[1])]
+
+    matcher = DishMatcher(fish_only)
+    differ = sorted({n.split(" + ")[0] for n in names if old_infer_dish_type(n) != matcher.classify(n)})
+    print(f"{len(names)} distinct names; old and compiled disagree on: {differ or 'none'}")
+
+    for label, workload in (("each name once", names), (f"repeated x{args.repeat}", names * args.repeat)):
+        old = names_per_second(old_infer_dish_type, workload, args.runs)
+        compiled = names_per_second(DishMatcher(fish_only)._classify_uncached, workload, args.runs)
+        # A fresh matcher per run, so the memo starts empty every time
+        memo = max(names_per_second(DishMatcher(fish_only).classify, workload, 1) for _ in range(args.runs))
+        full = max(names_per_second(DishMatcher(taxonomy).classify, workload, 1) for _ in range(args.runs))
+        print(
+            f"{label:16} n={len(workload):6}  old {old / 1e3:6.0f}k/s  compiled {compiled / 1e3:6.0f}k/s  "
+            f"compiled+memo {memo / 1e3:6.0f}k/s  full taxonomy+memo {full / 1e3:6.0f}k/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
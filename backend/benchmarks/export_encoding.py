@@ -0,0 +1,111 @@
+# backend/benchmarks/export_encoding.py
+
+"""
+Cost of the export encodings: one service week of bookings downloaded
+through GET /admin/export/bookings as CSV and NDJSON, plain and gzip.
+
+    cd backend && python -m benchmarks.export_encoding [--bookings 50000] [--clients 500] [--runs 3]
+
+The export cache is disabled (EXPORT_CACHE_MAX_BYTES=0), so every request
+reads and encodes the week. Reports the bytes on the wire and the best of
+RUNS wall times per variant (in-process TestClient, Accept-Encoding:
+identity, so the body is what the server sent). Rows are synthetic: names,
+addresses, slots and dishes repeat, so gzip ratios are better than on real
+data.
+"""
+
+import os
+
+os.environ.setdefault("EXPORT_CACHE_MAX_BYTES", "0")
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+from typing import List  # noqa: E402
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from ._setup import SessionLocal, client, login, next_week_start, seed  # noqa: E402
+
+from app.models.address import Address  # noqa: E402
+from app.models.booking import Booking  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.data_versions import bump_booking_versions  # noqa: E402
+from app.services.service_week import ALL_SLOTS  # noqa: E402
+
+
+def seed_week(week_start, bookings: int, clients: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(User),
+            [
+                {"name": f"Cliente {i}", "email": f"bench{i}@x.io", "phone": f"91{i:07d}", "hashed_password": "-", "role": "client", "is_active": True}
+                for i in range(clients)
+            ],
+        )
+        user_ids = db.scalars(select(User.id).where(User.email.like("bench%")).order_by(User.id)).all()
+        db.execute(
+            insert(Address),
+            [
+                {"user_id": uid, "label": "Casa", "line1": f"Rua {uid}, {uid % 90 + 1}", "city": "Lisboa", "postal_code": f"1{uid % 1000:03d}-001", "is_default": True}
+                for uid in user_ids
+            ],
+        )
+        addresses = dict(db.execute(select(Address.user_id, Address.id).where(Address.user_id.in_(user_ids))).all())
+        now = datetime.utcnow()
+        rows = []
+        for i in range(bookings):
+            uid = user_ids[i % len(user_ids)]
+            rows.append(
+                {
+                    "user_id": uid,
+                    "address_id": addresses[uid],
+                    "delivery_date": week_start + timedelta(days=i % 7),
+                    "time_block": ALL_SLOTS[i % len(ALL_SLOTS)],
+                    "meals": 1 + i % 2,
+                    "dish_choice": ("A", "B", "A+B")[i % 3],
+                    "status": "active",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        db.execute(insert(Booking), rows)
+        bump_booking_versions(db, (week_start + timedelta(days=i) for i in range(7)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.export_encoding")
+    parser.add_argument("--bookings", type=int, default=50_000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    seed()
+    week_start = next_week_start()
+    seed_week(week_start, args.bookings, args.clients)
+    headers = {**login("a@x.io"), "Accept-Encoding": "identity"}
+    url = f"/admin/export/bookings?service_week_start={week_start}"
+
+    print(f"{args.bookings} bookings, {args.clients} clients, best of {args.runs}")
+    for fmt in ("csv", "ndjson"):
+        for compress in (None, "gzip"):
+            params = f"&format={fmt}" + (f"&compress={compress}" if compress else "")
+            best = None
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                with client.stream("GET", url + params, headers=headers) as r:
+                    r.raise_for_status()
+                    size = sum(len(chunk) for chunk in r.iter_raw())
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{fmt:6} {compress or 'none':4}  {size / 1e6:7.2f} MB  {best * 1000:6.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,219 @@
+# backend/tests/conftest.py
+
+"""
+Test database: a fresh SQLite file in a temporary directory (never
+backend/mealprep.db), migrated once per session with run_migrations() and
+holding the 14-day rotation. Each test gets a session and leaves no users,
+addresses, onboarding drafts or bookings behind. Data versions are kept,
+so in-process caches keyed on them never serve a previous test's rows.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import os
+import tempfile
+import uuid
+
+_tmp = tempfile.mkdtemp(prefix="mealprep-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(_tmp, "export_cache"))
+os.environ.setdefault("EXPORT_JOB_DIR", os.path.join(_tmp, "export_jobs"))
+
+from datetime import date, timedelta  # noqa: E402
+from typing import Iterable, List, Tuple  # noqa: E402
+
+import anyio  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.models.address import Address  # noqa: E402
+from app.models.booking import Booking, ServiceWeekLock, WeeklyMealCounter  # noqa: E402
+from app.models.menu import MenuDay  # noqa: E402
+from app.models.onboarding import (  # noqa: E402
+    OnboardingBehaviorCell,
+    OnboardingDraft,
+    OnboardingFirstWeekSelection,
+)
+from app.models.user import User  # noqa: E402
+from app.services.data_versions import bump_booking_versions  # noqa: E402
+from app.services.dish_type import infer_dish_type  # noqa: E402
+from app.services.menu_rotation import bump_menu_version  # noqa: E402
+
+# Deleted after every test, children first
+_PER_TEST_TABLES = (
+    WeeklyMealCounter,
+    Booking,
+    ServiceWeekLock,
+    OnboardingBehaviorCell,
+    OnboardingFirstWeekSelection,
+    OnboardingDraft,
+    Address,
+    User,
+)
+
+
+@pytest.fixture(scope="session")
+def migrated_engine():
+    applied = run_migrations(engine)
+    db = SessionLocal()
+    try:
+        for n in range(1, 15):
+            dish_a, dish_b = f"Frango {n}", f"Salmão {n}"
+            db.add(
+                MenuDay(
+                    day_number=n,
+                    dish_a=dish_a,
+                    dish_b=dish_b,
+                    calories_a=500,
+                    calories_b=400,
+                    dish_a_type=infer_dish_type(dish_a),
+                    dish_b_type=infer_dish_type(dish_b),
+                )
+            )
+        bump_menu_version(db)
+        db.commit()
+    finally:
+        db.close()
+    assert applied, "the test database should start empty"
+    return engine
+
+
+@pytest.fixture
+def db(migrated_engine):
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for model in _PER_TEST_TABLES:
+        session.execute(delete(model))
+    session.commit()
+    session.close()
+
+
+# ---------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------
+
+def future_week_start() -> date:
+    """A Wednesday well past today, so no week lock or snapshot applies."""
+    d = date.today() + timedelta(days=28)
+    return d + timedelta(days=(2 - d.weekday()) % 7)
+
+
+def add_clients(db, n: int) -> List[Tuple[int, int]]:
+    """n clients with one address each, as [(user_id, address_id)] (committed)."""
+    users = [
+        {"name": f"Client {i}", "email": f"client{i}@x.io", "phone": "9", "hashed_password": "-", "role": "client", "is_active": True}
+        for i in range(n)
+    ]
+    db.execute(insert(User), users)
+    user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+    db.execute(
+        insert(Address),
+        [{"user_id": uid, "label": "Home", "line1": f"Rua {uid}", "city": "Lisboa", "postal_code": "1000", "is_default": True} for uid in user_ids],
+    )
+    address_ids = db.scalars(select(Address.id).order_by(Address.user_id)).all()
+    db.commit()
+    return list(zip(user_ids, address_ids))
+
+
+def add_bookings(
+    db,
+    clients: List[Tuple[int, int]],
+    days: Iterable[date],
+    per_day: int,
+    slots: Tuple[str, ...] = ("11:30-11:45", "12:00-12:15", "19:00-19:15"),
+    status: str = "active",
+    batch_size: int = 10_000,
+) -> int:
+    """
+    per_day bookings on each of days, round-robin over clients and slots,
+    in multi-row INSERTs; bumps the days' booking versions like the booking
+    router does (committed). Returns the number of bookings added.
+    """
+    days = list(days)
+    added = 0
+    rows = []
+    for day in days:
+        for i in range(per_day):
+            user_id, address_id = clients[i % len(clients)]
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "address_id": address_id,
+                    "delivery_date": day,
+                    "time_block": slots[i % len(slots)],
+                    "meals": 1 + i % 2,
+                    "dish_choice": ("A", "B", "A+B")[i % 3],
+                    "status": status,
+                }
+            )
+            if len(rows) == batch_size:
+                db.execute(insert(Booking), rows)
+                added += len(rows)
+                rows = []
+    if rows:
+        db.execute(insert(Booking), rows)
+        added += len(rows)
+    bump_booking_versions(db, days)
+    db.commit()
+    return added
+
+
+def add_subscriber(db, user_id: int, week_start: date, pref: str = "fish") -> str:
+    """
+    Make the client a subscriber with an onboarding draft: behaviour grid
+    (pref everywhere) and a first week of one meal a day, dish A (committed).
+    Returns the draft id.
+    """
+    draft_id = str(uuid.uuid4())
+    db.add(OnboardingDraft(id=draft_id, week_start=week_start, client_type="subscriber"))
+    db.flush()
+    db.execute(
+        insert(OnboardingBehaviorCell),
+        [{"draft_id": draft_id, "weekday_index": i, "slot": s, "pref": pref} for i in range(7) for s in (1, 2)],
+    )
+    db.execute(
+        insert(OnboardingFirstWeekSelection),
+        [
+            {"draft_id": draft_id, "weekday_index": i, "delivery_date": week_start + timedelta(days=i), "meals": 1, "dish_choice": "A"}
+            for i in range(7)
+        ],
+    )
+    user = db.get(User, user_id)
+    user.client_type = "subscriber"
+    user.onboarding_draft_id = draft_id
+    db.commit()
+    return draft_id
+
+
+# ---------------------------------------------------------------------------
+# Calling routes directly
+# ---------------------------------------------------------------------------
+
+def make_request(headers: Iterable[Tuple[str, str]] = ()) -> Request:
+    """A bare GET request for route functions that read headers."""
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        }
+    )
+
+
+def drain(response) -> int:
+    """Consume a StreamingResponse body the way the server would; returns its size in bytes."""
+
+    async def read() -> int:
+        size = 0
+        async for chunk in response.body_iterator:
+            size += len(chunk)
+        return size
+
+    return anyio.run(read)
@@ -0,0 +1,79 @@
+# backend/tests/test_booking_writes.py
+
+"""
+POST /booking/ writes in the order the weekly cap needs: the conditional
+counter UPDATE comes first, so a booking over MAX_MEALS_PER_WEEK writes
+nothing, and an accepted one takes the write lock only for its writes.
+"""
+
+from contextlib import contextmanager
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from app.config import MAX_MEALS_PER_WEEK
+from app.models.booking import Booking
+from app.models.user import User
+from app.routers.booking import create_booking
+from app.schemas.booking import BookingCreate
+from app.services.data_versions import booking_version_name, read_versions
+
+from conftest import add_bookings, add_clients, future_week_start
+
+_WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+@contextmanager
+def writes(engine):
+    """Collect the write statements sent inside the block, in order."""
+    sent: List[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(_WRITES):
+            sent.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield sent
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def _payload(day, address_id, meals=1) -> BookingCreate:
+    return BookingCreate(delivery_date=day, time_block="12:00-12:15", meals=meals, address_id=address_id)
+
+
+def test_counter_update_is_the_first_write(db, migrated_engine):
+    day = future_week_start()
+    (user_id, address_id), = add_clients(db, 1)
+    user = db.get(User, user_id)
+
+    with writes(migrated_engine) as sent:
+        create_booking(_payload(day, address_id), db=db, current_user=user)
+
+    assert sent[0].startswith("UPDATE weekly_meal_counters"), sent
+    assert any(s.startswith("INSERT INTO bookings") for s in sent)
+
+
+def test_booking_over_the_cap_writes_nothing(db, migrated_engine):
+    day = future_week_start()
+    clients = add_clients(db, 1)
+    (user_id, address_id), = clients
+    # MAX_MEALS_PER_WEEK 1-meal bookings already in the week
+    while db.scalar(select(func.coalesce(func.sum(Booking.meals), 0))) < MAX_MEALS_PER_WEEK:
+        add_bookings(db, clients, [day], per_day=1)
+    assert db.scalar(select(func.sum(Booking.meals))) == MAX_MEALS_PER_WEEK
+    user = db.get(User, user_id)
+    bookings_before = db.scalar(select(func.count()).select_from(Booking))
+    version_before = read_versions(db, [booking_version_name(day)])
+
+    with writes(migrated_engine) as sent:
+        with pytest.raises(HTTPException) as rejected:
+            create_booking(_payload(day, address_id), db=db, current_user=user)
+
+    assert rejected.value.status_code == 400
+    assert sent and all("weekly_meal_counters" in s for s in sent), sent
+    assert db.scalar(select(func.count()).select_from(Booking)) == bookings_before
+    assert read_versions(db, [booking_version_name(day)]) == version_before
@@ -0,0 +1,40 @@
+# backend/tests/test_dish_type.py
+
+"""
+DishMatcher picks the highest-priority category with a keyword anywhere in
+the name, including keywords that overlap one of a lower-priority category.
+"""
+
+import pytest
+
+from app.services.dish_type import DishMatcher, infer_dish_type
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("porcod", "fish"),  # porco (meat) / cod (fish)
+        ("vacatum", "fish"),  # vaca (meat) / atum (fish)
+        ("beefrango", "poultry"),  # beef (meat) / frango (poultry)
+        ("Bife com frango", "poultry"),
+        ("Bife de vaca", "meat"),
+    ],
+)
+def test_default_taxonomy_overlapping_keywords(name, expected):
+    assert infer_dish_type(name) == expected
+
+
+def test_overlapping_keywords_follow_priority_not_position():
+    fish_first = DishMatcher([("fish", ["cod"]), ("meat", ["porco"])])
+    meat_first = DishMatcher([("meat", ["porco"]), ("fish", ["cod"])])
+
+    assert fish_first.classify("porcod") == "fish"
+    assert meat_first.classify("porcod") == "meat"
+
+
+def test_keywords_starting_at_the_same_position():
+    matcher = DishMatcher([("fish", ["bacalhau"]), ("meat", ["bac"])])
+
+    assert matcher.classify("bacalhau") == "fish"
+    assert matcher.classify("bacon") == "meat"
+    assert matcher.classify("tofu") == "meat"  # default
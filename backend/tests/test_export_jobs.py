@@ -0,0 +1,91 @@
+# backend/tests/test_export_jobs.py
+
+"""
+Export job bookkeeping: the stale sweep (running jobs by heartbeat, queued
+jobs by age) and the EXPORT_JOB_MAX_ACTIVE limit under concurrent submits.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.config import EXPORT_JOB_MAX_ACTIVE, EXPORT_JOB_QUEUED_TIMEOUT_SECONDS, EXPORT_JOB_STALE_SECONDS
+from app.database import SessionLocal
+from app.models.export_job import ExportJob
+from app.services import export_jobs
+from app.services.export_jobs import ExportJobsBusy, cleanup_export_jobs, submit_export_job
+
+from conftest import future_week_start
+
+
+@pytest.fixture
+def jobs(db, monkeypatch):
+    """No runner threads: submitted jobs stay queued. Deletes the test's jobs."""
+    monkeypatch.setattr(export_jobs.export_job_runner, "submit", lambda job_id: None)
+    yield
+    db.rollback()
+    db.execute(delete(ExportJob))
+    db.commit()
+
+
+def _job(job_id: str, status: str, created_at: datetime, updated_at: datetime) -> ExportJob:
+    start = future_week_start()
+    return ExportJob(
+        id=job_id,
+        status=status,
+        start_date=start,
+        end_date=start + timedelta(days=6),
+        filters={},
+        format="csv",
+        days_total=7,
+        created_at=created_at,
+        updated_at=updated_at,
+    )
+
+
+def test_stale_sweep_times_running_by_heartbeat_and_queued_by_age(db, jobs):
+    now = datetime.utcnow()
+    long_ago = now - timedelta(seconds=max(EXPORT_JOB_STALE_SECONDS, EXPORT_JOB_QUEUED_TIMEOUT_SECONDS) + 60)
+    db.add_all(
+        [
+            # Long export, still reporting progress
+            _job("alive", "running", created_at=long_ago, updated_at=now),
+            # Worker died mid-export
+            _job("dead", "running", created_at=long_ago, updated_at=now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS + 60)),
+            # Waiting behind other jobs, within its timeout
+            _job("waiting", "queued", created_at=now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS + 60), updated_at=long_ago),
+            # Never picked up
+            _job("orphaned", "queued", created_at=long_ago, updated_at=long_ago),
+        ]
+    )
+    db.commit()
+
+    assert cleanup_export_jobs(db, now)["stale_failed"] == 2
+    assert dict(db.execute(select(ExportJob.id, ExportJob.status)).all()) == {
+        "alive": "running",
+        "dead": "failed",
+        "waiting": "queued",
+        "orphaned": "failed",
+    }
+
+
+def test_concurrent_submits_never_exceed_the_active_limit(db, jobs):
+    start = future_week_start()
+
+    def submit(_):
+        session = SessionLocal()
+        try:
+            submit_export_job(session, start, start + timedelta(days=6))
+            return True
+        except ExportJobsBusy:
+            return False
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(16) as pool:
+        accepted = sum(pool.map(submit, range(4 * EXPORT_JOB_MAX_ACTIVE)))
+
+    assert accepted == EXPORT_JOB_MAX_ACTIVE
+    assert db.scalar(select(ExportJob.id).where(ExportJob.status != "queued")) is None
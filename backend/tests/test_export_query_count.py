@@ -0,0 +1,91 @@
+# backend/tests/test_export_query_count.py
+
+"""
+The booking exports and the driver sheet read through the shared eager
+source (export_data.export_bookings): the number of statements an export
+sends must not depend on the number of bookings in it (no per-row user,
+address or menu lookups).
+"""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.routers.exports import (
+    export_admin_week_bookings,
+    export_driver_sheet,
+    export_kitchen_day,
+    export_today_csv_legacy,
+    export_week_csv_legacy,
+)
+from app.services.menu_rotation import menu_rotation
+from app.services.service_week import get_week_start
+
+from conftest import add_bookings, add_clients, drain, make_request
+
+
+@contextmanager
+def count_statements(engine):
+    counter = {"statements": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def _today_exports(db):
+    today = date.today()
+    return {
+        "today csv": lambda: export_today_csv_legacy(
+            make_request(), format="csv", compress=None, db=db, current_user=None
+        ),
+        "week csv": lambda: export_week_csv_legacy(
+            make_request(), format="csv", compress=None, db=db, current_user=None
+        ),
+        "kitchen day csv": lambda: export_kitchen_day(
+            make_request(), service_date=today, format="csv", compress=None, db=db, current_user=None
+        ),
+        "admin week csv": lambda: export_admin_week_bookings(
+            make_request(), service_week_start=today, format="csv", compress=None, db=db, current_user=None
+        ),
+        "driver sheet": lambda: export_driver_sheet(
+            make_request(), format="text", compress=None, db=db, current_user=None
+        ),
+        "driver sheet csv": lambda: export_driver_sheet(
+            make_request(), format="csv", compress=None, db=db, current_user=None
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    "export",
+    ["today csv", "week csv", "kitchen day csv", "admin week csv", "driver sheet", "driver sheet csv"],
+)
+def test_export_query_count_is_independent_of_bookings(db, migrated_engine, export):
+    today = date.today()
+    # Today plus the first and last day of its service week, so the week
+    # exports span several dates (and rotation days)
+    days = sorted({today, get_week_start(today), get_week_start(today) + timedelta(days=6)})
+    clients = add_clients(db, 50)
+    make = _today_exports(db)[export]
+
+    # n bookings per date: 10, then 1000 (more than one yield_per batch)
+    counts = {}
+    for n, added in ((10, 10), (1000, 990)):
+        add_bookings(db, clients, days, per_day=added)
+        # Same cache state for both sizes: rotation loaded, one version check
+        menu_rotation.days(db)
+        menu_rotation.mark_stale()
+        with count_statements(migrated_engine) as counter:
+            size = drain(make())
+        assert size > 0
+        counts[n] = counter["statements"]
+
+    assert counts[10] == counts[1000], counts
@@ -0,0 +1,232 @@
+# backend/tests/test_query_plans.py
+
+"""
+The hot paths stay on the indexes of migrations 0003 / 0004 / 0012 (and
+the model indexes on addresses.user_id and
+onboarding_first_week_selections.draft_id): every statement they send
+that reads the table under test (a SELECT, or the INSERT ... SELECT
+seeding a meal counter) goes through EXPLAIN QUERY PLAN and must SEARCH
+the expected index, never SCAN the table.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import List, Tuple
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models.booking import Booking
+from app.models.user import User
+from app.routers.admin import list_all_bookings, weekly_summary
+from app.routers.booking import (
+    BootstrapBookingsIn,
+    bootstrap_from_onboarding,
+    cancel_booking,
+    ensure_week_bookings,
+    get_week_pricing,
+    list_my_bookings,
+    update_booking,
+)
+from app.routers.kitchen import kitchen_production
+from app.schemas.booking import BookingCreate
+from app.services import meal_counters
+from app.services.export_data import export_bookings
+from app.services.kitchen_board import kitchen_rows
+from app.services.kitchen_production import day_portions
+
+from conftest import add_bookings, add_clients, add_subscriber, future_week_start
+
+# SQLite reports rowid lookups without an index name
+PRIMARY_KEY = "INTEGER PRIMARY KEY"
+
+
+@contextmanager
+def reads(engine, table: str = "bookings"):
+    """Collect (sql, parameters) of every statement reading table sent inside the block."""
+    reads_table = re.compile(rf"\b(FROM|JOIN)\s+{table}\b")
+    sent: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if reads_table.search(statement):
+            sent.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield sent
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(engine, statement: str, parameters) -> List[str]:
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def assert_uses_index(engine, sent, index: str, table: str = "bookings") -> None:
+    assert sent, f"nothing read {table}"
+    using = PRIMARY_KEY if index == PRIMARY_KEY else rf"(COVERING )?INDEX {index}"
+    search = re.compile(rf"SEARCH {table} USING {using} ")
+    for statement, parameters in sent:
+        plan = query_plan(engine, statement, parameters)
+        details = "\n".join(plan)
+        assert not any(step.startswith(f"SCAN {table}") for step in plan), f"{details}\n\n{statement}"
+        assert any(search.match(step) for step in plan), f"expected {index}:\n{details}\n\n{statement}"
+
+
+@pytest.fixture
+def week(db):
+    """A seeded future service week (7 meals per client): (week_start, client User)."""
+    week_start = future_week_start()
+    clients = add_clients(db, 6)
+    add_bookings(db, clients, (week_start + timedelta(days=i) for i in range(7)), per_day=6)
+    add_bookings(db, clients, [week_start], per_day=2, status="cancelled")
+    user = db.get(User, clients[0][0])
+    return week_start, user
+
+
+@pytest.fixture
+def subscriber(db, week):
+    """
+    The week's client as a subscriber with an onboarding draft: behaviour
+    grid and a one-meal-a-day first week (already booked, so ensure-week
+    and bootstrap only run their lookups). Returns (week_start, User).
+    """
+    week_start, user = week
+    add_subscriber(db, user.id, week_start)
+    return week_start, user
+
+
+# ---------------------------------------------------------------------------
+# Kitchen, exports, admin
+# ---------------------------------------------------------------------------
+
+def test_kitchen_day_uses_live_index(db, migrated_engine, week):
+    week_start, _ = week
+    with reads(migrated_engine) as sent:
+        assert kitchen_rows(db, week_start)
+    assert_uses_index(migrated_engine, sent, "ix_bookings_live_date_time")
+
+
+def test_kitchen_production_uses_live_index(db, migrated_engine, week):
+    week_start, _ = week
+    with reads(migrated_engine) as sent, reads(migrated_engine, "addresses") as joined:
+        totals = kitchen_production(day=None, week_for=week_start, db=db, kitchen_user=None)
+    assert totals["source"] == "live"
+    # _live_slots and _region_totals
+    assert len(sent) == 2
+    assert_uses_index(migrated_engine, sent, "ix_bookings_live_date_time")
+    assert_uses_index(migrated_engine, joined, PRIMARY_KEY, table="addresses")
+
+
+def test_live_day_portions_use_live_index(db, migrated_engine, week):
+    week_start, _ = week
+    with reads(migrated_engine) as sent:
+        source, portions = day_portions(db, week_start, week_start + timedelta(days=6))
+    assert source == "live" and len(portions) == 7
+    assert_uses_index(migrated_engine, sent, "ix_bookings_live_date_time")
+
+
+@pytest.mark.parametrize(
+    "status, index",
+    [
+        (None, "ix_bookings_live_date_time"),
+        ("active", "ix_bookings_live_date_time"),
+        ("locked", "ix_bookings_live_date_time"),
+        ("cancelled", "ix_bookings_cancelled_date"),
+    ],
+)
+def test_booking_exports_use_status_index(db, migrated_engine, week, status, index):
+    week_start, _ = week
+    with reads(migrated_engine) as sent:
+        list(export_bookings(db, week_start, week_start + timedelta(days=6), status=status))
+    assert_uses_index(migrated_engine, sent, index)
+
+
+def test_admin_weekly_summary_uses_live_index(db, migrated_engine, week):
+    week_start, _ = week
+    with reads(migrated_engine) as sent:
+        summary = weekly_summary(week_for=week_start, db=db, admin=None)
+    assert summary["week_start"] == week_start
+    assert_uses_index(migrated_engine, sent, "ix_bookings_live_date_time")
+
+
+def test_admin_booking_list_reads_bookings_once(db, migrated_engine, week):
+    # GET /admin/bookings lists every booking, cancelled ones included: no
+    # index can narrow it, so the plan must stay a single pass over the table
+    with reads(migrated_engine) as sent:
+        listed = list_all_bookings(db=db, admin=None)
+    assert len(listed) == 6 * 7 + 2
+    assert len(sent) == 1
+    plan = query_plan(migrated_engine, *sent[0])
+    assert [step for step in plan if "bookings" in step] == ["SCAN bookings"], plan
+
+
+# ---------------------------------------------------------------------------
+# Client paths
+# ---------------------------------------------------------------------------
+
+def test_client_booking_list_uses_user_index(db, migrated_engine, week):
+    _, user = week
+    with reads(migrated_engine) as sent:
+        assert list_my_bookings(db=db, current_user=user)
+    assert_uses_index(migrated_engine, sent, "ix_bookings_user_date")
+
+
+def test_client_weekly_totals_use_user_index(db, migrated_engine, week):
+    week_start, user = week
+    with reads(migrated_engine) as sent:
+        get_week_pricing(week_for=week_start, db=db, current_user=user)
+        meal_counters.current_meals(db, user.id, week_start)
+    assert_uses_index(migrated_engine, sent, "ix_bookings_user_date")
+
+
+def test_booking_update_and_cancel_look_up_by_primary_key(db, migrated_engine, week):
+    week_start, user = week
+    booking = db.query(Booking).filter(Booking.user_id != user.id).first()
+    payload = BookingCreate(delivery_date=week_start, time_block="12:00-12:15", meals=1, address_id=booking.address_id)
+    with reads(migrated_engine) as sent:
+        # Someone else's booking: both stop at the lookup
+        with pytest.raises(HTTPException):
+            update_booking(booking.id, payload, db=db, current_user=user)
+        with pytest.raises(HTTPException):
+            cancel_booking(booking.id, db=db, current_user=user)
+    assert len(sent) == 2
+    assert_uses_index(migrated_engine, sent, PRIMARY_KEY)
+
+
+def test_ensure_week_uses_user_and_draft_indexes(db, migrated_engine, subscriber):
+    week_start, user = subscriber
+    with reads(migrated_engine) as sent, reads(migrated_engine, "addresses") as addresses, reads(
+        migrated_engine, "onboarding_first_week_selections"
+    ) as selections:
+        assert ensure_week_bookings(week_start=week_start, db=db, current_user=user) == {"created": 0}
+    # One "exists" lookup per template day
+    assert len(sent) == 7
+    assert_uses_index(migrated_engine, sent, "ix_bookings_user_date")
+    assert_uses_index(migrated_engine, addresses, "ix_addresses_user_id", table="addresses")
+    assert_uses_index(
+        migrated_engine,
+        selections,
+        "ix_onboarding_first_week_selections_draft_id",
+        table="onboarding_first_week_selections",
+    )
+
+
+def test_bootstrap_uses_user_and_draft_indexes(db, migrated_engine, subscriber):
+    _, user = subscriber
+    with reads(migrated_engine) as sent, reads(migrated_engine, "addresses") as addresses, reads(
+        migrated_engine, "onboarding_first_week_selections"
+    ) as selections:
+        assert bootstrap_from_onboarding(BootstrapBookingsIn(), db=db, current_user=user) == {"created": 0}
+    assert len(sent) == 7
+    assert_uses_index(migrated_engine, sent, "ix_bookings_user_date")
+    assert_uses_index(migrated_engine, addresses, "ix_addresses_user_id", table="addresses")
+    assert_uses_index(
+        migrated_engine,
+        selections,
+        "ix_onboarding_first_week_selections_draft_id",
+        table="onboarding_first_week_selections",
+    )
@@ -0,0 +1,52 @@
+# backend/tests/test_subscriber_weeks.py
+
+"""
+Subscriber week generation only writes weeks clients can still change:
+a week past its cutoff (locked) is refused before anything is inserted,
+both by the service and by POST /admin/jobs/subscriber-week.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.booking import Booking, ServiceWeekLock
+from app.routers.admin import run_subscriber_week_job
+from app.services.service_week import get_week_start
+from app.services.subscriber_weeks import generate_subscriber_week
+
+from conftest import add_clients, add_subscriber, future_week_start
+
+
+def _bookings(db) -> int:
+    return db.scalar(select(func.count()).select_from(Booking))
+
+
+def test_open_week_is_generated(db):
+    week_start = future_week_start()
+    (user_id, _), = add_clients(db, 1)
+    add_subscriber(db, user_id, week_start)
+
+    report = generate_subscriber_week(db, week_start)
+
+    assert report["created"] == 7
+    assert _bookings(db) == 7
+
+
+def test_locked_week_is_refused_and_nothing_inserted(db):
+    # The current service week: its cutoff (the Monday before it) has passed
+    week_start = get_week_start(date.today())
+    (user_id, _), = add_clients(db, 1)
+    add_subscriber(db, user_id, week_start)
+    db.add(ServiceWeekLock(week_start=week_start, locked_at=datetime.utcnow(), bookings_locked=0))
+    db.commit()
+
+    with pytest.raises(ValueError, match="cutoff"):
+        generate_subscriber_week(db, week_start)
+    with pytest.raises(HTTPException) as rejected:
+        run_subscriber_week_job(week_start=week_start, db=db, admin=None)
+
+    assert rejected.value.status_code == 422
+    assert _bookings(db) == 0